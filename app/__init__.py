@@ -1,17 +1,27 @@
 from flask import Flask
 from flask_cors import CORS
-import threading
+import atexit
 import os
+import time
 
 from .config import Config
 from .binance_client import BinanceClient
-from .services.trading_bot import TradingBotManager
-from .services.portfolio import PortfolioManager
-from .services.price_storage import PriceStorage
+from .services.bot_engine import BotEngine, user_credentials_loader
+from .services.client_pool import BinanceClientPool
+from .services.engine_ipc import EngineClient
+from .services.price_storage import PriceStorage, ArchiveJob
+from .services.kline_store import KlineStore
+from .services.backfill import BackfillService
+from .services.gap_repair import GapRepairService
+from .services.history_cache import PayloadCache
+from .services.snapshot_cache import SnapshotCache, parse_ttls
+from .services.candles import parse_intervals, persisted_candles
 from .database.mongodb import MongoDB
-from .auth.auth_manager import AuthManager
+from .auth.auth_manager import AuthManager, is_admin
+from .monitoring import metrics, profiling
 
 def create_app():
+    started = time.perf_counter()
     app = Flask(__name__, static_folder="../static", static_url_path="/static")
     app.config.from_object(Config)
     
@@ -20,15 +30,29 @@ def create_app():
 
     CORS(app, resources={r"/api/*": {"origins": app.config.get("CORS_ORIGINS", "*")}})
 
+    # Per-route latency histograms, exposed at /metrics
+    metrics.init_app(app)
+    # On-demand cProfile for admin requests carrying X-Profile: 1 or ?_profile=1
+    profiling.init_app(app, is_admin)
+
     # Initialize MongoDB
-    app.mongodb = MongoDB()
-    try:
-        app.mongodb.connect()
-        print("✅ MongoDB connected successfully")
-    except Exception as e:
-        print(f"❌ MongoDB connection failed: {e}")
-        # Continue without MongoDB for now
-        app.mongodb = None
+    app.mongodb = MongoDB(timeout_ms=app.config.get("MONGODB_TIMEOUT_MS"))
+    app.mongodb.enable_spool(
+        app.config.get("MONGO_SPOOL_PATH", os.path.join("data", "mongo_spool.jsonl")),
+        failure_threshold=app.config.get("MONGO_BREAKER_FAILURES", 3),
+        reset_timeout=app.config.get("MONGO_BREAKER_RESET", 30.0),
+    )
+    if app.config.get("DEFERRED_STARTUP", True):
+        # Serve immediately; ping and index builds run in the background (see /healthz)
+        app.mongodb.connect_in_background()
+    else:
+        try:
+            app.mongodb.connect()
+            print("✅ MongoDB connected successfully")
+        except Exception as e:
+            print(f"❌ MongoDB connection failed: {e}")
+            # Continue without MongoDB for now
+            app.mongodb = None
 
     # Initialize Authentication Manager
     if app.mongodb:
@@ -36,7 +60,7 @@ def create_app():
     else:
         app.auth_manager = None
 
-    # Initialize Binance client (will be user-specific later)
+    # Shared client for public market data (prices, klines, symbols)
     app.binance = BinanceClient(
         api_key=app.config.get("BINANCE_API_KEY", ""),
         api_secret=app.config.get("BINANCE_API_SECRET", ""),
@@ -44,20 +68,81 @@ def create_app():
         dry_run=app.config.get("DRY_RUN", True),
     )
 
-    # Create shared lock for thread safety
-    app.shared_lock = threading.Lock()
-    
-    app.portfolio = PortfolioManager(app.binance)
-    app.portfolio.set_lock(app.shared_lock)
-    # Provide db and portfolio to bot manager for future integration
-    app.bot_manager = TradingBotManager(app.binance, db=app.mongodb, portfolio=app.portfolio)
-    
+    # Per-user clients for orders and account data, signed with each user's own keys
+    app.binance_pool = BinanceClientPool(
+        app.config.get("BINANCE_BASE_URL", "https://testnet.binance.vision"),
+        default_api_key=app.config.get("BINANCE_API_KEY", ""),
+        default_api_secret=app.config.get("BINANCE_API_SECRET", ""),
+        default_dry_run=app.config.get("DRY_RUN", True),
+        max_clients=app.config.get("BINANCE_POOL_SIZE", 256),
+        idle_ttl=app.config.get("BINANCE_CLIENT_TTL", 1800.0),
+        credentials_loader=user_credentials_loader(app.mongodb),
+    )
+
+    app.candle_intervals = parse_intervals(app.config.get("CANDLE_INTERVALS", ""))
+    app.candles = None
+
+    if app.config.get("BOT_ENGINE") == "remote":
+        # Bots and portfolio live in bot_worker.py; this process stays stateless
+        app.engine = EngineClient(
+            app.config["BOT_ENGINE_SOCKET"],
+            authkey=app.config["BOT_ENGINE_AUTHKEY"].encode(),
+            snapshot_path=app.config.get("BOT_ENGINE_SNAPSHOT"),
+        )
+    else:
+        # Live OHLCV bars built from every tick, persisted in day partitions; with a remote
+        # engine bot_worker.py owns them, since one writer per store must see all the ticks
+        app.candles = persisted_candles(app.config)
+        app.candles.start()
+        atexit.register(app.candles.stop)
+        app.engine = BotEngine(app.binance, db=app.mongodb, config=app.config, clients=app.binance_pool,
+                               candles=app.candles)
+        app.engine.start()
+        atexit.register(app.engine.shutdown)
+
     # Initialize price storage with Binance client and DB for dual-write
-    app.price_storage = PriceStorage(binance_client=app.binance, db=app.mongodb)
+    app.kline_store = KlineStore(os.path.join("data", "klines"))
+    app.price_storage = PriceStorage(
+        binance_client=app.binance, db=app.mongodb,
+        hot_days=app.config.get("PRICE_HOT_DAYS", 1), kline_store=app.kline_store,
+        kline_open_ttl=app.config.get("KLINE_OPEN_TTL", 5.0),
+        window_ttl=app.config.get("PRICE_WINDOW_TTL", 1.0),
+        # Saved ticks feed the engine's candles: directly, or over the socket to bot_worker.py
+        candles=app.candles if app.candles is not None else app.engine,
+    )
+    # Hot CSV ticks moved into the compressed archive (and retention applied) on a timer;
+    # with a remote engine bot_worker.py runs it, so N web workers do not all rewrite the same files
+    if app.config.get("BOT_ENGINE") != "remote" and app.config.get("PRICE_ARCHIVE_INTERVAL", 3600) > 0:
+        app.price_archive_job = ArchiveJob(app.price_storage, interval=app.config["PRICE_ARCHIVE_INTERVAL"],
+                                           retention_days=app.config.get("PRICE_RETENTION_DAYS", 0))
+        app.price_archive_job.start()
+        atexit.register(app.price_archive_job.stop)
+    # Serialized /api/price-history bodies keyed by (symbol, period, content version)
+    app.history_cache = PayloadCache()
+    # Per-section cache behind /api/dashboard-snapshot; stale sections refresh in parallel
+    app.dashboard_cache = SnapshotCache(parse_ttls(app.config.get("DASHBOARD_TTLS", "")),
+                                        max_workers=app.config.get("DASHBOARD_WORKERS", 8))
+
+    # Resumable kline history download into the kline store
+    app.backfill = BackfillService(
+        app.binance, app.kline_store,
+        checkpoint_path=os.path.join("data", "klines", "backfill_checkpoint.json"),
+        weight_per_minute=app.config.get("BACKFILL_WEIGHT_PER_MINUTE", 1200),
+    )
+
+    # Tick gap scan/repair, sharing the backfill rate limiter and kline store
+    app.gap_repair = GapRepairService(
+        app.price_storage, app.backfill,
+        max_gap_ms=app.config.get("GAP_THRESHOLD_SECONDS", 300) * 1000,
+        interval=app.config.get("GAP_FILL_INTERVAL", "1m"),
+    )
 
     # Register blueprints
     from .api_routes import api_bp
     app.register_blueprint(api_bp, url_prefix="/api")
+
+    from .routes.monitoring import monitoring_bp
+    app.register_blueprint(monitoring_bp)
     
     if app.auth_manager:
         from .routes.auth import auth_bp
@@ -77,4 +162,5 @@ def create_app():
     def dashboard():
         return app.send_static_file("dashboard.html")
 
+    app.startup_seconds = time.perf_counter() - started
     return app
@@ -1,23 +1,72 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
 import time
+from dataclasses import asdict
 from datetime import datetime
 
+import numpy as np
+
 from .models.trade import Trade
 from .models.bot_config import BotConfig
+from .services.threshold_engine import ThresholdBotState
+from .services.strategies import STRATEGIES
+from .services.downsample import METHODS as DOWNSAMPLE_METHODS, downsample
+from .services.price_wire import FORMATS as HISTORY_FORMATS, encode_history, binary_headers
+from .services.kline_store import interval_ms
+from .auth.auth_manager import admin_required
 
 api_bp = Blueprint('api', __name__)
 
+# Trades cached per user for /api/dashboard-snapshot; smaller limits are slices of it
+SNAPSHOT_TRADES = 50
+# Most bars one /api/candles response returns
+CANDLE_LIMIT = 5000
+# Seconds between /api/candles/stream polls of the engine's closed bars, and between keepalive comments
+CANDLE_STREAM_POLL = 0.5
+CANDLE_STREAM_HEARTBEAT = 15.0
+
+
+def user_client():
+    """The current user's pooled Binance client, in their own dry-run mode."""
+    if current_user.is_authenticated:
+        return current_app.binance_pool.get(
+            current_user.user_id, current_user.binance_api_key, current_user.binance_api_secret,
+            dry_run=getattr(current_user, "dry_run", None),
+        )
+    return current_app.binance_pool.get(None)
+
+
+def marked_summary(positions, user_id, analytics=None):
+    """Portfolio summary with the prices and PnL published by the mark-to-market job; nothing is fetched here.
+
+    Per-symbol realized PnL comes from ``analytics`` (an analytics summary) when given, else from the engine.
+    """
+    marks = current_app.engine.marks(user_id)
+    marked = {row["symbol"]: row for row in marks["positions"]}
+    if analytics is None:
+        analytics = current_app.engine.analytics_summary(user_id, False)
+    realized = analytics.get("realized_by_symbol") or {}
+    summary_positions = []
+    for position in positions:
+        row = marked.get(position["_id"], {})
+        summary_positions.append(dict(position, entry_price=row.get("entry_price"),
+                                      current_price=row.get("current_price"),
+                                      unrealized_pnl=row.get("unrealized_pnl"),
+                                      realized_pnl=realized.get(position["_id"], 0.0)))
+    return {
+        "positions": summary_positions,
+        "total_unrealized_pnl": sum(row["unrealized_pnl"] or 0 for row in marked.values()),
+        "marked_at": marks["updated_at"],
+    }
+
 
 @api_bp.get("/status")
 def get_status():
     """Get bot status"""
     try:
-        bot_manager = current_app.bot_manager
-        binance_client = current_app.binance
-        status = bot_manager.status()
-        # Merge in dry_run info from client
-        status["dry_run"] = binance_client.dry_run
+        status = current_app.engine.status()
+        if current_user.is_authenticated:
+            status["dry_run"] = user_client().dry_run
         return jsonify(status)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -47,26 +96,252 @@ def get_price():
 
 @api_bp.get("/price-history")
 def get_price_history():
-    """Get price history for a symbol"""
+    """Get price history for a symbol.
+
+    ``since=<ms>`` returns only points newer than that timestamp. Responses
+    carry an ETag from the window's content version (point count and a
+    digest of every point), so an unchanged series is a 304, and full
+    payloads are served from a cache of serialized bodies under the same
+    version. The window itself is reused for PRICE_WINDOW_TTL seconds, so
+    neither path rebuilds it from storage on every poll.
+    ``format`` selects ``rows`` (default), ``columnar`` or ``binary``;
+    ``max_points`` downsamples with ``downsample=lttb`` (default) or ``minmax``.
+    """
     try:
         symbol = request.args.get("symbol", "ETHUSDT")
         period = request.args.get("period", "1d")
+        since = request.args.get("since", type=int)
+        fmt = request.args.get("format", "rows")
+        if fmt not in HISTORY_FORMATS:
+            return jsonify({"error": f"format must be one of {HISTORY_FORMATS}"}), 400
+        # Malformed or negative means no downsampling
+        max_points = max(request.args.get("max_points", 0, type=int), 0)
+        method = request.args.get("downsample", "lttb")
+        if method not in DOWNSAMPLE_METHODS:
+            return jsonify({"error": f"downsample must be one of {DOWNSAMPLE_METHODS}"}), 400
         
-        if not current_app.price_storage:
+        storage = current_app.price_storage
+        if not storage:
             return jsonify({"error": "Price storage not available"}), 500
         
-        data = current_app.price_storage.get_price_history(symbol, period)
-        
-        return jsonify({
-            "symbol": symbol,
-            "period": period,
-            "data": data,
-            "count": len(data)
+        timestamps, prices, version = storage.get_price_window(symbol, period)
+        last_timestamp = int(timestamps[-1]) if timestamps.size else 0
+        tag = f"{symbol}-{period}-{fmt}-{max_points}{method}-{version}"
+        headers = {"ETag": f'W/"{tag}"', "Cache-Control": "no-cache"}
+
+        # Parsed entity-tag list; weak comparison per tag, and "*" matches any
+        if request.if_none_match.contains_weak(tag) or (since is not None and since >= last_timestamp):
+            return Response(status=304, headers=headers)
+
+        meta = {"symbol": symbol, "period": period}
+        if since is not None:
+            start = int(np.searchsorted(timestamps, since, side="right"))
+            # Oldest point still in the window; the client drops anything older
+            meta.update(delta=True, since=since, first=int(timestamps[0]))
+            timestamps, prices = downsample(timestamps[start:], prices[start:], max_points, method)
+            body, mimetype = encode_history(timestamps, prices, fmt, meta, current_app.json.dumps)
+        else:
+            key = (symbol, period, version, fmt, max_points, method)
+            cached = current_app.history_cache.get(key)
+            if cached is None:
+                timestamps, prices = downsample(timestamps, prices, max_points, method)
+                cached = encode_history(timestamps, prices, fmt, meta, current_app.json.dumps)
+                current_app.history_cache.put(key, cached)
+            body, mimetype = cached
+        if fmt == "binary":
+            # 16 bytes per point: int64 timestamp + float64 price
+            headers.update(binary_headers(meta, len(body) // 16))
+        return Response(body, mimetype=mimetype, headers=headers)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.get("/candles")
+def get_candles():
+    """Live OHLCV bars aggregated from ticks.
+
+    ``interval`` is one of CANDLE_INTERVALS; ``start``/``end`` are open
+    times in ms (default: the last ``limit`` bars). The still-open bar is
+    included last unless ``closed_only=true``.
+    """
+    try:
+        intervals = current_app.candle_intervals
+        symbol = request.args.get("symbol", "ETHUSDT").upper()
+        interval = request.args.get("interval", "1m")
+        if interval not in intervals:
+            return jsonify({"error": f"interval must be one of {intervals}"}), 400
+        limit = min(request.args.get("limit", 500, type=int), CANDLE_LIMIT)
+        end = request.args.get("end", type=int)
+        start = request.args.get("start", type=int)
+        if start is None:
+            start = (end or int(time.time() * 1000)) - limit * interval_ms(interval)
+        closed_only = request.args.get("closed_only", "false").lower() == "true"
+
+        # Bars live in the engine process, the single aggregator of every worker's ticks
+        rows = current_app.engine.candles_range(symbol, interval, start, end, include_open=not closed_only, limit=limit)
+        return jsonify({"symbol": symbol, "interval": interval, "candles": rows})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.get("/candles/stream")
+def stream_candles():
+    """Server-sent events, one per closed bar, optionally filtered by symbol and interval.
+
+    Polls the engine's numbered closed bars, so nothing is registered per
+    client and any API worker can serve the stream; a client further
+    behind than the engine's recent window skips the bars it missed.
+    """
+    try:
+        engine = current_app.engine
+        symbol = request.args.get("symbol")
+        interval = request.args.get("interval")
+        intervals = current_app.candle_intervals
+        if interval is not None and interval not in intervals:
+            return jsonify({"error": f"interval must be one of {intervals}"}), 400
+        dumps = current_app.json.dumps
+
+        def stream():
+            seq = engine.candle_events(None)["seq"]
+            # Sent at once so headers go out before the first bar closes
+            yield ": connected\n\n"
+            quiet_since = time.monotonic()
+            while True:
+                time.sleep(CANDLE_STREAM_POLL)
+                events = engine.candle_events(seq, symbol, interval)
+                seq = events["seq"]
+                for bar in events["bars"]:
+                    yield f"event: candle\ndata: {dumps(bar)}\n\n"
+                if events["bars"]:
+                    quiet_since = time.monotonic()
+                elif time.monotonic() - quiet_since >= CANDLE_STREAM_HEARTBEAT:
+                    yield ": keepalive\n\n"
+                    quiet_since = time.monotonic()
+
+        return Response(stream_with_context(stream()), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.get("/price-export")
+@login_required
+def export_prices():
+    """Stream a symbol's stored history as Parquet or Arrow IPC"""
+    try:
+        from .services.price_bulk import export_history, EXPORT_FORMATS
+        symbol = request.args.get("symbol", "ETHUSDT")
+        fmt = request.args.get("format", "parquet")
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({"error": f"format must be one of {EXPORT_FORMATS}"}), 400
+        start = request.args.get("start", 0, type=int)
+        end = request.args.get("end", type=int)
+
+        stream = export_history(current_app.price_storage, symbol, fmt, start, end)
+        mimetype = "application/vnd.apache.parquet" if fmt == "parquet" else "application/vnd.apache.arrow.stream"
+        extension = "parquet" if fmt == "parquet" else "arrows"
+        return Response(stream_with_context(stream), mimetype=mimetype, headers={
+            "Content-Disposition": f"attachment; filename={symbol.lower()}_prices.{extension}"
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@api_bp.post("/price-import")
+@admin_required
+def import_prices():
+    """Bulk import an uploaded Parquet or CSV dump (timestamp, price columns)"""
+    try:
+        from .services.price_bulk import import_history, IMPORT_FORMATS
+        symbol = request.args.get("symbol") or request.form.get("symbol")
+        upload = request.files.get("file")
+        if not symbol or not upload:
+            return jsonify({"error": "symbol and file are required"}), 400
+        fmt = request.args.get("format") or ("csv" if upload.filename.endswith(".csv") else "parquet")
+        if fmt not in IMPORT_FORMATS:
+            return jsonify({"error": f"format must be one of {IMPORT_FORMATS}"}), 400
+
+        result = import_history(current_app.price_storage, symbol.upper(), upload.stream, fmt,
+                                to_db=request.args.get("to_db", "true").lower() == "true")
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.post("/backfill")
+@admin_required
+def start_backfill():
+    """Start a background kline backfill for symbols and intervals"""
+    try:
+        data = request.get_json() or {}
+        symbols = data.get("symbols") or [data.get("symbol", "ETHUSDT")]
+        intervals = data.get("intervals") or ["1m"]
+        started = current_app.backfill.start(
+            symbols, intervals,
+            start_ts=int(data.get("start", 0)),
+            end_ts=int(data["end"]) if data.get("end") else None,
+            workers=int(data.get("workers", current_app.config.get("BACKFILL_WORKERS", 4))),
+        )
+        if not started:
+            return jsonify({"success": False, "message": "Backfill already running"}), 409
+        return jsonify({"success": True, "symbols": symbols, "intervals": intervals})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.get("/backfill")
+@admin_required
+def backfill_status():
+    """Backfill progress per series"""
+    return jsonify(current_app.backfill.status())
+
+
+@api_bp.post("/backfill/stop")
+@admin_required
+def stop_backfill():
+    """Stop the running backfill after the current page; it resumes from the checkpoint"""
+    current_app.backfill.stop()
+    return jsonify({"success": True})
+
+
+@api_bp.get("/price-gaps")
+@admin_required
+def price_gaps():
+    """Coverage report for a symbol's stored ticks (scan only)"""
+    try:
+        symbol = request.args.get("symbol", "ETHUSDT").upper()
+        max_gap = request.args.get("max_gap", type=int)
+        return jsonify(current_app.gap_repair.scan(symbol, max_gap * 1000 if max_gap else None))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.post("/price-gaps/repair")
+@admin_required
+def repair_price_gaps():
+    """Start a background job filling tick gaps from klines"""
+    try:
+        data = request.get_json() or {}
+        started = current_app.gap_repair.start(
+            symbols=data.get("symbols"),
+            max_gap_ms=int(data["max_gap"]) * 1000 if data.get("max_gap") else None,
+            interval=data.get("interval"),
+            dry_run=bool(data.get("dry_run", False)),
+        )
+        if not started:
+            return jsonify({"success": False, "message": "Gap repair already running"}), 409
+        return jsonify({"success": True})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.get("/price-gaps/repair")
+@admin_required
+def price_gap_repair_status():
+    """Last gap repair report"""
+    return jsonify(current_app.gap_repair.status())
+
+
 @api_bp.get("/symbols")
 def get_symbols():
     """Get available trading symbols"""
@@ -88,13 +363,13 @@ def start_bot():
         buy_threshold = float(data.get("buy_threshold", 3000))
         sell_threshold = float(data.get("sell_threshold", 3200))
         quantity = float(data.get("quantity", 0.01))
-        dry_run = data.get("dry_run", True)
-        
-        bot_manager = current_app.bot_manager
-        binance_client = current_app.binance
-        
-        # Update Binance client dry run setting
-        binance_client.dry_run = dry_run
+        dry_run = bool(data.get("dry_run", True))
+
+        # Dry-run is a per-user setting, stored on the user so every worker sees it
+        current_user.dry_run = dry_run
+        current_app.binance_pool.set_dry_run(current_user.user_id, dry_run)
+        if current_app.mongodb:
+            current_app.mongodb.update_user(current_user.user_id, {"dry_run": dry_run})
         
         # Save bot config to MongoDB if available
         if current_app.mongodb and current_user.is_authenticated:
@@ -110,7 +385,10 @@ def start_bot():
             current_app.mongodb.save_bot_config(config)
         
         # Start the bot with provided parameters
-        bot_manager.start(symbol, buy_threshold, sell_threshold, quantity)
+        current_app.engine.start_bot(symbol, buy_threshold, sell_threshold, quantity,
+                                     user_id=current_user.user_id, dry_run=dry_run)
+        current_app.dashboard_cache.invalidate(current_user.user_id, "bot_configs", "balances")
+        current_app.dashboard_cache.invalidate(None, "status")
         
         return jsonify({
             "success": True,
@@ -126,21 +404,95 @@ def start_bot():
 def stop_bot():
     """Stop the trading bot"""
     try:
-        bot_manager = current_app.bot_manager
-        bot_manager.stop()
+        data = request.get_json(silent=True) or {}
+        current_app.engine.stop_bot(user_id=current_user.user_id, symbol=data.get("symbol", "ETHUSDT"))
         
         # Update bot config in MongoDB if available
         if current_app.mongodb and current_user.is_authenticated:
-            config = current_app.mongodb.get_bot_config(current_user.user_id, data.get("symbol", "ETHUSDT")) if (data := request.get_json(silent=True) or {}) else None
+            config = current_app.mongodb.get_bot_config(current_user.user_id, data.get("symbol", "ETHUSDT")) if data else None
             if config:
                 config.is_active = False
                 current_app.mongodb.save_bot_config(config)
+        current_app.dashboard_cache.invalidate(current_user.user_id, "bot_configs")
+        current_app.dashboard_cache.invalidate(None, "status")
         
         return jsonify({"success": True, "message": "Bot stopped successfully"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@api_bp.get("/bots")
+@login_required
+def list_bots():
+    """List the user's engine-hosted bots"""
+    try:
+        return jsonify(current_app.engine.list_bots(current_user.user_id))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.post("/bots")
+@login_required
+def add_bot():
+    """Add a threshold or indicator bot to the shared per-symbol engine"""
+    try:
+        data = request.get_json()
+        symbol = data.get("symbol", "ETHUSDT")
+        bot_type = data.get("bot_type", "THRESHOLD")
+        if bot_type != "THRESHOLD" and bot_type not in STRATEGIES:
+            return jsonify({"error": f"Unknown bot_type: {bot_type}"}), 400
+        # Sent with the bot: a remote engine's pool has not seen this user's mode
+        dry_run = user_client().dry_run
+        bot = ThresholdBotState(
+            bot_id=f"{current_user.user_id}:{symbol}",
+            symbol=symbol,
+            buy_threshold=float(data.get("buy_threshold", 3000)),
+            sell_threshold=float(data.get("sell_threshold", 3200)),
+            quantity=float(data.get("quantity", 0.01)),
+            user_id=current_user.user_id,
+            bot_type=bot_type,
+            params=data.get("params"),
+            dry_run=dry_run,
+        )
+        bot_id = current_app.engine.add_bot(asdict(bot))
+        # Persisted as active so the bot is resumed after a restart
+        if current_app.mongodb:
+            current_app.mongodb.save_bot_config(BotConfig(
+                user_id=current_user.user_id,
+                symbol=symbol,
+                buy_threshold=bot.buy_threshold,
+                sell_threshold=bot.sell_threshold,
+                quantity=bot.quantity,
+                is_active=True,
+                dry_run=dry_run,
+                bot_type=bot_type,
+                params=bot.params,
+            ))
+            current_app.dashboard_cache.invalidate(current_user.user_id, "bot_configs")
+        return jsonify({"success": True, "bot_id": bot_id})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.delete("/bots/<symbol>")
+@login_required
+def remove_bot(symbol):
+    """Remove the user's threshold bot for a symbol"""
+    try:
+        bot = current_app.engine.remove_bot(f"{current_user.user_id}:{symbol}")
+        if not bot:
+            return jsonify({"success": False, "message": "Bot not found"}), 404
+        if current_app.mongodb:
+            config = current_app.mongodb.get_bot_config(current_user.user_id, symbol)
+            if config:
+                config.is_active = False
+                current_app.mongodb.save_bot_config(config)
+            current_app.dashboard_cache.invalidate(current_user.user_id, "bot_configs")
+        return jsonify({"success": True})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @api_bp.post("/order")
 @login_required
 def place_order():
@@ -151,13 +503,29 @@ def place_order():
         side = data.get("side", "BUY")
         quantity = float(data.get("quantity", 0.01))
         
-        binance_client = current_app.binance
-        
+        binance_client = user_client()
+
+        # Pre-trade risk check against the engine's exposure counters; the price is the
+        # last published mark when there is one, so the check adds no request
+        user_id = current_user.user_id
+        mark = current_app.engine.marks(user_id)["prices"].get(symbol)
+        verdict = current_app.engine.check_order(user_id, symbol, side, quantity,
+                                                 mark or current_app.binance.get_current_price(symbol))
+        if not verdict["allowed"]:
+            return jsonify({"error": verdict["error"], "limit": verdict["limit"]}), 403
+        reservation = verdict["reservation"]
+
         # Place order
-        result = binance_client.place_market_order(symbol, side, quantity)
+        try:
+            result = binance_client.place_market_order(symbol, side, quantity)
+        except Exception:
+            current_app.engine.release_order(reservation)
+            raise
         
         # Save trade to MongoDB if available
-        if current_app.mongodb and current_user.is_authenticated:
+        if not current_app.mongodb:
+            current_app.engine.release_order(reservation)
+        elif current_user.is_authenticated:
             trade = Trade(
                 user_id=current_user.user_id,
                 symbol=symbol,
@@ -171,11 +539,10 @@ def place_order():
             current_app.mongodb.save_trade(trade)
             
             # Update portfolio
-            if current_app.portfolio:
-                from .services.portfolio import Trade as PortfolioTrade
-                ts_ms = int(time.time() * 1000)
-                p_trade = PortfolioTrade(symbol=symbol, side=side, quantity=quantity, price=trade.price, timestamp=ts_ms, order_id=trade.order_id)
-                current_app.portfolio.add_trade(p_trade)
+            ts_ms = int(time.time() * 1000)
+            current_app.engine.record_trade(dict(symbol=symbol, side=side, quantity=quantity, price=trade.price,
+                                                 timestamp=ts_ms, order_id=trade.order_id), user_id, reservation)
+        current_app.dashboard_cache.invalidate(user_id)
         
         return jsonify(result)
     except Exception as e:
@@ -192,6 +559,7 @@ def get_portfolio():
         
         # Get portfolio summary from MongoDB
         summary = current_app.mongodb.get_user_portfolio_summary(current_user.user_id)
+        summary = marked_summary(summary["positions"], current_user.user_id)
         
         # Get trade statistics
         stats = current_app.mongodb.get_user_trade_stats(current_user.user_id)
@@ -205,6 +573,84 @@ def get_portfolio():
         return jsonify({"error": str(e)}), 500
 
 
+@api_bp.get("/dashboard-snapshot")
+@login_required
+def dashboard_snapshot():
+    """Status, portfolio, trades, balances, bot configs and analytics in one response"""
+    try:
+        user_id = current_user.user_id
+        db = current_app.mongodb
+        client = user_client()
+        engine = current_app.engine
+        limit = min(max(request.args.get("trades_limit", SNAPSHOT_TRADES, type=int), 1), SNAPSHOT_TRADES)
+
+        # Everything the fetchers need is bound here: they run on the cache's pool threads,
+        # outside the request context
+        sections = {
+            "status": (None, engine.status),
+            "balances": (user_id, client.get_account_info),
+            "analytics": (user_id, lambda: engine.analytics_summary(user_id, False)),
+        }
+        if db:
+            sections.update({
+                "positions": (user_id, lambda: db.get_user_portfolio_summary(user_id)["positions"]),
+                "stats": (user_id, lambda: db.get_user_trade_stats(user_id)),
+                "trades": (user_id, lambda: [t.to_dict() for t in db.get_user_trades(user_id, SNAPSHOT_TRADES, 0)]),
+                "bot_configs": (user_id, lambda: [c.to_dict() for c in db.get_user_bot_configs(user_id)]),
+            })
+        snapshot = current_app.dashboard_cache.snapshot(sections)
+        if not db:
+            snapshot["errors"].update({s: "Database not available" for s in ("positions", "stats", "trades", "bot_configs")})
+
+        status = dict(snapshot["status"] or {})
+        status["dry_run"] = client.dry_run
+        positions = snapshot.get("positions")
+        trades = snapshot.get("trades")
+        return jsonify({
+            "status": status,
+            "portfolio": {
+                "summary": (marked_summary(positions or [], user_id, snapshot["analytics"])
+                            if positions is not None else None),
+                "stats": snapshot.get("stats"),
+            },
+            "trades": trades[:limit] if trades is not None else None,
+            "balances": snapshot["balances"],
+            "bot_configs": snapshot.get("bot_configs"),
+            "analytics": snapshot["analytics"],
+            "age": snapshot["age"],
+            "errors": snapshot["errors"],
+            "user_id": user_id,
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.get("/risk")
+@login_required
+def get_risk():
+    """Get the user's exposure as seen by the pre-trade risk checks"""
+    try:
+        return jsonify(current_app.engine.exposure(current_user.user_id))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.get("/analytics")
+@login_required
+def get_analytics():
+    """Get the user's equity curve, drawdown, win rate and Sharpe/Sortino"""
+    try:
+        curve = request.args.get("curve", "1") != "0"
+        analytics = current_app.engine.analytics_summary(current_user.user_id, curve)
+        # Open positions at the last published marks; realized figures come from the engine
+        marks = current_app.engine.marks(current_user.user_id)
+        analytics["unrealized_pnl"] = sum(row["unrealized_pnl"] or 0 for row in marks["positions"])
+        analytics["total_pnl"] = analytics["realized_pnl"] + analytics["unrealized_pnl"]
+        return jsonify(analytics)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @api_bp.get("/trades")
 @login_required
 def get_trades():
@@ -226,11 +672,59 @@ def get_trades():
         return jsonify({"error": str(e)}), 500
 
 
+@api_bp.get("/trade-export")
+@login_required
+def export_trades():
+    """Stream the user's whole trade history as CSV or Parquet"""
+    try:
+        from .services.trade_bulk import export_trades as stream_trades, EXPORT_FORMATS
+        if not current_app.mongodb:
+            return jsonify({"error": "Database not available"}), 500
+        fmt = request.args.get("format", "csv")
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({"error": f"format must be one of {EXPORT_FORMATS}"}), 400
+        start = request.args.get("start", type=int)
+        end = request.args.get("end", type=int)
+
+        stream = stream_trades(current_app.mongodb, current_user.user_id, fmt, start, end)
+        mimetype = "text/csv" if fmt == "csv" else "application/vnd.apache.parquet"
+        return Response(stream_with_context(stream), mimetype=mimetype, headers={
+            "Content-Disposition": f"attachment; filename=trades.{fmt}"
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@api_bp.post("/trade-import")
+@login_required
+def import_trades():
+    """Bulk import an uploaded CSV or Parquet trade dump into the user's history"""
+    try:
+        from .services.trade_bulk import import_trades as load_trades, IMPORT_FORMATS
+        if not current_app.mongodb:
+            return jsonify({"error": "Database not available"}), 500
+        upload = request.files.get("file")
+        if not upload:
+            return jsonify({"error": "file is required"}), 400
+        fmt = request.args.get("format") or ("parquet" if upload.filename.endswith(".parquet") else "csv")
+        if fmt not in IMPORT_FORMATS:
+            return jsonify({"error": f"format must be one of {IMPORT_FORMATS}"}), 400
+
+        result = load_trades(current_app.mongodb, current_user.user_id, upload.stream, fmt)
+        if result["inserted"]:
+            # Imported trades may predate what analytics and exposure were built from
+            current_app.engine.trades_imported(current_user.user_id)
+            current_app.dashboard_cache.invalidate(current_user.user_id)
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @api_bp.get("/balances")
 def get_balances():
     """Get account balances"""
     try:
-        binance_client = current_app.binance
+        binance_client = user_client()
         balances = binance_client.get_account_info()
         return jsonify(balances)
     except Exception as e:
@@ -271,10 +765,12 @@ def save_bot_config():
             quantity=float(data.get("quantity")),
             is_active=data.get("is_active", False),
             dry_run=data.get("dry_run", True),
-            bot_type=data.get("bot_type", "THRESHOLD")
+            bot_type=data.get("bot_type", "THRESHOLD"),
+            params=data.get("params")
         )
         
         config_id = current_app.mongodb.save_bot_config(config)
+        current_app.dashboard_cache.invalidate(current_user.user_id, "bot_configs")
         
         return jsonify({
             "success": True,
@@ -294,6 +790,7 @@ def delete_bot_config(symbol):
             return jsonify({"error": "Database not available"}), 500
         
         success = current_app.mongodb.delete_bot_config(current_user.user_id, symbol)
+        current_app.dashboard_cache.invalidate(current_user.user_id, "bot_configs")
         
         if success:
             return jsonify({
@@ -1,5 +1,6 @@
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from flask import redirect, url_for, flash, request
+from flask import redirect, url_for, flash, request, jsonify, current_app
+from functools import wraps
 from typing import Optional
 from datetime import datetime
 
@@ -7,6 +8,24 @@ from ..models.user import User
 from ..database.mongodb import MongoDB
 
 
+def is_admin() -> bool:
+    """Whether the current user is listed in ADMIN_USERS"""
+    try:
+        return bool(current_user.is_authenticated and current_user.username in current_app.config.get("ADMIN_USERS", set()))
+    except Exception:
+        return False
+
+
+def admin_required(f):
+    """Decorator restricting a route to admin users"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not is_admin():
+            return jsonify({"error": "Admin access required"}), 403
+        return f(*args, **kwargs)
+    return decorated
+
+
 class AuthManager:
     def __init__(self, app, db: MongoDB):
         self.app = app
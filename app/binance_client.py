@@ -1,25 +1,76 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
+import threading
 import time
 
-from binance.spot import Spot
+from .monitoring.metrics import InstrumentedClient, BINANCE_LATENCY, BINANCE_ERRORS
 
 
 class BinanceClient:
     def __init__(self, api_key: str, api_secret: str, base_url: str, dry_run: bool = True):
         self.dry_run = dry_run
-        self.client = Spot(api_key=api_key, api_secret=api_secret, base_url=base_url)
+        self._credentials = (api_key, api_secret, base_url)
+        self._client: Optional[InstrumentedClient] = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> InstrumentedClient:
+        """Spot client, built (and binance-connector imported) on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from binance.spot import Spot
+                    api_key, api_secret, base_url = self._credentials
+                    # Every Spot call is timed into the binance_request_duration_seconds histogram
+                    self._client = InstrumentedClient(
+                        Spot(api_key=api_key, api_secret=api_secret, base_url=base_url),
+                        BINANCE_LATENCY,
+                        BINANCE_ERRORS,
+                    )
+        return self._client
 
     def set_dry_run(self, dry_run: bool) -> None:
         self.dry_run = bool(dry_run)
 
+    def close(self) -> None:
+        """Release the underlying HTTP session's connections."""
+        if self._client is not None:
+            self._client.session.close()
+
     def get_price(self, symbol: str) -> float:
         data = self.client.ticker_price(symbol=symbol)
         return float(data["price"])
 
+    def get_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Prices for many symbols with one ticker request."""
+        if not symbols:
+            return {}
+        try:
+            data = self.client.ticker_price(symbols=list(symbols))
+        except Exception:
+            # One unknown symbol fails the whole batch; price the rest one by one
+            prices = {}
+            for symbol in symbols:
+                try:
+                    prices[symbol] = self.get_price(symbol)
+                except Exception:
+                    continue
+            return prices
+        return {row["symbol"]: float(row["price"]) for row in data}
+
     # Backward-compat alias used by API routes
     def get_current_price(self, symbol: str) -> float:
         return self.get_price(symbol)
 
+    def get_klines(self, symbol: str, interval: str, start_time: Optional[int] = None,
+                   end_time: Optional[int] = None, limit: int = 1000) -> List[List[Any]]:
+        """Raw kline rows: [open_time, open, high, low, close, volume, close_time, ...]"""
+        params: Dict[str, Any] = {"limit": limit}
+        if start_time is not None:
+            params["startTime"] = int(start_time)
+        if end_time is not None:
+            params["endTime"] = int(end_time)
+        return self.client.klines(symbol=symbol, interval=interval, **params)
+
     def get_exchange_info(self):
         """Return list of trading symbols or raw exchange info.
 
@@ -12,7 +12,82 @@ class Config:
     ORDER_QUANTITY = float(os.getenv("ORDER_QUANTITY", "0.01"))
     DRY_RUN = os.getenv("DRY_RUN", "true").lower() == "true"
 
+    # Serve requests before MongoDB answers; connection and index builds happen in the background
+    DEFERRED_STARTUP = os.getenv("DEFERRED_STARTUP", "true").lower() == "true"
+    MONGODB_TIMEOUT_MS = int(os.getenv("MONGODB_TIMEOUT_MS", "5000"))
+
+    # Trade/price writes spill to this journal after MONGO_BREAKER_FAILURES consecutive
+    # connection errors; a write is retried against MongoDB every MONGO_BREAKER_RESET seconds
+    MONGO_SPOOL_PATH = os.getenv("MONGO_SPOOL_PATH", os.path.join("data", "mongo_spool.jsonl"))
+    MONGO_BREAKER_FAILURES = int(os.getenv("MONGO_BREAKER_FAILURES", "3"))
+    MONGO_BREAKER_RESET = float(os.getenv("MONGO_BREAKER_RESET", "30"))
+
+    # Per-user Binance clients: max open clients and idle seconds before eviction
+    BINANCE_POOL_SIZE = int(os.getenv("BINANCE_POOL_SIZE", "256"))
+    BINANCE_CLIENT_TTL = float(os.getenv("BINANCE_CLIENT_TTL", "1800"))
+
+    # Background trade persistence pipeline
+    TRADE_QUEUE_SIZE = int(os.getenv("TRADE_QUEUE_SIZE", "10000"))
+    TRADE_BATCH_SIZE = int(os.getenv("TRADE_BATCH_SIZE", "100"))
+    TRADE_FLUSH_INTERVAL = float(os.getenv("TRADE_FLUSH_INTERVAL", "0.5"))
+
+    # Restart active bot_configs at startup; bot state is checkpointed every BOT_CHECKPOINT_INTERVAL seconds
+    RESUME_BOTS = os.getenv("RESUME_BOTS", "true").lower() == "true"
+    BOT_CHECKPOINT_INTERVAL = float(os.getenv("BOT_CHECKPOINT_INTERVAL", "1.0"))
+    # Seconds an engine bot is skipped after a rejected or failed order, doubling up to BOT_MAX_BACKOFF
+    BOT_RETRY_BACKOFF = float(os.getenv("BOT_RETRY_BACKOFF", "5"))
+    BOT_MAX_BACKOFF = float(os.getenv("BOT_MAX_BACKOFF", "300"))
+
+    # Pre-trade risk limits per user (0 disables); RISK_SYMBOL_MAX_QTY is e.g. "BTCUSDT=0.5,ETHUSDT=10"
+    RISK_MAX_ORDER_NOTIONAL = float(os.getenv("RISK_MAX_ORDER_NOTIONAL", "0"))
+    RISK_MAX_POSITION_NOTIONAL = float(os.getenv("RISK_MAX_POSITION_NOTIONAL", "0"))
+    RISK_MAX_USER_NOTIONAL = float(os.getenv("RISK_MAX_USER_NOTIONAL", "0"))
+    RISK_MAX_DAILY_LOSS = float(os.getenv("RISK_MAX_DAILY_LOSS", "0"))
+    RISK_SYMBOL_MAX_QTY = os.getenv("RISK_SYMBOL_MAX_QTY", "")
+    RISK_BLOCK_OVERSELL = os.getenv("RISK_BLOCK_OVERSELL", "true").lower() == "true"
+
+    # Seconds between mark-to-market runs pricing every open position
+    MTM_INTERVAL = float(os.getenv("MTM_INTERVAL", "5"))
+
+    # Per-user performance analytics: seconds between writes to user_analytics, equity curve points kept
+    ANALYTICS_FLUSH_INTERVAL = float(os.getenv("ANALYTICS_FLUSH_INTERVAL", "5"))
+    ANALYTICS_MAX_DAYS = int(os.getenv("ANALYTICS_MAX_DAYS", "365"))
+
+    # Days of ticks kept in the hot CSV tier before moving to archive partitions
+    PRICE_HOT_DAYS = int(os.getenv("PRICE_HOT_DAYS", "1"))
+    # Seconds between archive runs (0 disables the job) and days of archive kept (0 keeps everything)
+    PRICE_ARCHIVE_INTERVAL = float(os.getenv("PRICE_ARCHIVE_INTERVAL", "3600"))
+    PRICE_RETENTION_DAYS = int(os.getenv("PRICE_RETENTION_DAYS", "0"))
+    # Seconds a /api/price-history window is reused before storage is read again
+    PRICE_WINDOW_TTL = float(os.getenv("PRICE_WINDOW_TTL", "1"))
+
+    # Request weight budget shared by kline backfill workers
+    BACKFILL_WEIGHT_PER_MINUTE = int(os.getenv("BACKFILL_WEIGHT_PER_MINUTE", "1200"))
+    BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", "4"))
+    GAP_THRESHOLD_SECONDS = int(os.getenv("GAP_THRESHOLD_SECONDS", "300"))
+    GAP_FILL_INTERVAL = os.getenv("GAP_FILL_INTERVAL", "1m")
+    KLINE_OPEN_TTL = float(os.getenv("KLINE_OPEN_TTL", "5"))
+
+    # Live candles aggregated from ticks: intervals built and seconds between writes of closed bars
+    CANDLE_INTERVALS = os.getenv("CANDLE_INTERVALS", "1s,1m,5m")
+    CANDLE_FLUSH_INTERVAL = float(os.getenv("CANDLE_FLUSH_INTERVAL", "5"))
+
+    # /api/dashboard-snapshot: per-section cache TTLs in seconds and fetch threads
+    DASHBOARD_TTLS = os.getenv("DASHBOARD_TTLS", "")
+    DASHBOARD_WORKERS = int(os.getenv("DASHBOARD_WORKERS", "8"))
+
+    # "local" runs bots inside the web process; "remote" talks to bot_worker.py
+    BOT_ENGINE = os.getenv("BOT_ENGINE", "local").lower()
+    BOT_ENGINE_SOCKET = os.getenv("BOT_ENGINE_SOCKET", os.path.join("data", "bot_engine.sock"))
+    # Required with BOT_ENGINE=remote: anyone holding it can send commands to the engine socket
+    BOT_ENGINE_AUTHKEY = os.getenv("BOT_ENGINE_AUTHKEY", "")
+    BOT_ENGINE_SNAPSHOT = os.getenv("BOT_ENGINE_SNAPSHOT", os.path.join("data", "bot_engine_snapshot.json"))
+    BOT_ENGINE_SNAPSHOT_INTERVAL = float(os.getenv("BOT_ENGINE_SNAPSHOT_INTERVAL", "1.0"))
+
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*")
 
+    # Comma-separated usernames allowed to use the /admin profiling endpoints
+    ADMIN_USERS = {u.strip() for u in os.getenv("ADMIN_USERS", "").split(",") if u.strip()}
+
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", "5000"))
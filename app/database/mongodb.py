@@ -1,47 +1,199 @@
-from pymongo import MongoClient
-from pymongo.database import Database
-from pymongo.collection import Collection
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Tuple, TYPE_CHECKING
 import os
+import threading
+import time
+import uuid
 from datetime import datetime
 
 from ..models.user import User
 from ..models.trade import Trade
 from ..models.bot_config import BotConfig
+from ..monitoring.metrics import observed, MONGO_LATENCY, MONGO_ERRORS, MONGO_SPOOL, MONGO_CIRCUIT_OPEN
+from .write_spool import CircuitBreaker, WriteSpool
+
+if TYPE_CHECKING:
+    from pymongo import MongoClient
+    from pymongo.database import Database
+    from pymongo.collection import Collection
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Errors meaning the server is unreachable or slow, as opposed to a rejected write."""
+    from pymongo.errors import ConnectionFailure, ExecutionTimeout, WTimeoutError
+    return isinstance(exc, (ConnectionFailure, ExecutionTimeout, WTimeoutError))
 
 
 class MongoDB:
-    def __init__(self, connection_string: str = None, database_name: str = "rnn_crypto"):
+    def __init__(self, connection_string: str = None, database_name: str = "rnn_crypto",
+                 timeout_ms: Optional[int] = None):
         self.connection_string = connection_string or os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
         self.database_name = database_name
-        self.client: Optional[MongoClient] = None
-        self.db: Optional[Database] = None
+        # Server selection timeout; pymongo's default is 30s
+        self.timeout_ms = timeout_ms
+        self.client: Optional["MongoClient"] = None
+        self.db: Optional["Database"] = None
         
         # Collections
-        self.users: Optional[Collection] = None
-        self.trades: Optional[Collection] = None
-        self.bot_configs: Optional[Collection] = None
-        self.prices: Optional[Collection] = None
+        self.users: Optional["Collection"] = None
+        self.trades: Optional["Collection"] = None
+        self.bot_configs: Optional["Collection"] = None
+        self.prices: Optional["Collection"] = None
+        self.user_analytics: Optional["Collection"] = None
+
+        # Set once the server answered and indexes exist
+        self.ready = threading.Event()
+        self.last_error: Optional[str] = None
+        self._ready_callbacks: List[Callable[[], None]] = []
+        # Makes "not ready yet, queue it" and "set ready, take the queue" atomic
+        self._ready_lock = threading.Lock()
+
+        # Write circuit breaker and local journal, see enable_spool()
+        self.breaker: Optional[CircuitBreaker] = None
+        self.spool: Optional[WriteSpool] = None
+        self._replay_lock = threading.Lock()
         
-    def connect(self) -> None:
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "connect")
+    def connect(self, create_indexes: bool = True) -> None:
         """Connect to MongoDB"""
         try:
-            self.client = MongoClient(self.connection_string)
-            self.db = self.client[self.database_name]
-            
-            # Initialize collections
-            self.users = self.db.users
-            self.trades = self.db.trades
-            self.bot_configs = self.db.bot_configs
-            self.prices = self.db.prices
+            self._open_client()
             
             # Create indexes
-            self._create_indexes()
+            if create_indexes:
+                self._create_indexes()
+                self._mark_ready()
             
             print(f"Connected to MongoDB: {self.database_name}")
         except Exception as e:
             print(f"Failed to connect to MongoDB: {e}")
             raise
+
+    def _open_client(self) -> None:
+        """Create the client and collection handles; pymongo connects lazily, so this never blocks."""
+        from pymongo import MongoClient
+        kwargs = {"serverSelectionTimeoutMS": self.timeout_ms} if self.timeout_ms else {}
+        self.client = MongoClient(self.connection_string, **kwargs)
+        self.db = self.client[self.database_name]
+
+        # Initialize collections
+        self.users = self.db.users
+        self.trades = self.db.trades
+        self.bot_configs = self.db.bot_configs
+        self.prices = self.db.prices
+        self.user_analytics = self.db.user_analytics
+
+    def connect_in_background(self, retry_interval: float = 5.0) -> threading.Thread:
+        """Open the client now and build indexes on a background thread, retrying until Mongo answers."""
+        self._open_client()
+
+        def _prepare():
+            while not self.ready.is_set():
+                try:
+                    self.client.admin.command("ping")
+                    self._create_indexes()
+                    self.last_error = None
+                    print(f"✅ MongoDB ready: {self.database_name}")
+                    self._mark_ready()
+                except Exception as e:
+                    self.last_error = str(e)
+                    print(f"Warning: MongoDB not ready, retrying in {retry_interval}s: {e}")
+                    time.sleep(retry_interval)
+
+        thread = threading.Thread(target=_prepare, daemon=True, name="mongodb-connect")
+        thread.start()
+        return thread
+
+    def enable_spool(self, path: str, failure_threshold: int = 3, reset_timeout: float = 30.0) -> None:
+        """Guard trade and price writes with a circuit breaker spilling to a local journal.
+
+        After ``failure_threshold`` consecutive connection failures writes
+        stop touching the network and are appended to ``path`` instead;
+        the journal is replayed once a probe write succeeds (and at
+        startup), deduplicated by order_id for trades and by
+        symbol+timestamp for prices.
+        """
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.spool = WriteSpool(path)
+        self.on_ready(self.replay_spool_async)
+
+    def _guarded_write(self, operation: str, kind: str, docs: List[Dict[str, Any]], write: Callable[[], Any],
+                       spooled_result: Any = None) -> Any:
+        """Run ``write`` unless the circuit is open; on an outage journal ``docs`` instead of raising."""
+        if self.spool is None:
+            return write()
+        if not self.breaker.allow():
+            MONGO_SPOOL.inc(kind, "spooled", amount=self.spool.append(kind, docs))
+            return spooled_result
+        try:
+            result = write()
+        except Exception as e:
+            if not _is_transient(e):
+                raise
+            MONGO_ERRORS.inc(operation)
+            if self.breaker.record_failure():
+                MONGO_CIRCUIT_OPEN.set(1)
+                print(f"Warning: MongoDB writes failing, spooling to {self.spool.path}: {e}")
+            MONGO_SPOOL.inc(kind, "spooled", amount=self.spool.append(kind, docs))
+            return spooled_result
+        if self.breaker.record_success():
+            MONGO_CIRCUIT_OPEN.set(0)
+            print("✅ MongoDB writes recovered, replaying spool")
+            self.replay_spool_async()
+        return result
+
+    def replay_spool(self, batch_size: int = 1000) -> Dict[str, int]:
+        """Write journaled records back to MongoDB; safe to repeat after a partial run."""
+        replayed = {"trade": 0, "price": 0}
+        if self.spool is None or not self._replay_lock.acquire(blocking=False):
+            return replayed
+        try:
+            for path in self.spool.claim():
+                for batch in self.spool.read(path, batch_size):
+                    trades = [Trade.from_dict(doc) for kind, doc in batch if kind == "trade"]
+                    prices = [doc for kind, doc in batch if kind == "price"]
+                    if trades:
+                        self._upsert_trades(trades)
+                    if prices:
+                        self._upsert_price_points(prices)
+                    replayed["trade"] += len(trades)
+                    replayed["price"] += len(prices)
+                self.spool.release(path)
+        except Exception as e:
+            # Claimed files stay on disk and are retried by the next replay
+            print(f"Warning: MongoDB spool replay stopped: {e}")
+        finally:
+            self._replay_lock.release()
+        for kind, count in replayed.items():
+            if count:
+                MONGO_SPOOL.inc(kind, "replayed", amount=count)
+        return replayed
+
+    def replay_spool_async(self) -> None:
+        if self.spool is not None and self.spool.pending_bytes():
+            threading.Thread(target=self.replay_spool, daemon=True, name="mongodb-spool-replay").start()
+
+    def spool_status(self) -> Optional[Dict[str, Any]]:
+        if self.spool is None:
+            return None
+        return {"circuit": self.breaker.state, "pending_bytes": self.spool.pending_bytes()}
+
+    def on_ready(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` once the database is ready (immediately if it already is)."""
+        with self._ready_lock:
+            if not self.ready.is_set():
+                self._ready_callbacks.append(callback)
+                return
+        callback()
+
+    def _mark_ready(self) -> None:
+        with self._ready_lock:
+            self.ready.set()
+            callbacks, self._ready_callbacks = self._ready_callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in MongoDB ready callback: {e}")
     
     def _create_indexes(self) -> None:
         """Create database indexes for better performance"""
@@ -53,14 +205,19 @@ class MongoDB:
         self.trades.create_index([("user_id", 1), ("timestamp", -1)])
         self.trades.create_index([("user_id", 1), ("symbol", 1)])
         self.trades.create_index("order_id", unique=True, sparse=True)
+        self.trades.create_index("timestamp")
         
         # Bot configs collection indexes
         self.bot_configs.create_index([("user_id", 1), ("symbol", 1)], unique=True)
         self.bot_configs.create_index([("user_id", 1), ("is_active", 1)])
+        self.bot_configs.create_index("is_active")
 
         # Prices collection indexes
         self.prices.create_index([("symbol", 1), ("timestamp", 1)])
         self.prices.create_index("timestamp")
+
+        # One running-aggregates document per user
+        self.user_analytics.create_index("user_id", unique=True)
     
     def disconnect(self) -> None:
         """Disconnect from MongoDB"""
@@ -68,6 +225,7 @@ class MongoDB:
             self.client.close()
     
     # User operations
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "create_user")
     def create_user(self, user: User) -> str:
         """Create a new user"""
         user_data = user.to_dict()
@@ -75,6 +233,7 @@ class MongoDB:
         user.user_id = str(result.inserted_id)
         return user.user_id
     
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_user_by_username")
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username"""
         user_data = self.users.find_one({"username": username})
@@ -82,6 +241,7 @@ class MongoDB:
             return User.from_dict(user_data)
         return None
     
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_user_by_email")
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
         user_data = self.users.find_one({"email": email})
@@ -89,6 +249,7 @@ class MongoDB:
             return User.from_dict(user_data)
         return None
     
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_user_by_id")
     def get_user_by_id(self, user_id: str) -> Optional[User]:
         """Get user by ID"""
         from bson import ObjectId
@@ -97,6 +258,7 @@ class MongoDB:
             return User.from_dict(user_data)
         return None
     
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "update_user")
     def update_user(self, user_id: str, updates: Dict[str, Any]) -> bool:
         """Update user data"""
         from bson import ObjectId
@@ -107,37 +269,105 @@ class MongoDB:
         return result.modified_count > 0
     
     # Trade operations
-    def save_trade(self, trade: Trade) -> str:
-        """Save a new trade"""
-        trade_data = trade.to_dict()
-        result = self.trades.insert_one(trade_data)
-        trade.trade_id = str(result.inserted_id)
-        return trade.trade_id
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "save_trade")
+    def save_trade(self, trade: Trade) -> Optional[str]:
+        """Save a new trade (returns None if it was spooled)"""
+        if self.spool is not None and trade.order_id is None:
+            # Spooled trades replay as upserts on order_id, so they need one
+            trade.order_id = f"local-{uuid.uuid4().hex}"
+
+        def write():
+            result = self.trades.insert_one(trade.to_dict())
+            trade.trade_id = str(result.inserted_id)
+            return trade.trade_id
+        return self._guarded_write("save_trade", "trade", [trade.to_dict()], write)
     
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "save_trades")
+    def save_trades(self, trades: List[Trade]) -> int:
+        """Idempotently save a batch of trades keyed by order_id.
+
+        Uses upserts with $setOnInsert so replaying a batch after a
+        partial failure never duplicates or overwrites a trade.
+        Returns the number of newly inserted trades.
+        """
+        if not trades:
+            return 0
+        if any(trade.order_id is None for trade in trades):
+            raise ValueError("save_trades requires every trade to carry an order_id")
+        return self._guarded_write("save_trades", "trade", [trade.to_dict() for trade in trades],
+                                   lambda: self._upsert_trades(trades), spooled_result=0)
+
+    def _upsert_trades(self, trades: List[Trade]) -> int:
+        from pymongo import UpdateOne
+        ops = [UpdateOne({"order_id": trade.order_id}, {"$setOnInsert": trade.to_dict()}, upsert=True)
+               for trade in trades]
+        result = self.trades.bulk_write(ops, ordered=False)
+        for index, upserted_id in result.upserted_ids.items():
+            trades[index].trade_id = str(upserted_id)
+        return result.upserted_count
+
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_user_trades")
     def get_user_trades(self, user_id: str, limit: int = 100, skip: int = 0) -> List[Trade]:
         """Get trades for a specific user"""
         cursor = self.trades.find({"user_id": user_id}).sort("timestamp", -1).skip(skip).limit(limit)
         return [Trade.from_dict(trade_data) for trade_data in cursor]
     
+    def iter_user_trades(self, user_id: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+                         batch_size: int = 5000):
+        """Stream a user's trades oldest first through a server-side cursor"""
+        query: Dict[str, Any] = {"user_id": user_id}
+        if start_ms is not None or end_ms is not None:
+            query["timestamp"] = {}
+            if start_ms is not None:
+                query["timestamp"]["$gte"] = datetime.utcfromtimestamp(start_ms / 1000)
+            if end_ms is not None:
+                query["timestamp"]["$lte"] = datetime.utcfromtimestamp(end_ms / 1000)
+        return self.trades.find(query, {"_id": 0}).sort("timestamp", 1).batch_size(batch_size)
+
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "insert_trades_ignore_duplicates")
+    def insert_trades_ignore_duplicates(self, docs: List[Dict[str, Any]]) -> Tuple[int, List[str]]:
+        """Unordered insert_many skipping order_ids that already exist.
+
+        Returns the number inserted and the skipped order_ids whose existing
+        trade belongs to another user: conflicts rather than duplicates.
+        """
+        from pymongo.errors import BulkWriteError
+        try:
+            return len(self.trades.insert_many(docs, ordered=False).inserted_ids), []
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in errors):
+                raise
+            skipped = {docs[error["index"]]["order_id"]: docs[error["index"]]["user_id"] for error in errors}
+            existing = self.trades.find({"order_id": {"$in": list(skipped)}}, {"order_id": 1, "user_id": 1, "_id": 0})
+            conflicts = [doc["order_id"] for doc in existing if doc.get("user_id") != skipped[doc["order_id"]]]
+            return e.details.get("nInserted", 0), conflicts
+
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_trades_by_symbol")
     def get_trades_by_symbol(self, user_id: str, symbol: str, limit: int = 100) -> List[Trade]:
         """Get trades for a specific symbol and user"""
         cursor = self.trades.find({"user_id": user_id, "symbol": symbol}).sort("timestamp", -1).limit(limit)
         return [Trade.from_dict(trade_data) for trade_data in cursor]
     
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_trades_by_type")
     def get_trades_by_type(self, user_id: str, trade_type: str, limit: int = 100) -> List[Trade]:
         """Get trades by type (MANUAL, BOT_THRESHOLD, etc.)"""
         cursor = self.trades.find({"user_id": user_id, "trade_type": trade_type}).sort("timestamp", -1).limit(limit)
         return [Trade.from_dict(trade_data) for trade_data in cursor]
     
     # Bot config operations
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "save_bot_config")
     def save_bot_config(self, config: BotConfig) -> str:
         """Save or update bot configuration"""
         config_data = config.to_dict()
+        # Saving settings must not wipe the bot's runtime checkpoint
+        if config_data.get("state") is None:
+            config_data.pop("state", None)
         
         # Use upsert to create or update
-        result = self.bot_configs.replace_one(
+        result = self.bot_configs.update_one(
             {"user_id": config.user_id, "symbol": config.symbol},
-            config_data,
+            {"$set": config_data},
             upsert=True
         )
         
@@ -145,6 +375,7 @@ class MongoDB:
             config.config_id = str(result.upserted_id)
         return config.config_id or "updated"
     
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_bot_config")
     def get_bot_config(self, user_id: str, symbol: str) -> Optional[BotConfig]:
         """Get bot configuration for user and symbol"""
         config_data = self.bot_configs.find_one({"user_id": user_id, "symbol": symbol})
@@ -152,22 +383,43 @@ class MongoDB:
             return BotConfig.from_dict(config_data)
         return None
     
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_user_bot_configs")
     def get_user_bot_configs(self, user_id: str) -> List[BotConfig]:
         """Get all bot configurations for a user"""
         cursor = self.bot_configs.find({"user_id": user_id})
         return [BotConfig.from_dict(config_data) for config_data in cursor]
     
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_active_bot_configs")
     def get_active_bot_configs(self, user_id: str) -> List[BotConfig]:
         """Get active bot configurations for a user"""
         cursor = self.bot_configs.find({"user_id": user_id, "is_active": True})
         return [BotConfig.from_dict(config_data) for config_data in cursor]
     
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_all_active_bot_configs")
+    def get_all_active_bot_configs(self) -> List[BotConfig]:
+        """Get active bot configurations of every user in one query (used to resume bots)"""
+        cursor = self.bot_configs.find({"is_active": True})
+        return [BotConfig.from_dict(config_data) for config_data in cursor]
+
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "save_bot_states")
+    def save_bot_states(self, states: List[Tuple[str, str, Dict[str, Any]]]) -> int:
+        """Checkpoint runtime state for (user_id, symbol, state) entries in one bulk write"""
+        if not states:
+            return 0
+        from pymongo import UpdateOne
+        now = datetime.utcnow()
+        ops = [UpdateOne({"user_id": user_id, "symbol": symbol}, {"$set": {"state": state, "state_updated_at": now}})
+               for user_id, symbol, state in states]
+        return self.bot_configs.bulk_write(ops, ordered=False).modified_count
+    
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "delete_bot_config")
     def delete_bot_config(self, user_id: str, symbol: str) -> bool:
         """Delete bot configuration"""
         result = self.bot_configs.delete_one({"user_id": user_id, "symbol": symbol})
         return result.deleted_count > 0
     
     # Analytics operations
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_user_portfolio_summary")
     def get_user_portfolio_summary(self, user_id: str) -> Dict[str, Any]:
         """Get portfolio summary for a user"""
         pipeline = [
@@ -185,6 +437,27 @@ class MongoDB:
         positions = list(self.trades.aggregate(pipeline))
         return {"positions": positions}
     
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_all_open_positions")
+    def get_all_open_positions(self) -> List[Dict[str, Any]]:
+        """Net open quantity and buy cost per (user, symbol) across all users"""
+        pipeline = [
+            {"$group": {
+                "_id": {"user_id": "$user_id", "symbol": "$symbol"},
+                "quantity": {"$sum": {"$cond": [{"$eq": ["$side", "BUY"]}, "$quantity", {"$multiply": ["$quantity", -1]}]}},
+                "buy_quantity": {"$sum": {"$cond": [{"$eq": ["$side", "BUY"]}, "$quantity", 0]}},
+                "buy_value": {"$sum": {"$cond": [{"$eq": ["$side", "BUY"]}, {"$multiply": ["$quantity", "$price"]}, 0]}},
+            }},
+            {"$match": {"quantity": {"$gt": 0}}}
+        ]
+        return [{
+            "user_id": row["_id"]["user_id"],
+            "symbol": row["_id"]["symbol"],
+            "quantity": row["quantity"],
+            "buy_quantity": row["buy_quantity"],
+            "buy_value": row["buy_value"],
+        } for row in self.trades.aggregate(pipeline)]
+    
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_user_trade_stats")
     def get_user_trade_stats(self, user_id: str, days: int = 30) -> Dict[str, Any]:
         """Get trading statistics for a user"""
         from datetime import timedelta
@@ -210,17 +483,64 @@ class MongoDB:
         result = list(self.trades.aggregate(pipeline))
         return result[0] if result else {}
 
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_user_analytics_docs")
+    def get_user_analytics_docs(self) -> List[Dict[str, Any]]:
+        """Stored analytics aggregates for every user"""
+        return list(self.user_analytics.find({}, {"_id": 0}))
+
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "save_user_analytics")
+    def save_user_analytics(self, docs: List[Dict[str, Any]]) -> int:
+        """Replace the analytics documents of the given users in one bulk write"""
+        if not docs:
+            return 0
+        from pymongo import ReplaceOne
+        ops = [ReplaceOne({"user_id": doc["user_id"]}, doc, upsert=True) for doc in docs]
+        result = self.user_analytics.bulk_write(ops, ordered=False)
+        return result.modified_count + result.upserted_count
+
+    def iter_trades_since(self, since_ms: Optional[int] = None, batch_size: int = 5000):
+        """Stream every user's trades at or after ``since_ms`` (all if None), oldest first"""
+        query = {}
+        if since_ms is not None:
+            query["timestamp"] = {"$gte": datetime.utcfromtimestamp(since_ms / 1000)}
+        projection = {"_id": 0, "user_id": 1, "symbol": 1, "side": 1, "quantity": 1, "price": 1,
+                      "timestamp": 1, "order_id": 1}
+        return self.trades.find(query, projection).sort("timestamp", 1).batch_size(batch_size)
+
     # Price ticks operations
-    def save_price_point(self, symbol: str, price: float, timestamp: int) -> str:
-        """Insert a single price tick for a symbol."""
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "save_price_point")
+    def save_price_point(self, symbol: str, price: float, timestamp: int) -> Optional[str]:
+        """Insert a single price tick for a symbol (returns None if it was spooled)."""
         doc = {
             "symbol": symbol,
             "timestamp": int(timestamp),
             "price": float(price),
         }
-        result = self.prices.insert_one(doc)
-        return str(result.inserted_id)
+        # insert_one adds _id to the dict it is given, so keep doc JSON-clean for the spool
+        return self._guarded_write("save_price_point", "price", [doc],
+                                   lambda: str(self.prices.insert_one(dict(doc)).inserted_id))
+
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "save_price_points")
+    def save_price_points(self, symbol: str, timestamps, prices) -> int:
+        """Bulk insert price ticks for a symbol from parallel sequences."""
+        docs = [
+            {"symbol": symbol, "timestamp": int(ts), "price": float(price)}
+            for ts, price in zip(timestamps, prices)
+        ]
+        if not docs:
+            return 0
+        return self._guarded_write("save_price_points", "price", docs,
+                                   lambda: len(self.prices.insert_many([dict(d) for d in docs], ordered=False).inserted_ids),
+                                   spooled_result=0)
+
+    def _upsert_price_points(self, docs: List[Dict[str, Any]]) -> int:
+        """Insert ticks not already stored for their symbol+timestamp."""
+        from pymongo import UpdateOne
+        ops = [UpdateOne({"symbol": doc["symbol"], "timestamp": doc["timestamp"]}, {"$setOnInsert": doc}, upsert=True)
+               for doc in docs]
+        return self.prices.bulk_write(ops, ordered=False).upserted_count
 
+    @observed(MONGO_LATENCY, MONGO_ERRORS, "get_price_points_since")
     def get_price_points_since(self, symbol: str, start_timestamp: int) -> List[Dict[str, Any]]:
         """Fetch price points for a symbol since a given timestamp, ascending."""
         cursor = self.prices.find({
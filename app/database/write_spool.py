@@ -0,0 +1,155 @@
+import glob
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures.
+
+    While open every call is refused without touching the network; after
+    ``reset_timeout`` seconds a single caller is let through as a probe
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> bool:
+        """Close the circuit; returns True if it was not closed before."""
+        with self._lock:
+            recovered = self._state != self.CLOSED
+            self._state = self.CLOSED
+            self._failures = 0
+            return recovered
+
+    def record_failure(self) -> bool:
+        """Count a failure; returns True if this call opened the circuit."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (self._state == self.CLOSED and self._failures >= self.failure_threshold):
+                opened = self._state == self.CLOSED
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                return opened
+            return False
+
+
+def _json_default(value):
+    # datetimes (trade timestamps) round-trip through Trade.from_dict as ISO strings
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Cannot spool value of type {type(value).__name__}")
+
+
+class WriteSpool:
+    """Append-only JSON-lines journal of writes MongoDB could not take.
+
+    Each line is ``{"kind": ..., "doc": ...}``. Replay first claims the
+    journal by renaming it to ``<path>.<pid>.replaying`` so new spills go
+    to a fresh file, and removes the claim only after every record in it
+    was written; a replay interrupted half way is simply repeated, which
+    is safe because writers upsert on their natural keys. Claims left by
+    a process that died are taken over by the next replay.
+    """
+
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def append(self, kind: str, docs: List[Dict[str, Any]]) -> int:
+        if not docs:
+            return 0
+        data = "".join(json.dumps({"kind": kind, "doc": doc}, default=_json_default) + "\n" for doc in docs)
+        with self._lock:
+            # One write per call, so concurrent appenders never interleave lines
+            with open(self.path, "a") as f:
+                f.write(data)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+        return len(docs)
+
+    def pending_bytes(self) -> int:
+        total = 0
+        for path in [self.path] + glob.glob(f"{self.path}.*.replaying"):
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def claim(self) -> List[str]:
+        """Take ownership of the live journal plus any orphaned claims."""
+        own = f"{self.path}.{os.getpid()}.replaying"
+        with self._lock:
+            if os.path.exists(self.path) and not os.path.exists(own):
+                try:
+                    os.replace(self.path, own)
+                except FileNotFoundError:
+                    pass  # another process claimed it first
+        claimed = []
+        for path in sorted(glob.glob(f"{self.path}.*.replaying")):
+            pid = path[len(self.path) + 1:-len(".replaying")]
+            if path == own or (pid.isdigit() and not self._pid_alive(int(pid))):
+                claimed.append(path)
+        return claimed
+
+    @staticmethod
+    def read(path: str, batch_size: int = 1000) -> Iterator[List[Tuple[str, Dict[str, Any]]]]:
+        """Yield batches of (kind, doc); a torn last line from a crash is skipped."""
+        batch = []
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                batch.append((record["kind"], record["doc"]))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def release(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
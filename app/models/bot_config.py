@@ -12,7 +12,9 @@ class BotConfig:
     quantity: float
     is_active: bool = False
     dry_run: bool = True
-    bot_type: str = "THRESHOLD"  # THRESHOLD, RNN
+    bot_type: str = "THRESHOLD"  # THRESHOLD, EMA_CROSS, RSI, BOLLINGER, RNN
+    params: Optional[Dict[str, Any]] = None  # Strategy parameters for indicator bot types
+    state: Optional[Dict[str, Any]] = None  # Runtime checkpoint: holding, entry_price, last_order
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     config_id: Optional[str] = None
@@ -46,7 +48,7 @@ class BotConfig:
             data['updated_at'] = datetime.fromisoformat(data['updated_at'].replace('Z', '+00:00'))
         # Keep only known keys
         allowed = {
-            'user_id','symbol','buy_threshold','sell_threshold','quantity','is_active','dry_run','bot_type','created_at','updated_at','config_id'
+            'user_id','symbol','buy_threshold','sell_threshold','quantity','is_active','dry_run','bot_type','params','state','created_at','updated_at','config_id'
         }
         sanitized = {k: v for k, v in data.items() if k in allowed}
         return cls(**sanitized)
@@ -7,7 +7,7 @@ from typing import Optional, Dict, Any
 class User(UserMixin):
     def __init__(self, username: str, email: str, password_hash: str = None, 
                  user_id: str = None, created_at: datetime = None, 
-                 binance_api_key: str = None, binance_api_secret: str = None):
+                 binance_api_key: str = None, binance_api_secret: str = None, dry_run: bool = True):
         self.username = username
         self.email = email
         self.password_hash = password_hash
@@ -15,6 +15,8 @@ class User(UserMixin):
         self.created_at = created_at or datetime.utcnow()
         self.binance_api_key = binance_api_key
         self.binance_api_secret = binance_api_secret
+        # Per-user trading mode; orders are simulated while True
+        self.dry_run = dry_run
 
     def set_password(self, password: str) -> None:
         """Hash and set password"""
@@ -36,7 +38,8 @@ class User(UserMixin):
             'password_hash': self.password_hash,
             'created_at': self.created_at,
             'binance_api_key': self.binance_api_key,
-            'binance_api_secret': self.binance_api_secret
+            'binance_api_secret': self.binance_api_secret,
+            'dry_run': self.dry_run
         }
 
     @classmethod
@@ -49,5 +52,6 @@ class User(UserMixin):
             user_id=str(data['_id']),
             created_at=data.get('created_at'),
             binance_api_key=data.get('binance_api_key'),
-            binance_api_secret=data.get('binance_api_secret')
+            binance_api_secret=data.get('binance_api_secret'),
+            dry_run=data.get('dry_run', True)
         )
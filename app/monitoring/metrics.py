@@ -0,0 +1,293 @@
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, List, Tuple, Optional, Iterable
+
+
+# Latency buckets in seconds, tuned for HTTP/DB/exchange round trips
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _format_labels(labelnames: Tuple[str, ...], labelvalues: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def get(self, *labelvalues: str) -> float:
+        with self._lock:
+            return self._values.get(labelvalues, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labelvalues, value in sorted(items):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """Point-in-time value keyed by label values."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = float(value)
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def get(self, *labelvalues: str) -> float:
+        with self._lock:
+            return self._values.get(labelvalues, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for labelvalues, value in sorted(items):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket latency histogram keyed by label values.
+
+    Observations cost one bisect and a few integer increments under a
+    per-histogram lock; buckets are only made cumulative at render time.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[labelvalues] = series
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labelvalues: str) -> "_Timer":
+        """Context manager observing the elapsed wall time of its block."""
+        return _Timer(self, labelvalues)
+
+    def snapshot(self, *labelvalues: str) -> Optional[Dict[str, float]]:
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                return None
+            return {"count": series[2], "sum": series[1]}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, (list(v[0]), v[1], v[2])) for k, v in self._series.items()]
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bounds = self.buckets + (float("inf"),)
+        for labelvalues, (counts, total, count) in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labelvalues", "_start")
+
+    def __init__(self, histogram: Histogram, labelvalues: Tuple[str, ...]):
+        self._histogram = histogram
+        self._labelvalues = labelvalues
+        self._start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._histogram.observe(time.perf_counter() - self._start, *self._labelvalues)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+BINANCE_LATENCY = REGISTRY.histogram(
+    "binance_request_duration_seconds", "Latency of Binance API calls", ("method",))
+BINANCE_ERRORS = REGISTRY.counter(
+    "binance_request_errors_total", "Failed Binance API calls", ("method",))
+
+MONGO_LATENCY = REGISTRY.histogram(
+    "mongodb_operation_duration_seconds", "Latency of MongoDB operations", ("operation",))
+MONGO_ERRORS = REGISTRY.counter(
+    "mongodb_operation_errors_total", "Failed MongoDB operations", ("operation",))
+MONGO_SPOOL = REGISTRY.counter(
+    "mongodb_spool_records_total", "Writes journaled while MongoDB was unavailable, and replayed", ("kind", "outcome"))
+MONGO_CIRCUIT_OPEN = REGISTRY.gauge(
+    "mongodb_write_circuit_open", "1 while MongoDB writes are being spooled locally")
+
+BOT_ITERATION = REGISTRY.histogram(
+    "bot_iteration_duration_seconds", "Duration of one trading bot loop iteration", ("symbol",))
+BOT_TICK_TO_ORDER = REGISTRY.histogram(
+    "bot_tick_to_order_seconds", "Time from price tick received to order response", ("symbol", "side"))
+BOT_ERRORS = REGISTRY.counter(
+    "bot_iteration_errors_total", "Trading bot loop iterations that raised", ("symbol",))
+BOT_ORDERS = REGISTRY.counter(
+    "bot_orders_total", "Orders placed by trading bots", ("symbol", "side"))
+
+TRADE_QUEUE_DEPTH = REGISTRY.gauge(
+    "trade_writer_queue_depth", "Trade events waiting to be persisted")
+TRADE_WRITES = REGISTRY.counter(
+    "trade_writer_events_total", "Trade events handled by the persistence pipeline", ("outcome",))
+
+RISK_REJECTIONS = REGISTRY.counter(
+    "risk_rejections_total", "Orders rejected by pre-trade risk checks", ("limit",))
+
+DASHBOARD_SECTIONS = REGISTRY.counter(
+    "dashboard_snapshot_sections_total", "Dashboard snapshot sections served from cache, fetched or failed",
+    ("section", "result"))
+
+CANDLES_CLOSED = REGISTRY.counter(
+    "candles_closed_total", "OHLCV bars closed by the tick aggregator", ("interval",))
+CANDLE_LATE_TICKS = REGISTRY.counter(
+    "candle_late_ticks_total", "Ticks dropped because their bar had already closed", ("interval",))
+
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "Latency of Flask routes", ("method", "route", "status"))
+
+
+def observed(histogram: Histogram, errors: Optional[Counter], *labelvalues: str):
+    """Decorator recording call latency and, optionally, raised exceptions."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                if errors is not None:
+                    errors.inc(*labelvalues)
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - start, *labelvalues)
+        return wrapper
+    return decorator
+
+
+class InstrumentedClient:
+    """Proxy timing every method call made on a wrapped API client."""
+
+    def __init__(self, client, histogram: Histogram, errors: Optional[Counter] = None):
+        self._client = client
+        self._histogram = histogram
+        self._errors = errors
+        self._wrapped: Dict[str, object] = {}
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+        wrapped = self._wrapped.get(name)
+        if wrapped is None:
+            wrapped = observed(self._histogram, self._errors, name)(attr)
+            self._wrapped[name] = wrapped
+        return wrapped
+
+
+def init_app(app) -> None:
+    """Record per-route latency for every Flask request."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_latency(response):
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+            HTTP_LATENCY.observe(time.perf_counter() - start, request.method, route, str(response.status_code))
+        return response
@@ -0,0 +1,188 @@
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, List, Any, Optional, Iterable
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def _stats_to_collapsed(stats: pstats.Stats) -> str:
+    """Approximate flamegraph stacks from cProfile caller edges.
+
+    cProfile keeps only caller->callee pairs, so each line is a
+    two-frame stack weighted by inclusive time in microseconds.
+    """
+    lines = []
+    for func, (_cc, _nc, _tt, _ct, callers) in stats.stats.items():
+        callee = f"{func[2]} ({func[0]}:{func[1]})"
+        if not callers:
+            continue
+        for caller, caller_stats in callers.items():
+            inclusive = caller_stats[3]
+            weight = int(inclusive * 1_000_000)
+            if weight > 0:
+                lines.append(f"{caller[2]} ({caller[0]}:{caller[1]});{callee} {weight}")
+    return "\n".join(lines) + "\n"
+
+
+class ProfileStore:
+    """Bounded in-memory store of captured request profiles."""
+
+    def __init__(self, max_profiles: int = 20):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profiler: cProfile.Profile, method: str, path: str, duration: float) -> str:
+        profile_id = uuid.uuid4().hex[:12]
+        profiler.create_stats()
+        entry = {
+            "id": profile_id,
+            "method": method,
+            "path": path,
+            "duration_ms": round(duration * 1000, 3),
+            "created_at": int(time.time() * 1000),
+            "raw": marshal.dumps(profiler.stats),
+        }
+        with self._lock:
+            self._profiles[profile_id] = entry
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{k: v for k, v in p.items() if k != "raw"} for p in reversed(self._profiles.values())]
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    @staticmethod
+    def _load(entry: Dict[str, Any]) -> pstats.Stats:
+        stats = pstats.Stats()
+        stats.stats = marshal.loads(entry["raw"])
+        stats.get_top_level_stats()
+        return stats
+
+    def render(self, entry: Dict[str, Any], fmt: str = "text", limit: int = 40) -> bytes:
+        """Render a stored profile as pstats (binary), collapsed stacks or text."""
+        if fmt == "pstats":
+            return entry["raw"]
+        stats = self._load(entry)
+        if fmt == "collapsed":
+            return _stats_to_collapsed(stats).encode()
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats("cumulative").print_stats(limit)
+        return out.getvalue().encode()
+
+
+class SamplingProfiler:
+    """Statistical stack sampler for already-running threads.
+
+    Reads ``sys._current_frames()`` at a fixed interval, so the target
+    threads run unmodified; results are flamegraph collapsed stacks.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+
+    def sample(self, threads: Iterable[threading.Thread], seconds: float) -> Dict[str, Any]:
+        targets = {t.ident: t.name for t in threads if t.ident is not None and t.is_alive()}
+        stacks: Counter = Counter()
+        samples = 0
+        deadline = time.perf_counter() + seconds
+        while targets and time.perf_counter() < deadline:
+            frames = sys._current_frames()
+            for ident, name in targets.items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(name)
+                stacks[";".join(reversed(stack))] += 1
+            samples += 1
+            time.sleep(self.interval)
+        return {
+            "threads": list(targets.values()),
+            "samples": samples,
+            "interval": self.interval,
+            "stacks": stacks,
+        }
+
+    @staticmethod
+    def to_collapsed(result: Dict[str, Any]) -> str:
+        stacks = sorted(result["stacks"].items(), key=lambda item: item[1], reverse=True)
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+
+def tracemalloc_snapshot(limit: int = 25, group_by: str = "lineno") -> Dict[str, Any]:
+    """Top allocation sites of the current tracemalloc snapshot."""
+    if not tracemalloc.is_tracing():
+        return {"tracing": False, "allocations": []}
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    current, peak = tracemalloc.get_traced_memory()
+    allocations = []
+    for stat in snapshot.statistics(group_by)[:limit]:
+        frame = stat.traceback[0]
+        allocations.append({
+            "file": frame.filename,
+            "line": frame.lineno,
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+        })
+    return {
+        "tracing": True,
+        "current_kb": round(current / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+        "allocations": allocations,
+    }
+
+
+PROFILES = ProfileStore()
+
+
+def profiling_requested(request) -> bool:
+    return request.headers.get("X-Profile") == "1" or request.args.get("_profile") == "1"
+
+
+def init_app(app, is_admin) -> None:
+    """Profile individual requests on demand when an admin asks for it.
+
+    ``is_admin`` is a zero-argument callable evaluated inside the request.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def _start_profile():
+        if not profiling_requested(request) or not is_admin():
+            return
+        g._profiler = cProfile.Profile()
+        g._profile_start = time.perf_counter()
+        g._profiler.enable()
+
+    @app.after_request
+    def _stop_profile(response):
+        profiler = g.pop("_profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            duration = time.perf_counter() - g.pop("_profile_start")
+            profile_id = PROFILES.add(profiler, request.method, request.path, duration)
+            response.headers["X-Profile-Id"] = profile_id
+        return response
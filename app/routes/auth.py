@@ -125,6 +125,9 @@ def profile():
         if updates:
             success = auth_manager.update_user_profile(current_user.user_id, updates)
             if success:
+                if 'binance_api_key' in updates or 'binance_api_secret' in updates:
+                    # Engine bots reuse their pooled client until it is rebuilt with the new keys
+                    current_app.engine.refresh_user(current_user.user_id)
                 return jsonify({'success': True, 'message': 'Profile updated successfully'})
             else:
                 return jsonify({'success': False, 'message': 'Failed to update profile'}), 500
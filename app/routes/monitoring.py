@@ -0,0 +1,130 @@
+import time
+import tracemalloc
+
+from flask import Blueprint, Response, request, jsonify, current_app
+
+from ..auth.auth_manager import admin_required
+from ..monitoring.metrics import REGISTRY
+from ..monitoring.profiling import PROFILES, SamplingProfiler, tracemalloc_snapshot
+
+monitoring_bp = Blueprint('monitoring', __name__)
+
+MAX_SAMPLE_SECONDS = 60.0
+# Upper bounds for listing sizes and traceback depth taken from query strings
+MAX_LIMIT = 1000
+MAX_TRACE_FRAMES = 64
+
+
+def _clamped(name: str, default, low, high, type=int):
+    """Query value parsed as ``type`` (the default if missing or malformed), clamped to [low, high]."""
+    return min(max(request.args.get(name, default, type=type), low), high)
+
+
+@monitoring_bp.get('/metrics')
+def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+@monitoring_bp.get('/healthz')
+def healthz():
+    """Readiness: 200 once MongoDB and the bot engine are usable, 503 while starting"""
+    checks = {}
+    db = current_app.mongodb
+    if db is None:
+        checks["mongodb"] = {"status": "disabled", "ready": True}
+    elif db.ready.is_set():
+        checks["mongodb"] = {"status": "ready", "ready": True}
+    else:
+        checks["mongodb"] = {"status": "connecting", "ready": False, "error": db.last_error}
+    if db is not None and db.spool_status():
+        # Informational: writes keep working against the local journal while the circuit is open
+        checks["mongodb"]["spool"] = db.spool_status()
+    engine_ok = current_app.engine.healthy()
+    checks["engine"] = {"status": "ready" if engine_ok else "unavailable", "ready": engine_ok}
+    ready = all(check["ready"] for check in checks.values())
+    return jsonify({
+        "status": "ok" if ready else "starting",
+        "checks": checks,
+        "startup_ms": round(getattr(current_app, "startup_seconds", 0.0) * 1000, 1),
+    }), 200 if ready else 503
+
+
+@monitoring_bp.get('/admin/profiles')
+@admin_required
+def list_profiles():
+    """List captured request profiles (send X-Profile: 1 or ?_profile=1 to capture one)"""
+    return jsonify({"profiles": PROFILES.list()})
+
+
+@monitoring_bp.get('/admin/profiles/<profile_id>')
+@admin_required
+def download_profile(profile_id):
+    """Download a request profile as text, pstats or collapsed stacks"""
+    entry = PROFILES.get(profile_id)
+    if not entry:
+        return jsonify({"error": "Profile not found"}), 404
+
+    fmt = request.args.get("format", "text")
+    if fmt not in ("text", "pstats", "collapsed"):
+        return jsonify({"error": "format must be text, pstats or collapsed"}), 400
+
+    body = PROFILES.render(entry, fmt, limit=_clamped("limit", 40, 1, MAX_LIMIT))
+    if fmt == "pstats":
+        return Response(body, mimetype='application/octet-stream',
+                        headers={"Content-Disposition": f"attachment; filename=profile-{profile_id}.pstats"})
+    if fmt == "collapsed":
+        return Response(body, mimetype='text/plain',
+                        headers={"Content-Disposition": f"attachment; filename=profile-{profile_id}.folded"})
+    return Response(body, mimetype='text/plain')
+
+
+@monitoring_bp.get('/admin/profile/bots')
+@admin_required
+def profile_bots():
+    """Sample running TradingBot threads for N seconds"""
+    try:
+        seconds = _clamped("seconds", 5.0, 0.1, MAX_SAMPLE_SECONDS, type=float)
+        interval = _clamped("interval", 0.005, 0.001, 1.0, type=float)
+
+        # Sampled inside whichever process owns the bots
+        result = current_app.engine.profile_bots(seconds, interval)
+        if result is None:
+            return jsonify({"error": "No running bot threads"}), 404
+
+        if request.args.get("format", "collapsed") == "json":
+            return jsonify(result)
+        filename = f"bots-{int(time.time())}.folded"
+        return Response(SamplingProfiler.to_collapsed(result), mimetype='text/plain',
+                        headers={"Content-Disposition": f"attachment; filename={filename}"})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@monitoring_bp.get('/admin/tracemalloc')
+@admin_required
+def tracemalloc_top():
+    """Top allocation sites since tracing was started"""
+    limit = _clamped("limit", 25, 1, MAX_LIMIT)
+    group_by = request.args.get("group_by", "lineno")
+    if group_by not in ("lineno", "filename", "traceback"):
+        return jsonify({"error": "group_by must be lineno, filename or traceback"}), 400
+    return jsonify(tracemalloc_snapshot(limit, group_by))
+
+
+@monitoring_bp.post('/admin/tracemalloc/start')
+@admin_required
+def tracemalloc_start():
+    """Start tracing allocations (adds overhead until stopped)"""
+    frames = _clamped("frames", 1, 1, MAX_TRACE_FRAMES)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    return jsonify({"tracing": True})
+
+
+@monitoring_bp.post('/admin/tracemalloc/stop')
+@admin_required
+def tracemalloc_stop():
+    """Stop tracing allocations"""
+    tracemalloc.stop()
+    return jsonify({"tracing": False})
@@ -0,0 +1,339 @@
+import math
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+DAY_MS = 86_400_000
+TRADING_DAYS = 365  # crypto trades every day
+
+
+def to_ms(timestamp) -> int:
+    """Epoch ms from a trade timestamp: naive-UTC datetime, ISO string or number."""
+    if timestamp is None:
+        return int(time.time() * 1000)
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return int(timestamp.timestamp() * 1000)
+    return int(timestamp)
+
+
+@dataclass
+class UserAnalytics:
+    """Running performance aggregates for one user, updated per fill in O(1).
+
+    Realized PnL uses average cost per symbol. Sharpe and Sortino are
+    computed from daily realized PnL (days without fills count as 0)
+    with Welford's running mean/variance, so no history is rescanned;
+    ``daily`` keeps one ``[day, pnl, equity]`` point per closed day for
+    the equity curve, capped at ``max_days`` entries.
+    """
+    user_id: str
+    trades: int = 0
+    closed_trades: int = 0
+    wins: int = 0
+    losses: int = 0
+    gross_profit: float = 0.0
+    gross_loss: float = 0.0
+    realized_pnl: float = 0.0
+    peak: float = 0.0
+    max_drawdown: float = 0.0
+    # symbol -> [quantity, cost]
+    positions: Dict[str, List[float]] = field(default_factory=dict)
+    # symbol -> realized PnL, kept after the position is closed
+    symbol_pnl: Dict[str, float] = field(default_factory=dict)
+    # Open day and its PnL so far
+    day: Optional[int] = None
+    day_pnl: float = 0.0
+    # Realized losses alone on the open day; seeds the risk engine's daily-loss limit
+    day_loss: float = 0.0
+    # Daily PnL statistics over closed days
+    n_days: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    downside_sq: float = 0.0
+    daily: List[List[float]] = field(default_factory=list)
+    first_ts: Optional[int] = None
+    last_ts: Optional[int] = None
+
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any]) -> "UserAnalytics":
+        user = cls(**{k: v for k, v in doc.items() if k in cls.__dataclass_fields__})
+        if "day_loss" not in doc:
+            # Documents written before day_loss existed: the net loss is a lower bound
+            user.day_loss = max(0.0, -user.day_pnl)
+        return user
+
+    @staticmethod
+    def _fold(stats: Tuple[int, float, float, float], value: float, count: int = 1) -> Tuple[int, float, float, float]:
+        """Add ``count`` days of ``value`` PnL to (n, mean, m2, downside_sq); count > 1 only for 0."""
+        n, mean, m2, downside = stats
+        total = n + count
+        delta = value - mean
+        mean += delta * count / total
+        m2 += delta * delta * n * count / total
+        if value < 0:
+            downside += value * value * count
+        return total, mean, m2, downside
+
+    def _close_day(self, new_day: int, max_days: int) -> None:
+        stats = self._fold((self.n_days, self.mean, self.m2, self.downside_sq), self.day_pnl)
+        if new_day - self.day > 1:
+            stats = self._fold(stats, 0.0, new_day - self.day - 1)
+        self.n_days, self.mean, self.m2, self.downside_sq = stats
+        self.daily.append([self.day * DAY_MS, self.day_pnl, self.realized_pnl])
+        if len(self.daily) > max_days:
+            del self.daily[:len(self.daily) - max_days]
+        self.day = new_day
+        self.day_pnl = 0.0
+        self.day_loss = 0.0
+
+    def apply(self, symbol: str, side: str, quantity: float, price: float, ts: int, max_days: int) -> None:
+        day = ts // DAY_MS
+        if self.day is None:
+            self.day = day
+        elif day > self.day:
+            self._close_day(day, max_days)
+        # A fill older than the open day (late replay) is booked on the open day
+        self.trades += 1
+        self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+        self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+
+        if side.upper() == "BUY":
+            position = self.positions.setdefault(symbol, [0.0, 0.0])
+            position[0] += quantity
+            position[1] += quantity * price
+            return
+        position = self.positions.get(symbol)
+        sold = min(quantity, position[0]) if position else 0.0
+        if sold <= 0:
+            return
+        released = position[1] * sold / position[0]
+        position[0] -= sold
+        position[1] -= released
+        if position[0] <= 1e-12:
+            self.positions.pop(symbol, None)
+
+        pnl = sold * price - released
+        self.closed_trades += 1
+        if pnl > 0:
+            self.wins += 1
+            self.gross_profit += pnl
+        elif pnl < 0:
+            self.losses += 1
+            self.gross_loss -= pnl
+            self.day_loss -= pnl
+        self.realized_pnl += pnl
+        self.symbol_pnl[symbol] = self.symbol_pnl.get(symbol, 0.0) + pnl
+        self.day_pnl += pnl
+        self.peak = max(self.peak, self.realized_pnl)
+        self.max_drawdown = max(self.max_drawdown, self.peak - self.realized_pnl)
+
+    def summary(self, now_ms: Optional[int] = None, curve: bool = True) -> Dict[str, Any]:
+        """Ratios including the open day and the idle days since; nothing is mutated."""
+        stats = (self.n_days, self.mean, self.m2, self.downside_sq)
+        if self.day is not None:
+            stats = self._fold(stats, self.day_pnl)
+            idle = (int(now_ms if now_ms is not None else time.time() * 1000) // DAY_MS) - self.day
+            if idle > 0:
+                stats = self._fold(stats, 0.0, idle)
+        n, mean, m2, downside = stats
+        std = math.sqrt(m2 / (n - 1)) if n > 1 else 0.0
+        downside_dev = math.sqrt(downside / n) if n else 0.0
+        result = {
+            "trades": self.trades,
+            "closed_trades": self.closed_trades,
+            "wins": self.wins,
+            "losses": self.losses,
+            "win_rate": self.wins / self.closed_trades if self.closed_trades else None,
+            "gross_profit": self.gross_profit,
+            "gross_loss": self.gross_loss,
+            "profit_factor": self.gross_profit / self.gross_loss if self.gross_loss else None,
+            "realized_pnl": self.realized_pnl,
+            "realized_by_symbol": dict(self.symbol_pnl),
+            "max_drawdown": self.max_drawdown,
+            "current_drawdown": self.peak - self.realized_pnl,
+            "days": n,
+            "mean_daily_pnl": mean if n else None,
+            "sharpe": mean / std * math.sqrt(TRADING_DAYS) if std > 0 else None,
+            "sortino": mean / downside_dev * math.sqrt(TRADING_DAYS) if downside_dev > 0 else None,
+            "first_trade": self.first_ts,
+            "last_trade": self.last_ts,
+        }
+        if curve:
+            points = list(self.daily)
+            if self.day is not None:
+                points.append([self.day * DAY_MS, self.day_pnl, self.realized_pnl])
+            result["daily_pnl"] = [[day, pnl] for day, pnl, _ in points]
+            result["equity_curve"] = [[day, equity] for day, _, equity in points]
+        return result
+
+
+def rebuild_user(db, user_id: str, max_days: int = 365, seen: Optional[set] = None) -> UserAnalytics:
+    """Aggregates for one user recomputed from their whole trade history (one streamed cursor)."""
+    user = UserAnalytics(user_id)
+    for doc in db.iter_user_trades(user_id):
+        ts = to_ms(doc["timestamp"])
+        user.apply(doc["symbol"], doc["side"], float(doc["quantity"]), float(doc["price"]), ts, max_days)
+        if seen is not None:
+            seen.add(AnalyticsEngine._fill_key(user_id, doc["symbol"], doc["side"], doc["quantity"], doc["price"],
+                                               ts, doc.get("order_id")))
+    return user
+
+
+class AnalyticsEngine(threading.Thread):
+    """Per-user performance analytics maintained as fills are recorded.
+
+    ``record_fill`` updates the user's ``UserAnalytics`` in memory, so
+    ``summary`` costs the same however many trades a user has. Changed
+    users are written to ``user_analytics`` (one document each) every
+    ``flush_interval`` seconds with one bulk write. ``load`` restores
+    those documents at startup and replays only the trades newer than
+    each user's last recorded one; fills arriving while it runs are
+    held back and applied afterwards, skipping any the replay already saw.
+    """
+
+    def __init__(self, db=None, flush_interval: float = 5.0, max_days: int = 365):
+        super().__init__(daemon=True, name="analytics")
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_days = max_days
+        self._users: Dict[str, UserAnalytics] = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        # Until load() finishes, fills are queued rather than applied
+        self._loaded = db is None
+        self._backlog: List[Tuple] = []
+        # user_id -> fills recorded while rebuild() recomputes that user
+        self._captured: Dict[str, List[Tuple]] = {}
+
+    @staticmethod
+    def _fill_key(user_id, symbol, side, quantity, price, ts, order_id):
+        return order_id if order_id else (user_id, symbol, side, quantity, price, ts)
+
+    def _apply(self, user_id: str, symbol: str, side: str, quantity: float, price: float, ts: int) -> None:
+        user = self._users.get(user_id)
+        if user is None:
+            user = self._users[user_id] = UserAnalytics(user_id)
+        user.apply(symbol, side, float(quantity), float(price), ts, self.max_days)
+        self._dirty.add(user_id)
+
+    def record_fill(self, user_id: Optional[str], symbol: str, side: str, quantity: float, price: float,
+                    timestamp=None, order_id: Optional[str] = None) -> None:
+        if not user_id:
+            return
+        fill = (str(user_id), symbol, side, quantity, price, to_ms(timestamp), order_id)
+        with self._lock:
+            if not self._loaded:
+                self._backlog.append(fill)
+                return
+            self._apply(*fill[:6])
+            captured = self._captured.get(fill[0])
+            if captured is not None:
+                captured.append(fill)
+
+    def record_trade(self, trade) -> None:
+        """Record a ``models.trade.Trade``."""
+        self.record_fill(trade.user_id, trade.symbol, trade.side, trade.quantity, trade.price,
+                         trade.timestamp, trade.order_id)
+
+    def load(self) -> int:
+        """Restore stored aggregates and replay trades recorded after them; returns trades replayed."""
+        started = time.perf_counter()
+        users = {doc["user_id"]: UserAnalytics.from_doc(doc) for doc in self.db.get_user_analytics_docs()}
+        since = min((u.last_ts for u in users.values() if u.last_ts is not None), default=None) if users else None
+        replayed = 0
+        seen = set()
+        changed = set()
+        for doc in self.db.iter_trades_since(since):
+            user_id = str(doc["user_id"])
+            ts = to_ms(doc["timestamp"])
+            user = users.get(user_id)
+            if user is not None and user.last_ts is not None and ts <= user.last_ts:
+                continue
+            if user is None:
+                user = users[user_id] = UserAnalytics(user_id)
+            user.apply(doc["symbol"], doc["side"], float(doc["quantity"]), float(doc["price"]), ts, self.max_days)
+            changed.add(user_id)
+            seen.add(self._fill_key(user_id, doc["symbol"], doc["side"], doc["quantity"], doc["price"], ts,
+                                    doc.get("order_id")))
+            replayed += 1
+        with self._lock:
+            self._users = users
+            self._dirty = changed
+            for fill in self._backlog:
+                if self._fill_key(*fill) not in seen:
+                    self._apply(*fill[:6])
+            self._backlog = []
+            self._loaded = True
+        print(f"✅ Analytics loaded for {len(users)} users ({replayed} trades replayed) "
+              f"in {time.perf_counter() - started:.2f}s")
+        return replayed
+
+    def rebuild(self, user_id: str) -> Dict[str, Any]:
+        """Recompute one user from the trades collection, e.g. after importing older history."""
+        user_id = str(user_id)
+        seen = set()
+        with self._lock:
+            self._captured[user_id] = []
+        try:
+            user = rebuild_user(self.db, user_id, self.max_days, seen)
+        finally:
+            with self._lock:
+                captured = self._captured.pop(user_id)
+        with self._lock:
+            # Fills that raced the rebuild and were not yet in the collection
+            for fill in captured:
+                if self._fill_key(*fill) not in seen:
+                    user.apply(*fill[1:6], self.max_days)
+            self._users[user_id] = user
+            self._dirty.add(user_id)
+        return user.summary(curve=False)
+
+    def daily_losses(self, user_id: Optional[str] = None, now_ms: Optional[int] = None) -> Dict[str, float]:
+        """Today's realized loss per user (or just ``user_id``), for users with fills today."""
+        today = int(now_ms if now_ms is not None else time.time() * 1000) // DAY_MS
+        with self._lock:
+            users = self._users.values() if user_id is None else filter(None, [self._users.get(str(user_id))])
+            return {user.user_id: user.day_loss for user in users if user.day == today}
+
+    def summary(self, user_id: str, curve: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            user = self._users.get(str(user_id)) or UserAnalytics(str(user_id))
+            summary = user.summary(curve=curve)
+        # False until stored aggregates are restored at startup
+        summary["loaded"] = self._loaded
+        return summary
+
+    def flush(self) -> int:
+        if self.db is None or not self._loaded:
+            return 0
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            docs = [asdict(self._users[user_id]) for user_id in dirty]
+        if not docs:
+            return 0
+        try:
+            self.db.save_user_analytics(docs)
+        except Exception as e:
+            with self._lock:
+                self._dirty |= dirty
+            print(f"Warning: failed to save analytics for {len(docs)} users: {e}")
+            return 0
+        return len(docs)
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the worker and write any remaining changes."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=timeout)
+        self.flush()
@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional
+
+from .kline_store import KlineStore, klines_to_arrays, interval_ms
+
+KLINES_LIMIT = 1000
+
+
+class RateLimiter:
+    """Token bucket over Binance request weight, shared by all workers."""
+
+    def __init__(self, weight_per_minute: int = 1200):
+        self.capacity = float(weight_per_minute)
+        self.rate = weight_per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, weight: int = 1) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._blocked_until and self._tokens >= weight:
+                    self._tokens -= weight
+                    return
+                wait = max(self._blocked_until - now, (weight - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def block(self, seconds: float) -> None:
+        """Pause every worker, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class BackfillCheckpoint:
+    """JSON file recording, per series, the stored range [start, next_start) of open_times."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self._state = json.load(f)
+
+    @staticmethod
+    def key(symbol: str, interval: str) -> str:
+        return f"{symbol.upper()}:{interval}"
+
+    def get(self, symbol: str, interval: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._state.get(self.key(symbol, interval), {}))
+
+    def update(self, symbol: str, interval: str, **values) -> None:
+        with self._lock:
+            self._state.setdefault(self.key(symbol, interval), {}).update(values)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._state, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return json.loads(json.dumps(self._state))
+
+
+class BackfillService:
+    """Downloads complete kline history into the local KlineStore.
+
+    Each (symbol, interval) series is paginated with ``startTime`` by one
+    worker; up to ``workers`` series run in parallel under a shared
+    weight budget. Pages are written before the checkpoint advances, so
+    an interrupted run resumes from the last stored candle without gaps,
+    and re-fetching a page is harmless because the store dedupes. A run
+    only resumes when its ``start_ts`` lies inside the checkpointed
+    range; an earlier start refetches from ``start_ts``.
+    """
+
+    def __init__(self, binance, store: KlineStore, checkpoint_path: str, weight_per_minute: int = 1200,
+                 request_weight: int = 2, max_retries: int = 5):
+        self.binance = binance
+        self.store = store
+        self.checkpoint = BackfillCheckpoint(checkpoint_path)
+        self.limiter = RateLimiter(weight_per_minute)
+        self.request_weight = request_weight
+        self.max_retries = max_retries
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    def fetch_page(self, symbol: str, interval: str, start_ts: int, end_ts: int) -> List[List[Any]]:
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(self.request_weight)
+            try:
+                return self.binance.get_klines(symbol, interval, start_time=start_ts, end_time=end_ts, limit=KLINES_LIMIT)
+            except Exception as e:
+                status = getattr(e, "status_code", None)
+                if status in (418, 429):
+                    headers = getattr(e, "header", None) or {}
+                    retry_after = float(headers.get("Retry-After", 60))
+                    self.limiter.block(retry_after)
+                elif attempt == self.max_retries:
+                    raise
+                else:
+                    time.sleep(min(2 ** attempt, 30))
+        raise RuntimeError(f"Rate limited fetching {symbol} {interval}")
+
+    def backfill_series(self, symbol: str, interval: str, start_ts: int = 0, end_ts: Optional[int] = None) -> Dict[str, Any]:
+        step = interval_ms(interval)
+        state = self.checkpoint.get(symbol, interval)
+        covered_from = state.get("start")
+        if covered_from is not None and int(covered_from) <= start_ts:
+            cursor = max(int(state["next_start"]), start_ts)
+            covered_from = int(covered_from)
+        else:
+            # Nothing known to be stored from start_ts on (older checkpoints have no start)
+            cursor = covered_from = start_ts
+        end_ts = end_ts if end_ts is not None else int(time.time() * 1000)
+        written = 0
+        while cursor <= end_ts and not self._stop_event.is_set():
+            page = self.fetch_page(symbol, interval, cursor, end_ts)
+            if not page:
+                break
+            arrays = klines_to_arrays(page)
+            # Only closed candles are stored; the open one is refetched next run
+            closed = arrays["close_time"] < int(time.time() * 1000)
+            arrays = {k: v[closed] for k, v in arrays.items()}
+            if arrays["open_time"].size:
+                written += self.store.write(symbol, interval, arrays)
+                cursor = int(arrays["open_time"][-1]) + step
+                self.checkpoint.update(symbol, interval, start=covered_from, next_start=cursor,
+                                       updated_at=int(time.time() * 1000))
+            if len(page) < KLINES_LIMIT or not closed.all():
+                break
+        self.checkpoint.update(symbol, interval, start=covered_from, next_start=cursor,
+                               complete=not self._stop_event.is_set())
+        return {"symbol": symbol, "interval": interval, "candles": written, "next_start": cursor}
+
+    def run(self, symbols: List[str], intervals: List[str], start_ts: int = 0, end_ts: Optional[int] = None,
+            workers: int = 4) -> Dict[str, Any]:
+        """Backfill every (symbol, interval) pair with bounded parallelism."""
+        for interval in intervals:
+            interval_ms(interval)
+        started = time.perf_counter()
+        results, errors = [], {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill") as pool:
+            futures = {
+                pool.submit(self.backfill_series, symbol.upper(), interval, start_ts, end_ts): (symbol.upper(), interval)
+                for symbol in symbols for interval in intervals
+            }
+            for future in as_completed(futures):
+                symbol, interval = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    errors[BackfillCheckpoint.key(symbol, interval)] = str(e)
+        self.last_result = {
+            "series": sorted(results, key=lambda r: (r["symbol"], r["interval"])),
+            "errors": errors,
+            "candles": sum(r["candles"] for r in results),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        return self.last_result
+
+    def start(self, *args, **kwargs) -> bool:
+        """Run in a background thread; returns False if a run is in progress."""
+        if self.is_running():
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, args=args, kwargs=kwargs, daemon=True, name="backfill")
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running(),
+            "checkpoints": self.checkpoint.snapshot(),
+            "last_result": self.last_result,
+        }
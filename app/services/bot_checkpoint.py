@@ -0,0 +1,58 @@
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+
+def bot_state(holding: bool, entry_price: Optional[float], last_order: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """The runtime fields a bot needs to pick up where it left off."""
+    return {"holding": bool(holding), "entry_price": entry_price, "last_order": last_order}
+
+
+class BotCheckpointer(threading.Thread):
+    """Background writer persisting bot runtime state into ``bot_configs``.
+
+    Bots call ``mark`` after a fill, which only records the latest state
+    per (user_id, symbol) in memory; this thread flushes whatever changed
+    every ``flush_interval`` seconds with one bulk write, so a burst of
+    fills costs one round trip and the bot loop never waits on MongoDB.
+    """
+
+    def __init__(self, db, flush_interval: float = 1.0):
+        super().__init__(daemon=True, name="bot-checkpoint")
+        self.db = db
+        self.flush_interval = flush_interval
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def mark(self, user_id: Optional[str], symbol: str, state: Dict[str, Any]) -> None:
+        if not user_id or self.db is None:
+            return
+        with self._lock:
+            self._pending[(str(user_id), symbol)] = state
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            self.db.save_bot_states([(user_id, symbol, state) for (user_id, symbol), state in pending.items()])
+        except Exception as e:
+            # Put them back unless a newer state arrived meanwhile
+            with self._lock:
+                for key, state in pending.items():
+                    self._pending.setdefault(key, state)
+            print(f"Warning: failed to checkpoint {len(pending)} bot states: {e}")
+            return 0
+        return len(pending)
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the worker and write any remaining states."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=timeout)
+        self.flush()
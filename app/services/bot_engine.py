@@ -0,0 +1,325 @@
+import threading
+import time
+from dataclasses import asdict
+from typing import Dict, Any, List, Optional
+
+from .analytics import AnalyticsEngine
+from .candles import CandleAggregator, parse_intervals
+from .bot_checkpoint import BotCheckpointer, bot_state
+from .client_pool import BinanceClientPool
+from .mark_to_market import MarkToMarketJob
+from .risk import RiskEngine, RiskLimits, RiskRejected
+from .portfolio import PortfolioManager, Trade as PortfolioTrade
+from .trade_writer import TradeWriter
+from .threshold_engine import ThresholdEngine, ThresholdBotState
+from .trading_bot import TradingBotManager
+from ..monitoring.profiling import SamplingProfiler
+
+
+def user_credentials_loader(db):
+    """(api_key, api_secret, dry_run) lookup by user id for the client pool, or None without a DB."""
+    if db is None:
+        return None
+
+    def load(user_id: str):
+        user = db.get_user_by_id(user_id)
+        if user is None:
+            return None, None, None
+        return user.binance_api_key, user.binance_api_secret, user.dry_run
+    return load
+
+
+class BotEngine:
+    """Owner of all stateful trading components: bots, portfolio and trade writer.
+
+    Runs either inside the web process (``BOT_ENGINE=local``) or alone in
+    ``bot_worker.py`` behind ``EngineServer`` (``BOT_ENGINE=remote``), in
+    which case API workers talk to it through ``EngineClient``. Routes only
+    use the methods below, so both deployments behave the same; every
+    argument and return value is plain data that survives pickling.
+    """
+
+    def __init__(self, binance, db=None, config: Optional[Dict[str, Any]] = None, clients=None, candles=None):
+        config = config or {}
+        self.binance = binance
+        self.db = db
+        # Orders go through each bot owner's own client
+        self.clients = clients or BinanceClientPool(
+            config.get("BINANCE_BASE_URL", "https://testnet.binance.vision"),
+            default_api_key=config.get("BINANCE_API_KEY", ""),
+            default_api_secret=config.get("BINANCE_API_SECRET", ""),
+            default_dry_run=config.get("DRY_RUN", True),
+            max_clients=config.get("BINANCE_POOL_SIZE", 256),
+            idle_ttl=config.get("BINANCE_CLIENT_TTL", 1800.0),
+            credentials_loader=user_credentials_loader(db),
+        )
+        # Create shared lock for thread safety
+        self.shared_lock = threading.Lock()
+        self.portfolio = PortfolioManager(binance)
+        self.portfolio.set_lock(self.shared_lock)
+        # Per-user equity curve, drawdown and Sharpe, updated per fill and flushed to user_analytics
+        self.analytics = AnalyticsEngine(db, flush_interval=config.get("ANALYTICS_FLUSH_INTERVAL", 5.0),
+                                         max_days=config.get("ANALYTICS_MAX_DAYS", 365))
+        # Bot fills are persisted in batches on a background writer, off the bot loop
+        self.trade_writer = TradeWriter(
+            db=db,
+            portfolio=self.portfolio,
+            analytics=self.analytics,
+            max_queue=config.get("TRADE_QUEUE_SIZE", 10000),
+            batch_size=config.get("TRADE_BATCH_SIZE", 100),
+            flush_interval=config.get("TRADE_FLUSH_INTERVAL", 0.5),
+        )
+        # Exposure counters checked before every bot and manual order
+        self.risk = RiskEngine(RiskLimits.from_config(config))
+        # Holding/entry_price written back to bot_configs after fills, read by resume_bots()
+        self.checkpointer = BotCheckpointer(db, flush_interval=config.get("BOT_CHECKPOINT_INTERVAL", 1.0))
+        self.resume = config.get("RESUME_BOTS", True)
+        # Live OHLCV bars from the polled prices; the web app passes its persisted aggregator,
+        # a standalone engine keeps its own in memory for bar-close subscribers
+        self._owns_candles = candles is None
+        self.candles = candles if candles is not None else CandleAggregator(
+            intervals=parse_intervals(config.get("CANDLE_INTERVALS", "")))
+        # Indexed engine running many threshold bots off one price poll per symbol
+        self.threshold_engine = ThresholdEngine(binance, trade_writer=self.trade_writer, portfolio=self.portfolio,
+                                                clients=self.clients, checkpointer=self.checkpointer, risk=self.risk,
+                                                candles=self.candles,
+                                                retry_backoff=config.get("BOT_RETRY_BACKOFF", 5.0),
+                                                max_backoff=config.get("BOT_MAX_BACKOFF", 300.0))
+        self.bot_manager = TradingBotManager(
+            binance, db=db, portfolio=self.portfolio,
+            trade_writer=self.trade_writer, engine=self.threshold_engine,
+            checkpointer=self.checkpointer, risk=self.risk,
+        )
+        # Unrealized PnL is computed here on a timer, never on a portfolio read
+        self.mark_to_market = MarkToMarketJob(binance, self.portfolio, threshold_engine=self.threshold_engine,
+                                              risk=self.risk, interval=config.get("MTM_INTERVAL", 5.0))
+
+    def start(self) -> None:
+        self.trade_writer.start()
+        self.analytics.start()
+        self.checkpointer.start()
+        self.mark_to_market.start()
+        if self._owns_candles:
+            self.candles.start()
+        if self.db is not None:
+            # All run as soon as MongoDB answers, which may be after startup returns; exposure
+            # and the day's realized losses are loaded first so resumed bots are checked against them
+            self.db.on_ready(self.load_exposure)
+            self.db.on_ready(self.load_analytics)
+            if self.resume:
+                self.db.on_ready(self.resume_bots)
+
+    def shutdown(self) -> None:
+        self.bot_manager.stop()
+        self.threshold_engine.stop_all()
+        self.mark_to_market.stop()
+        if self._owns_candles:
+            self.candles.stop()
+        self.checkpointer.stop()
+        self.trade_writer.stop()
+        # After the writer, so its last batch is included in the final flush
+        self.analytics.stop()
+
+    def load_exposure(self) -> int:
+        """Seed risk counters from every user's open positions (one aggregation)."""
+        return self.risk.load_positions(self.db.get_all_open_positions())
+
+    def load_analytics(self) -> int:
+        """Restore analytics, then seed today's realized losses into the risk engine from them."""
+        replayed = self.analytics.load()
+        self.risk.load_daily_losses(self.analytics.daily_losses())
+        return replayed
+
+    def resume_bots(self) -> int:
+        """Restart every active bot config with its checkpointed state.
+
+        One query loads all configs; they are added to the threshold engine
+        in bulk, so each symbol loop starts once however many bots share it.
+        Bots already running are left alone.
+        """
+        started = time.perf_counter()
+        bots = []
+        for config in self.db.get_all_active_bot_configs():
+            bot_id = f"{config.user_id}:{config.symbol}"
+            if self.threshold_engine.get_bot(bot_id) is not None:
+                continue
+            state = config.state or {}
+            self.clients.set_dry_run(config.user_id, config.dry_run)
+            bots.append(ThresholdBotState(
+                bot_id=bot_id,
+                symbol=config.symbol,
+                buy_threshold=config.buy_threshold,
+                sell_threshold=config.sell_threshold,
+                quantity=config.quantity,
+                user_id=config.user_id,
+                bot_type=config.bot_type,
+                params=config.params,
+                dry_run=config.dry_run,
+                holding=bool(state.get("holding")),
+                entry_price=state.get("entry_price"),
+                last_order=state.get("last_order"),
+            ))
+        added = self.threshold_engine.add_bots(bots)
+        if added:
+            print(f"✅ Resumed {added} bots in {time.perf_counter() - started:.2f}s")
+        return added
+
+    def healthy(self) -> bool:
+        return self.trade_writer.is_alive()
+
+    # Single-bot manager
+
+    def status(self) -> Dict[str, Any]:
+        status = self.bot_manager.status()
+        # Mode of the running bot's owner
+        status["dry_run"] = self.clients.is_dry_run(status.get("user_id"))
+        return status
+
+    def start_bot(self, symbol: str, buy_threshold: float, sell_threshold: float, quantity: float,
+                  user_id: Optional[str] = None, dry_run: bool = True) -> Dict[str, Any]:
+        client = self.clients.get(user_id, dry_run=dry_run)
+        return self.bot_manager.start(symbol, buy_threshold, sell_threshold, quantity, user_id=user_id, binance=client,
+                                      state=self._take_over_state(user_id, symbol))
+
+    def _take_over_state(self, user_id: Optional[str], symbol: str) -> Optional[Dict[str, Any]]:
+        """Warm state for a started bot: from its resumed engine copy, else from its checkpoint."""
+        if not user_id:
+            return None
+        resumed = self.threshold_engine.remove_bot(f"{user_id}:{symbol}")
+        if resumed is not None:
+            return bot_state(resumed.holding, resumed.entry_price, resumed.last_order)
+        if self.db is None:
+            return None
+        try:
+            config = self.db.get_bot_config(user_id, symbol)
+        except Exception as e:
+            print(f"Warning: could not load checkpoint for {user_id}:{symbol}: {e}")
+            return None
+        return config.state if config else None
+
+    def stop_bot(self, user_id: Optional[str] = None, symbol: Optional[str] = None) -> Dict[str, Any]:
+        # A bot resumed after a restart runs in the threshold engine
+        if user_id and symbol:
+            self.threshold_engine.remove_bot(f"{user_id}:{symbol}")
+        return self.bot_manager.stop()
+
+    # Engine-hosted bots
+
+    def list_bots(self, user_id: str) -> Dict[str, Any]:
+        return {"bots": self.threshold_engine.user_bots(user_id), "engine": self.threshold_engine.status()}
+
+    def add_bot(self, bot: Dict[str, Any]) -> str:
+        state = ThresholdBotState(**bot)
+        self.threshold_engine.add_bot(state)
+        return state.bot_id
+
+    def remove_bot(self, bot_id: str) -> Optional[Dict[str, Any]]:
+        bot = self.threshold_engine.remove_bot(bot_id)
+        return asdict(bot) if bot else None
+
+    def refresh_user(self, user_id: str) -> None:
+        """Drop the user's pooled order client so the next order reloads their keys."""
+        self.clients.evict(user_id)
+
+    # Portfolio
+
+    def record_trade(self, trade: Dict[str, Any], user_id: Optional[str] = None,
+                     reservation: Optional[int] = None) -> None:
+        """Apply a manual fill to the in-memory portfolio, the user's exposure and analytics."""
+        self.portfolio.add_trade(PortfolioTrade(**trade))
+        if user_id is not None:
+            self.risk.record_fill(user_id, trade["symbol"], trade["side"], trade["quantity"], trade["price"],
+                                  reservation)
+            self.analytics.record_fill(user_id, trade["symbol"], trade["side"], trade["quantity"], trade["price"],
+                                       trade.get("timestamp"), trade.get("order_id"))
+        else:
+            self.risk.release(reservation)
+
+    # Risk
+
+    def check_order(self, user_id: Optional[str], symbol: str, side: str, quantity: float,
+                    price: float) -> Dict[str, Any]:
+        """Pre-trade check for a manual order; a rejection is returned, not raised, to survive IPC.
+
+        An allowed order is reserved against the limits; pass ``reservation`` to
+        ``record_trade`` once it fills, or to ``release_order`` if it does not.
+        """
+        try:
+            reservation = self.risk.check(user_id, symbol, side, quantity, price)
+        except RiskRejected as e:
+            return {"allowed": False, "limit": e.limit, "error": str(e)}
+        return {"allowed": True, "reservation": reservation}
+
+    def release_order(self, reservation: Optional[int]) -> None:
+        self.risk.release(reservation)
+
+    def exposure(self, user_id: str) -> Dict[str, Any]:
+        return self.risk.exposure(user_id)
+
+    # Analytics
+
+    def analytics_summary(self, user_id: str, curve: bool = True) -> Dict[str, Any]:
+        return self.analytics.summary(user_id, curve=curve)
+
+    def trades_imported(self, user_id: str) -> Dict[str, Any]:
+        """Bring analytics and exposure in line with trades bulk-inserted behind the engine's back."""
+        summary = self.analytics.rebuild(user_id)
+        self.load_exposure()
+        # Imported sells from today count towards the daily-loss limit
+        self.risk.load_daily_losses(self.analytics.daily_losses(user_id))
+        return summary
+
+    def portfolio_summary(self) -> Dict[str, Any]:
+        return self.portfolio.get_portfolio_summary()
+
+    def recent_trades(self, limit: int = 20) -> List[Dict[str, Any]]:
+        return self.portfolio.get_recent_trades(limit)
+
+    def marks(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Last published mark-to-market prices and per-user position PnL."""
+        return self.mark_to_market.marks(user_id)
+
+    # Candles
+
+    def on_tick(self, symbol: str, price: float, ts_ms: Optional[int] = None) -> None:
+        """Fold a tick seen by an API worker into the engine's candles, the only ones persisted."""
+        self.candles.on_tick(symbol, price, ts_ms)
+
+    def candles_range(self, symbol: str, interval: str, start_ts: int, end_ts: Optional[int] = None,
+                      include_open: bool = True, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Bars with open_time in [start_ts, end_ts] as rows, the last ``limit`` of them."""
+        bars = self.candles.read(symbol, interval, start_ts, end_ts, include_open=include_open)
+        columns = list(bars)
+        values = (bars[name][-limit:] if limit else bars[name] for name in columns)
+        return [dict(zip(columns, row)) for row in zip(*(column.tolist() for column in values))]
+
+    def candle_events(self, after: Optional[int] = None, symbol: Optional[str] = None,
+                      interval: Optional[str] = None) -> Dict[str, Any]:
+        """Bars closed since sequence number ``after``; poll with the returned ``seq``."""
+        seq, bars = self.candles.closed_since(after, symbol, interval)
+        return {"seq": seq, "bars": bars}
+
+    # Diagnostics
+
+    def profile_bots(self, seconds: float, interval: float = 0.005) -> Optional[Dict[str, Any]]:
+        """Sample live bot threads; None when nothing is running."""
+        threads = self.bot_manager.threads()
+        if not threads:
+            return None
+        result = SamplingProfiler(interval).sample(threads, seconds)
+        result["stacks"] = dict(result["stacks"].most_common())
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Everything the API serves without a round trip, refreshed by the engine process."""
+        bots: Dict[str, List[Dict[str, Any]]] = {}
+        for bot in self.threshold_engine.user_bots_all():
+            bots.setdefault(str(bot["user_id"]), []).append(bot)
+        return {
+            "updated_at": time.time(),
+            "status": self.status(),
+            "engine": self.threshold_engine.status(),
+            "bots": bots,
+            "portfolio": self.portfolio_summary(),
+            "marks": self.marks(),
+        }
@@ -0,0 +1,257 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Any
+
+import numpy as np
+
+from .kline_store import KlineStore, COLUMNS, interval_ms, concat_arrays
+from ..monitoring.metrics import CANDLES_CLOSED, CANDLE_LATE_TICKS
+
+DEFAULT_INTERVALS = ("1s", "1m", "5m")
+
+Listener = Callable[[Dict[str, Any]], None]
+
+
+def parse_intervals(value: str) -> Tuple[str, ...]:
+    """``"1s,1m,5m"`` -> validated interval tuple."""
+    intervals = tuple(item.strip() for item in str(value or "").split(",") if item.strip())
+    for interval in intervals:
+        interval_ms(interval)
+    return intervals or DEFAULT_INTERVALS
+
+
+def persisted_candles(config, data_dir: str = "data") -> "CandleAggregator":
+    """Aggregator writing day partitions under ``<data_dir>/candles``; run exactly one per data dir."""
+    return CandleAggregator(
+        KlineStore(os.path.join(data_dir, "candles"), partition="day"),
+        intervals=parse_intervals(config.get("CANDLE_INTERVALS", "")),
+        flush_interval=config.get("CANDLE_FLUSH_INTERVAL", 5.0),
+    )
+
+
+class CandleAggregator(threading.Thread):
+    """Builds OHLCV bars per (symbol, interval) from the tick stream.
+
+    ``on_tick`` folds a price into the open bar of every interval; a tick
+    past the bar's end closes it and opens the next one. The background
+    loop also closes bars whose interval has elapsed without a new tick,
+    so a bar closes on its time boundary (plus ``grace_ms`` for late
+    ticks) even for a quiet symbol. Intervals without ticks produce no
+    bar. Closed bars go to subscribers immediately and to the kline store
+    in batches, one write per series every ``flush_interval`` seconds.
+    Without a store the last ``max_pending`` bars per series are kept in
+    memory only. The last ``recent`` closed bars are also numbered, so
+    readers in other processes can poll ``closed_since`` instead of
+    subscribing.
+
+    Only one aggregator may persist to a store: bars built from a subset
+    of the ticks would overwrite complete ones.
+    """
+
+    def __init__(self, store: Optional[KlineStore] = None, intervals=DEFAULT_INTERVALS,
+                 flush_interval: float = 5.0, grace_ms: int = 500, max_pending: int = 10_000,
+                 recent: int = 10_000):
+        super().__init__(daemon=True, name="candle-aggregator")
+        self.store = store
+        self.intervals = tuple(intervals)
+        self._steps = {interval: interval_ms(interval) for interval in self.intervals}
+        self.flush_interval = flush_interval
+        self.grace_ms = grace_ms
+        self.max_pending = max_pending
+        # (symbol, interval) -> [open_time, open, high, low, close, volume]
+        self._open: Dict[Tuple[str, str], List[float]] = {}
+        # (symbol, interval) -> open_time of the last closed bar; older ticks are late
+        self._closed_through: Dict[Tuple[str, str], int] = {}
+        # Closed bars not yet written to the store
+        self._pending: Dict[Tuple[str, str], List[Tuple]] = {}
+        self._listeners: List[Tuple[Listener, Optional[str], Optional[str]]] = []
+        # (sequence number, bar) of the latest closes, oldest first
+        self._recent: Deque[Tuple[int, Dict[str, Any]]] = deque(maxlen=recent)
+        self._seq = 0
+        self._lock = threading.Lock()
+        # Serialises flushes so a bar is never written twice or out of order
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def on_tick(self, symbol: str, price: float, ts_ms: Optional[int] = None, volume: float = 0.0) -> None:
+        """Fold one tick into the open bars of every interval."""
+        symbol = symbol.upper()
+        ts = int(time.time() * 1000) if ts_ms is None else int(ts_ms)
+        price = float(price)
+        closed = []
+        with self._lock:
+            for interval, step in self._steps.items():
+                key = (symbol, interval)
+                open_time = ts - ts % step
+                bar = self._open.get(key)
+                if bar is not None and open_time == bar[0]:
+                    if price > bar[2]:
+                        bar[2] = price
+                    if price < bar[3]:
+                        bar[3] = price
+                    bar[4] = price
+                    bar[5] += volume
+                    continue
+                if open_time <= self._closed_through.get(key, -1) or (bar is not None and open_time < bar[0]):
+                    CANDLE_LATE_TICKS.inc(interval)
+                    continue
+                if bar is not None:
+                    closed.append(self._close_locked(key, bar))
+                self._open[key] = [open_time, price, price, price, price, volume]
+        self._publish(closed)
+
+    def close_due(self, now_ms: Optional[int] = None) -> int:
+        """Close open bars whose interval ended more than ``grace_ms`` ago."""
+        now = int(time.time() * 1000) if now_ms is None else int(now_ms)
+        closed = []
+        with self._lock:
+            for key, bar in list(self._open.items()):
+                if bar[0] + self._steps[key[1]] + self.grace_ms <= now:
+                    del self._open[key]
+                    closed.append(self._close_locked(key, bar))
+        self._publish(closed)
+        return len(closed)
+
+    def _close_locked(self, key: Tuple[str, str], bar: List[float]) -> Dict[str, Any]:
+        open_time = int(bar[0])
+        close_time = open_time + self._steps[key[1]] - 1
+        self._closed_through[key] = open_time
+        pending = self._pending.setdefault(key, [])
+        pending.append((open_time, bar[1], bar[2], bar[3], bar[4], bar[5], close_time))
+        if self.store is None and len(pending) > self.max_pending:
+            del pending[:len(pending) - self.max_pending]
+        CANDLES_CLOSED.inc(key[1])
+        closed = {
+            "symbol": key[0], "interval": key[1], "open_time": open_time,
+            "open": bar[1], "high": bar[2], "low": bar[3], "close": bar[4], "volume": bar[5],
+            "close_time": close_time,
+        }
+        self._seq += 1
+        self._recent.append((self._seq, closed))
+        return closed
+
+    def closed_since(self, after: Optional[int] = None, symbol: Optional[str] = None,
+                     interval: Optional[str] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """(latest sequence number, bars closed after sequence ``after``), optionally filtered.
+
+        ``after=None`` only returns the current sequence number to start from.
+        Bars that already left the ``recent`` window are skipped.
+        """
+        symbol = symbol.upper() if symbol else None
+        with self._lock:
+            seq = self._seq
+            if after is None or after >= seq:
+                return seq, []
+            entries = []
+            for number, bar in reversed(self._recent):
+                if number <= after:
+                    break
+                entries.append(bar)
+        entries.reverse()
+        return seq, [bar for bar in entries
+                     if (symbol is None or bar["symbol"] == symbol) and (interval is None or bar["interval"] == interval)]
+
+    def subscribe(self, callback: Listener, symbol: Optional[str] = None,
+                  interval: Optional[str] = None) -> Callable[[], None]:
+        """Call ``callback(bar)`` on every bar close, optionally filtered; returns an unsubscribe function.
+
+        Callbacks run on the thread that closed the bar and must not block.
+        """
+        entry = (callback, symbol.upper() if symbol else None, interval)
+        with self._lock:
+            self._listeners = self._listeners + [entry]
+
+        def unsubscribe() -> None:
+            with self._lock:
+                self._listeners = [e for e in self._listeners if e is not entry]
+        return unsubscribe
+
+    def _publish(self, bars: List[Dict[str, Any]]) -> None:
+        if not bars:
+            return
+        listeners = self._listeners
+        for bar in bars:
+            for callback, symbol, interval in listeners:
+                if (symbol is None or symbol == bar["symbol"]) and (interval is None or interval == bar["interval"]):
+                    try:
+                        callback(bar)
+                    except Exception as exc:  # noqa: BLE001
+                        print(f"Warning: candle listener failed for {bar['symbol']} {bar['interval']}: {exc}")
+
+    @staticmethod
+    def _rows_to_arrays(rows: List[Tuple]) -> Dict[str, np.ndarray]:
+        table = np.array(rows, dtype=np.float64).reshape(-1, len(COLUMNS))
+        return {
+            name: table[:, i].astype(np.int64) if name in ("open_time", "close_time") else table[:, i]
+            for i, name in enumerate(COLUMNS)
+        }
+
+    def flush(self) -> int:
+        """Write pending closed bars to the store, one write per series; returns bars written."""
+        if self.store is None:
+            return 0
+        written = 0
+        with self._flush_lock:
+            with self._lock:
+                batches = {key: list(rows) for key, rows in self._pending.items() if rows}
+            for (symbol, interval), rows in batches.items():
+                try:
+                    written += self.store.write(symbol, interval, self._rows_to_arrays(rows))
+                except Exception as e:
+                    # Left pending, so the next flush retries them
+                    print(f"Warning: failed to persist {len(rows)} {interval} candles for {symbol}: {e}")
+                    continue
+                with self._lock:
+                    # Dropped only once stored, so read() never misses a bar mid-flush
+                    del self._pending[(symbol, interval)][:len(rows)]
+        return written
+
+    def read(self, symbol: str, interval: str, start_ts: int, end_ts: Optional[int] = None,
+             include_open: bool = True) -> Dict[str, np.ndarray]:
+        """Bars with open_time in [start_ts, end_ts]: stored, pending and (optionally) the open bar."""
+        symbol = symbol.upper()
+        if interval not in self._steps:
+            raise ValueError(f"Interval {interval} is not aggregated (have {self.intervals})")
+        key = (symbol, interval)
+        with self._lock:
+            rows = list(self._pending.get(key, ()))
+            bar = self._open.get(key)
+            if include_open and bar is not None:
+                rows.append((bar[0], bar[1], bar[2], bar[3], bar[4], bar[5], bar[0] + self._steps[interval] - 1))
+        parts = []
+        if self.store is not None:
+            parts.append(self.store.read_range(symbol, interval, start_ts, end_ts))
+        if rows:
+            recent = self._rows_to_arrays(rows)
+            mask = recent["open_time"] >= start_ts
+            if end_ts is not None:
+                mask &= recent["open_time"] <= end_ts
+            parts.append({k: v[mask] for k, v in recent.items()})
+        merged = concat_arrays(parts)
+        # A bar pending and already flushed appears twice; keep the newer copy
+        order = np.argsort(merged["open_time"], kind="stable")
+        merged = {k: v[order] for k, v in merged.items()}
+        keep = np.append(merged["open_time"][1:] != merged["open_time"][:-1], True)
+        return {k: v[keep] for k, v in merged.items()}
+
+    def run(self) -> None:
+        last_flush = time.monotonic()
+        tick = min(0.25, min(self._steps.values()) / 4000) if self._steps else 0.25
+        while not self._stop_event.wait(tick):
+            try:
+                self.close_due()
+                if time.monotonic() - last_flush >= self.flush_interval:
+                    self.flush()
+                    last_flush = time.monotonic()
+            except Exception as exc:  # noqa: BLE001
+                print(f"Warning: candle aggregator loop error: {exc}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the loop and persist every closed bar; the open bars are dropped."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+        self.close_due()
+        self.flush()
@@ -0,0 +1,158 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..binance_client import BinanceClient
+
+# Pool key for requests without a logged-in user
+ANONYMOUS = "__anonymous__"
+
+
+@dataclass
+class _PooledClient:
+    client: BinanceClient
+    fingerprint: str
+    last_used: float
+
+
+def _fingerprint(api_key: Optional[str], api_secret: Optional[str]) -> str:
+    return hashlib.sha256(f"{api_key or ''}:{api_secret or ''}".encode()).hexdigest()
+
+
+class BinanceClientPool:
+    """Lazily created, per-user Binance clients.
+
+    Each user gets a client signed with their own ``binance_api_key`` /
+    ``binance_api_secret`` (falling back to the server keys when they have
+    none) and its own HTTP session and dry-run flag, so users neither
+    share mutable state nor queue behind one connection. Clients are
+    dropped after ``idle_ttl`` seconds unused or when more than
+    ``max_clients`` are open (least recently used first), and rebuilt if
+    the user's keys change.
+
+    Callers without the user's keys (engine bots) reuse the open client
+    as is; ``credentials_loader`` supplies the keys, and the user's stored
+    dry-run mode, only when one is built. ``evict`` forces a reload.
+
+    Callers hold a client without returning it, so a dropped client may
+    still be mid-request on another thread; it is closed only after
+    ``close_delay`` seconds out of the pool.
+    """
+
+    def __init__(self, base_url: str, default_api_key: str = "", default_api_secret: str = "",
+                 default_dry_run: bool = True, max_clients: int = 256, idle_ttl: float = 1800.0,
+                 close_delay: float = 300.0, credentials_loader: Optional[Callable[[str], Tuple[Optional[str], Optional[str], Optional[bool]]]] = None):
+        self.base_url = base_url
+        self.default_api_key = default_api_key
+        self.default_api_secret = default_api_secret
+        self.default_dry_run = default_dry_run
+        self.max_clients = max_clients
+        self.idle_ttl = idle_ttl
+        self.close_delay = close_delay
+        # user_id -> (api_key, api_secret, dry_run), used to build a client when the caller passes no keys
+        self.credentials_loader = credentials_loader
+        self._clients: "OrderedDict[str, _PooledClient]" = OrderedDict()
+        # Survives eviction so a rebuilt client keeps the user's mode
+        self._dry_run: Dict[str, bool] = {}
+        # (dropped at, client) awaiting close, oldest first
+        self._retired: List[Tuple[float, BinanceClient]] = []
+        self._lock = threading.Lock()
+
+    def _credentials(self, user_id: str, api_key: Optional[str], api_secret: Optional[str]) -> Tuple[str, str]:
+        if api_key is None and api_secret is None and self.credentials_loader and user_id != ANONYMOUS:
+            try:
+                api_key, api_secret, dry_run = self.credentials_loader(user_id)
+            except Exception as e:
+                print(f"Warning: failed to load Binance keys for user {user_id}: {e}")
+            else:
+                if dry_run is not None:
+                    # The stored mode applies unless this process was already told one
+                    with self._lock:
+                        self._dry_run.setdefault(user_id, bool(dry_run))
+        if api_key and api_secret:
+            return api_key, api_secret
+        return self.default_api_key, self.default_api_secret
+
+    def _sweep_locked(self, now: float) -> None:
+        while self._clients:
+            user_id, entry = next(iter(self._clients.items()))
+            if len(self._clients) <= self.max_clients and now - entry.last_used < self.idle_ttl:
+                break
+            del self._clients[user_id]
+            self._retired.append((now, entry.client))
+        closing = 0
+        while closing < len(self._retired) and now - self._retired[closing][0] >= self.close_delay:
+            self._retired[closing][1].close()
+            closing += 1
+        del self._retired[:closing]
+
+    def get(self, user_id: Optional[str], api_key: Optional[str] = None, api_secret: Optional[str] = None,
+            dry_run: Optional[bool] = None) -> BinanceClient:
+        """Client for a user, creating it on first use; ``dry_run`` updates the user's mode."""
+        user_id = str(user_id) if user_id is not None else ANONYMOUS
+        if api_key is None and api_secret is None:
+            client = self._reuse(user_id, dry_run)
+            if client is not None:
+                return client
+        api_key, api_secret = self._credentials(user_id, api_key, api_secret)
+        fingerprint = _fingerprint(api_key, api_secret)
+        now = time.monotonic()
+        with self._lock:
+            if dry_run is not None:
+                self._dry_run[user_id] = bool(dry_run)
+            mode = self._dry_run.get(user_id, self.default_dry_run)
+            entry = self._clients.get(user_id)
+            if entry is not None and entry.fingerprint != fingerprint:
+                # Keys changed: never keep signing with the old ones
+                del self._clients[user_id]
+                self._retired.append((now, entry.client))
+                entry = None
+            if entry is None:
+                entry = _PooledClient(BinanceClient(api_key, api_secret, self.base_url, dry_run=mode), fingerprint, now)
+                self._clients[user_id] = entry
+            entry.client.dry_run = mode
+            entry.last_used = now
+            self._clients.move_to_end(user_id)
+            self._sweep_locked(now)
+            return entry.client
+
+    def _reuse(self, user_id: str, dry_run: Optional[bool]) -> Optional[BinanceClient]:
+        """The user's open client, whatever keys it was built with, or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._clients.get(user_id)
+            if entry is None:
+                return None
+            if dry_run is not None:
+                self._dry_run[user_id] = bool(dry_run)
+            entry.client.dry_run = self._dry_run.get(user_id, self.default_dry_run)
+            entry.last_used = now
+            self._clients.move_to_end(user_id)
+            self._sweep_locked(now)
+            return entry.client
+
+    def set_dry_run(self, user_id: Optional[str], dry_run: bool) -> None:
+        user_id = str(user_id) if user_id is not None else ANONYMOUS
+        with self._lock:
+            self._dry_run[user_id] = bool(dry_run)
+            entry = self._clients.get(user_id)
+            if entry is not None:
+                entry.client.dry_run = bool(dry_run)
+
+    def is_dry_run(self, user_id: Optional[str]) -> bool:
+        user_id = str(user_id) if user_id is not None else ANONYMOUS
+        with self._lock:
+            return self._dry_run.get(user_id, self.default_dry_run)
+
+    def evict(self, user_id: Optional[str]) -> None:
+        user_id = str(user_id) if user_id is not None else ANONYMOUS
+        with self._lock:
+            entry = self._clients.pop(user_id, None)
+            if entry is not None:
+                self._retired.append((time.monotonic(), entry.client))
+
+    def __len__(self) -> int:
+        return len(self._clients)
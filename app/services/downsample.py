@@ -0,0 +1,85 @@
+from typing import Tuple
+
+import numpy as np
+
+METHODS = ("lttb", "minmax")
+
+
+def _endpoints(n: int, threshold: int) -> np.ndarray:
+    """First and last index, trimmed to ``threshold`` (the last one alone for 1)."""
+    return np.array([0, n - 1], dtype=np.int64)[2 - max(0, min(threshold, 2)):]
+
+
+def _bucket_edges(n: int, threshold: int) -> np.ndarray:
+    """Edges of ``threshold - 2`` buckets over the interior points 1..n-2."""
+    return np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of ``threshold`` points to keep.
+
+    First and last points are always kept. Each interior bucket keeps the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket. Only the walk over buckets is a Python
+    loop; the work inside a bucket is vectorized.
+    """
+    n = x.size
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        return _endpoints(n, threshold)
+    x = x.astype(np.float64)
+    y = y.astype(np.float64, copy=False)
+    edges = _bucket_edges(n, threshold)
+    # Next-bucket averages for every bucket, with the last point closing the series
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - avg_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def _first_match(y: np.ndarray, values: np.ndarray, edges: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Per bucket, the index of the first point equal to that bucket's value."""
+    hits = np.flatnonzero(y == np.repeat(values, counts))
+    return hits[np.searchsorted(hits, edges[:-1], side="left")]
+
+
+def minmax_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the min and max of each bucket plus the endpoints, at most ``threshold``."""
+    n = y.size
+    buckets = (threshold - 2) // 2
+    if threshold >= n:
+        return np.arange(n)
+    if buckets < 1:
+        return _endpoints(n, threshold)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    counts = np.diff(edges)
+    lows = _first_match(y, np.minimum.reduceat(y, edges[:-1]), edges, counts)
+    highs = _first_match(y, np.maximum.reduceat(y, edges[:-1]), edges, counts)
+    return np.unique(np.concatenate([lows, highs, [0, n - 1]]))
+
+
+def downsample(timestamps: np.ndarray, prices: np.ndarray, max_points: int,
+               method: str = "lttb") -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce a series to at most ``max_points`` points, keeping its visual shape."""
+    if method not in METHODS:
+        raise ValueError(f"downsample method must be one of {METHODS}")
+    if max_points <= 0 or timestamps.size <= max_points:
+        return timestamps, prices
+    if method == "lttb":
+        keep = lttb_indices(timestamps, prices, max_points)
+    else:
+        keep = minmax_indices(prices, max_points)
+    return timestamps[keep], prices[keep]
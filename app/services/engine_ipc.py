@@ -0,0 +1,282 @@
+import json
+import os
+import threading
+import time
+from multiprocessing.connection import Listener, Client
+from typing import Dict, Any, List, Optional
+
+# BotEngine methods callable over the socket; the first group changes state
+MUTATING_OPS = ("start_bot", "stop_bot", "add_bot", "remove_bot", "record_trade", "trades_imported")
+# Keys that must never authenticate the engine socket (unset, or the shipped example secret)
+INSECURE_AUTHKEYS = (b"", b"your-secret-key-change-this-in-production")
+MIN_AUTHKEY_LENGTH = 16
+ENGINE_OPS = MUTATING_OPS + ("status", "list_bots", "portfolio_summary", "recent_trades", "marks",
+                             "check_order", "release_order", "exposure", "analytics_summary", "profile_bots", "snapshot",
+                             "refresh_user", "on_tick", "candles_range", "candle_events")
+
+
+def check_authkey(authkey: bytes) -> bytes:
+    """Refuse engine socket keys that are unset, the example default or too short.
+
+    Connections exchange pickles, so whoever knows the key can run code in
+    the engine process; it has to be a real secret set in BOT_ENGINE_AUTHKEY.
+    """
+    if authkey in INSECURE_AUTHKEYS or len(authkey) < MIN_AUTHKEY_LENGTH:
+        raise ValueError(f"BOT_ENGINE_AUTHKEY must be set to a secret of at least {MIN_AUTHKEY_LENGTH} characters "
+                         "for the remote bot engine")
+    return authkey
+
+
+def write_snapshot(path: str, snapshot: Dict[str, Any]) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f, default=str)
+    os.replace(tmp_path, path)
+
+
+class EngineServer:
+    """Serves a ``BotEngine`` to API workers over a Unix socket.
+
+    Requests are ``(op, args, kwargs)`` tuples on an authenticated
+    ``multiprocessing.connection`` channel, one thread per client
+    connection. A JSON snapshot of status, bots and portfolio is rewritten
+    every ``snapshot_interval`` seconds and right after each state change,
+    so read endpoints never need a round trip.
+    """
+
+    def __init__(self, engine, address: str, authkey: bytes, snapshot_path: Optional[str] = None,
+                 snapshot_interval: float = 1.0):
+        self.engine = engine
+        self.address = address
+        self.authkey = check_authkey(authkey)
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self._listener: Optional[Listener] = None
+        self._stop_event = threading.Event()
+        self._snapshot_lock = threading.Lock()
+
+    def refresh_snapshot(self) -> None:
+        if not self.snapshot_path:
+            return
+        with self._snapshot_lock:
+            write_snapshot(self.snapshot_path, self.engine.snapshot())
+
+    def _snapshot_loop(self) -> None:
+        while not self._stop_event.wait(self.snapshot_interval):
+            try:
+                self.refresh_snapshot()
+            except Exception as e:
+                print(f"Warning: failed to write engine snapshot: {e}")
+
+    def _dispatch(self, op: str, args, kwargs) -> Dict[str, Any]:
+        if op not in ENGINE_OPS:
+            return {"ok": False, "error": f"Unknown engine operation: {op}"}
+        try:
+            result = getattr(self.engine, op)(*args, **kwargs)
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        if op in MUTATING_OPS:
+            self.refresh_snapshot()
+        return {"ok": True, "result": result}
+
+    def _serve_connection(self, conn) -> None:
+        with conn:
+            while not self._stop_event.is_set():
+                try:
+                    op, args, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    return
+                conn.send(self._dispatch(op, args, kwargs))
+
+    def serve_forever(self) -> None:
+        if os.path.exists(self.address):
+            os.remove(self.address)
+        # Owner-only from creation: the umask covers the window before chmod
+        umask = os.umask(0o177)
+        try:
+            self._listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        finally:
+            os.umask(umask)
+        os.chmod(self.address, 0o600)
+        self.refresh_snapshot()
+        threading.Thread(target=self._snapshot_loop, daemon=True, name="engine-snapshot").start()
+        print(f"🤖 Bot engine listening on {self.address}")
+        while not self._stop_event.is_set():
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._stop_event.is_set():
+                    break
+                continue
+            except Exception as e:
+                # Failed handshake (wrong authkey); keep serving others
+                print(f"Warning: rejected engine connection: {e}")
+                continue
+            threading.Thread(target=self._serve_connection, args=(conn,), daemon=True, name="engine-conn").start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._listener is not None:
+            self._listener.close()
+        if os.path.exists(self.address):
+            os.remove(self.address)
+
+
+class EngineClient:
+    """``BotEngine`` interface for stateless API workers.
+
+    Commands go over the engine socket on one connection per thread;
+    status, bot lists and the portfolio summary are read from the engine's
+    snapshot file while it is fresher than ``max_snapshot_age`` seconds.
+    """
+
+    def __init__(self, address: str, authkey: bytes, snapshot_path: Optional[str] = None,
+                 max_snapshot_age: float = 5.0):
+        self.address = address
+        self.authkey = check_authkey(authkey)
+        self.snapshot_path = snapshot_path
+        self.max_snapshot_age = max_snapshot_age
+        self._local = threading.local()
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_mtime = 0.0
+        self._snapshot: Optional[Dict[str, Any]] = None
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = Client(self.address, family="AF_UNIX", authkey=self.authkey)
+            self._local.conn = conn
+        return conn
+
+    def _reset(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def _call(self, op: str, *args, **kwargs):
+        request = (op, args, kwargs)
+        try:
+            conn = self._connection()
+            conn.send(request)
+        except (OSError, EOFError):
+            # Stale connection (engine restarted): the request was not delivered, so resend once
+            self._reset()
+            conn = self._connection()
+            conn.send(request)
+        try:
+            response = conn.recv()
+        except (OSError, EOFError):
+            self._reset()
+            raise RuntimeError("Bot engine connection lost")
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    def _read_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Latest snapshot if fresh enough, re-parsed only when the file changes."""
+        if not self.snapshot_path:
+            return None
+        try:
+            mtime = os.stat(self.snapshot_path).st_mtime
+        except OSError:
+            return None
+        if time.time() - mtime > self.max_snapshot_age:
+            return None
+        with self._snapshot_lock:
+            if mtime != self._snapshot_mtime:
+                try:
+                    with open(self.snapshot_path) as f:
+                        self._snapshot = json.load(f)
+                    self._snapshot_mtime = mtime
+                except (OSError, ValueError):
+                    return None
+            return self._snapshot
+
+    def healthy(self) -> bool:
+        """The engine process is alive if it keeps refreshing its snapshot."""
+        return self._read_snapshot() is not None
+
+    # Reads: snapshot first, engine as fallback
+
+    def status(self) -> Dict[str, Any]:
+        snapshot = self._read_snapshot()
+        return dict(snapshot["status"]) if snapshot else self._call("status")
+
+    def list_bots(self, user_id: str) -> Dict[str, Any]:
+        snapshot = self._read_snapshot()
+        if snapshot:
+            return {"bots": snapshot["bots"].get(str(user_id), []), "engine": snapshot["engine"]}
+        return self._call("list_bots", user_id)
+
+    def portfolio_summary(self) -> Dict[str, Any]:
+        snapshot = self._read_snapshot()
+        return snapshot["portfolio"] if snapshot else self._call("portfolio_summary")
+
+    def marks(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        snapshot = self._read_snapshot()
+        if not snapshot:
+            return self._call("marks", user_id)
+        marks = snapshot["marks"]
+        if user_id is None:
+            return marks
+        return {"prices": marks["prices"], "updated_at": marks["updated_at"],
+                "positions": marks["positions"].get(str(user_id), [])}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self._read_snapshot() or self._call("snapshot")
+
+    # Commands
+
+    def start_bot(self, *args, **kwargs) -> Dict[str, Any]:
+        return self._call("start_bot", *args, **kwargs)
+
+    def stop_bot(self, *args, **kwargs) -> Dict[str, Any]:
+        return self._call("stop_bot", *args, **kwargs)
+
+    def add_bot(self, bot: Dict[str, Any]) -> str:
+        return self._call("add_bot", bot)
+
+    def remove_bot(self, bot_id: str) -> Optional[Dict[str, Any]]:
+        return self._call("remove_bot", bot_id)
+
+    def refresh_user(self, user_id: str) -> None:
+        return self._call("refresh_user", user_id)
+
+    def record_trade(self, trade: Dict[str, Any], user_id: Optional[str] = None,
+                     reservation: Optional[int] = None) -> None:
+        return self._call("record_trade", trade, user_id, reservation)
+
+    def check_order(self, *args) -> Dict[str, Any]:
+        return self._call("check_order", *args)
+
+    def release_order(self, reservation: Optional[int]) -> None:
+        return self._call("release_order", reservation)
+
+    def exposure(self, user_id: str) -> Dict[str, Any]:
+        return self._call("exposure", user_id)
+
+    def analytics_summary(self, user_id: str, curve: bool = True) -> Dict[str, Any]:
+        return self._call("analytics_summary", user_id, curve)
+
+    def trades_imported(self, user_id: str) -> Dict[str, Any]:
+        return self._call("trades_imported", user_id)
+
+    def recent_trades(self, limit: int = 20) -> List[Dict[str, Any]]:
+        return self._call("recent_trades", limit)
+
+    def profile_bots(self, seconds: float, interval: float = 0.005) -> Optional[Dict[str, Any]]:
+        return self._call("profile_bots", seconds, interval)
+
+    def on_tick(self, symbol: str, price: float, ts_ms: Optional[int] = None) -> None:
+        return self._call("on_tick", symbol, price, ts_ms)
+
+    def candles_range(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return self._call("candles_range", *args, **kwargs)
+
+    def candle_events(self, after: Optional[int] = None, symbol: Optional[str] = None,
+                      interval: Optional[str] = None) -> Dict[str, Any]:
+        return self._call("candle_events", after, symbol, interval)
@@ -0,0 +1,211 @@
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .kline_store import klines_to_arrays, interval_ms
+from .price_bulk import iter_history_batches
+
+KLINES_LIMIT = 1000
+
+
+def load_ticks(storage, symbol: str, start_ts: int = 0, end_ts: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """All stored ticks for a symbol (archive + hot CSV), sorted and unique on timestamp."""
+    parts = list(iter_history_batches(storage, symbol, start_ts, end_ts))
+    if not parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    ts = np.concatenate([p[0] for p in parts])
+    px = np.concatenate([p[1] for p in parts])
+    if ts.size > 1 and (np.diff(ts) <= 0).any():
+        order = np.argsort(ts, kind="stable")
+        ts, px = ts[order], px[order]
+        keep = np.append(ts[1:] != ts[:-1], True)
+        ts, px = ts[keep], px[keep]
+    return ts, px
+
+
+def find_gaps(timestamps: np.ndarray, max_gap_ms: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(starts, ends) of every interval between consecutive ticks wider than ``max_gap_ms``."""
+    if timestamps.size < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    idx = np.flatnonzero(np.diff(timestamps) > max_gap_ms)
+    return timestamps[idx], timestamps[idx + 1]
+
+
+def coverage_report(timestamps: np.ndarray, starts: np.ndarray, ends: np.ndarray, max_gap_ms: int,
+                    top: int = 10) -> Dict[str, Any]:
+    """Summary of how much of a tick series' span is covered at ``max_gap_ms`` resolution."""
+    if timestamps.size == 0:
+        return {"ticks": 0, "gaps": 0, "coverage": 0.0}
+    span = int(timestamps[-1] - timestamps[0])
+    widths = ends - starts
+    missing = int(widths.sum())
+    largest = np.argsort(widths)[::-1][:top]
+    return {
+        "ticks": int(timestamps.size),
+        "first": int(timestamps[0]),
+        "last": int(timestamps[-1]),
+        "max_gap_ms": max_gap_ms,
+        "gaps": int(starts.size),
+        "missing_ms": missing,
+        "coverage": round(1 - missing / span, 6) if span else 1.0,
+        "largest_gaps": [{"start": int(starts[i]), "end": int(ends[i]), "ms": int(widths[i])} for i in largest],
+    }
+
+
+def _request_windows(starts: np.ndarray, ends: np.ndarray, span_ms: int) -> List[Tuple[int, int]]:
+    """Merge neighbouring gaps into windows no wider than one klines page."""
+    windows: List[Tuple[int, int]] = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if windows and end - windows[-1][0] <= span_ms:
+            windows[-1] = (windows[-1][0], end)
+        else:
+            windows.append((start, end))
+    return windows
+
+
+class GapRepairService:
+    """Finds holes in stored tick series and fills them from klines.
+
+    Ticks are only written when something polls a price, so the series
+    has missing hours. A scan loads a symbol's ticks once and finds every
+    gap with a single ``np.diff``; repair makes sure the kline store holds
+    the candles covering those gaps (fetching only the missing windows,
+    merged into full pages, under the backfill rate limiter) and writes
+    each candle's close inside a gap as a tick, in one archive write.
+    """
+
+    def __init__(self, storage, backfill, max_gap_ms: int = 300_000, interval: str = "1m"):
+        self.storage = storage
+        self.backfill = backfill
+        self.store = backfill.store
+        self.max_gap_ms = max_gap_ms
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    def symbols(self) -> List[str]:
+        """Symbols with ticks in either tier."""
+        found = set(self.storage.archive.symbols())
+        for filename in os.listdir(self.storage.data_dir):
+            if filename.endswith('_prices.csv'):
+                found.add(filename[:-len('_prices.csv')].upper())
+        return sorted(found)
+
+    def _ensure_klines(self, symbol: str, interval: str, windows: List[Tuple[int, int]]) -> int:
+        """Fetch candles for windows the kline store does not fully cover; returns requests made."""
+        step = interval_ms(interval)
+        requests = 0
+        for start, end in windows:
+            if self._stop_event.is_set():
+                break
+            first = start - start % step
+            expected = (end - first) // step + 1
+            if self.store.read_range(symbol, interval, first, end)["open_time"].size >= expected:
+                continue
+            cursor = first
+            while cursor <= end:
+                page = self.backfill.fetch_page(symbol, interval, cursor, end)
+                requests += 1
+                if not page:
+                    break
+                arrays = klines_to_arrays(page)
+                closed = arrays["close_time"] < int(time.time() * 1000)
+                self.store.write(symbol, interval, {k: v[closed] for k, v in arrays.items()})
+                if len(page) < KLINES_LIMIT:
+                    break
+                cursor = int(arrays["open_time"][-1]) + step
+        return requests
+
+    def scan(self, symbol: str, max_gap_ms: Optional[int] = None) -> Dict[str, Any]:
+        max_gap_ms = max_gap_ms or self.max_gap_ms
+        started = time.perf_counter()
+        ts, _ = load_ticks(self.storage, symbol)
+        starts, ends = find_gaps(ts, max_gap_ms)
+        report = coverage_report(ts, starts, ends, max_gap_ms)
+        report.update(symbol=symbol, seconds=round(time.perf_counter() - started, 3))
+        return report
+
+    def repair(self, symbol: str, max_gap_ms: Optional[int] = None, interval: Optional[str] = None) -> Dict[str, Any]:
+        """Scan one symbol, fill its gaps from klines and report coverage before and after."""
+        max_gap_ms = max_gap_ms or self.max_gap_ms
+        interval = interval or self.interval
+        step = interval_ms(interval)
+        if step >= max_gap_ms:
+            raise ValueError(f"Kline interval {interval} is not finer than the {max_gap_ms} ms gap threshold")
+
+        started = time.perf_counter()
+        ts, _ = load_ticks(self.storage, symbol)
+        starts, ends = find_gaps(ts, max_gap_ms)
+        before = coverage_report(ts, starts, ends, max_gap_ms)
+        requests = filled = 0
+        if starts.size:
+            requests = self._ensure_klines(symbol, interval, _request_windows(starts, ends, KLINES_LIMIT * step))
+            candles = self.store.read_range(symbol, interval, int(starts[0]), int(ends[-1]))
+            open_times = candles["open_time"]
+            # Gap each candle falls in, if any; strictly inside so real ticks win
+            gap = np.searchsorted(starts, open_times, side="right") - 1
+            valid = gap >= 0
+            inside = np.zeros(open_times.size, dtype=bool)
+            inside[valid] = (open_times[valid] > starts[gap[valid]]) & (open_times[valid] < ends[gap[valid]])
+            if inside.any():
+                self.storage.archive.write(symbol, open_times[inside], candles["close"][inside])
+                self.storage.invalidate_window(symbol)
+                filled = int(inside.sum())
+                ts = np.union1d(ts, open_times[inside])
+                starts, ends = find_gaps(ts, max_gap_ms)
+
+        after = coverage_report(ts, starts, ends, max_gap_ms)
+        return {
+            "symbol": symbol,
+            "interval": interval,
+            "filled_ticks": filled,
+            "kline_requests": requests,
+            "before": before,
+            "after": after,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def run(self, symbols: Optional[List[str]] = None, max_gap_ms: Optional[int] = None,
+            interval: Optional[str] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """Scan (and unless ``dry_run`` repair) each symbol; returns the coverage report."""
+        started = time.perf_counter()
+        results, errors = [], {}
+        for symbol in symbols or self.symbols():
+            if self._stop_event.is_set():
+                break
+            try:
+                if dry_run:
+                    results.append(self.scan(symbol.upper(), max_gap_ms))
+                else:
+                    results.append(self.repair(symbol.upper(), max_gap_ms, interval))
+            except Exception as e:
+                errors[symbol.upper()] = str(e)
+        self.last_result = {
+            "symbols": results,
+            "errors": errors,
+            "dry_run": dry_run,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        return self.last_result
+
+    def start(self, *args, **kwargs) -> bool:
+        """Run in a background thread; returns False if a run is in progress."""
+        if self.is_running():
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, args=args, kwargs=kwargs, daemon=True, name="gap-repair")
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> Dict[str, Any]:
+        return {"running": self.is_running(), "last_result": self.last_result}
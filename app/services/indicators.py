@@ -0,0 +1,301 @@
+import math
+import threading
+from typing import Dict, Optional, Any, Tuple, List
+
+
+class Indicator:
+    """Streaming indicator updated once per tick in O(1)."""
+
+    def update(self, price: float, volume: float = 1.0) -> None:
+        raise NotImplementedError
+
+    @property
+    def ready(self) -> bool:
+        raise NotImplementedError
+
+    @property
+    def value(self) -> Any:
+        raise NotImplementedError
+
+
+class _RingBuffer:
+    """Fixed-size window keeping running sum and sum of squares.
+
+    The running sums are rebuilt from the buffer once per full
+    rotation, which bounds float drift at amortised O(1) cost.
+    """
+
+    __slots__ = ("size", "values", "index", "count", "total", "total_sq", "_since_rebuild")
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("window must be >= 1")
+        self.size = size
+        self.values = [0.0] * size
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._since_rebuild = 0
+
+    def push(self, x: float) -> None:
+        if self.count == self.size:
+            old = self.values[self.index]
+            self.total -= old
+            self.total_sq -= old * old
+        else:
+            self.count += 1
+        self.values[self.index] = x
+        self.total += x
+        self.total_sq += x * x
+        self.index = (self.index + 1) % self.size
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.size:
+            window = self.values if self.count == self.size else self.values[:self.count]
+            self.total = math.fsum(window)
+            self.total_sq = math.fsum(v * v for v in window)
+            self._since_rebuild = 0
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.size
+
+    def mean(self) -> float:
+        return self.total / self.count
+
+    def std(self, ddof: int = 0) -> float:
+        n = self.count
+        if n - ddof <= 0:
+            return 0.0
+        var = (self.total_sq - self.total * self.total / n) / (n - ddof)
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class SMA(Indicator):
+    def __init__(self, window: int = 20):
+        self.window = int(window)
+        self._buf = _RingBuffer(self.window)
+
+    def update(self, price: float, volume: float = 1.0) -> None:
+        self._buf.push(price)
+
+    @property
+    def ready(self) -> bool:
+        return self._buf.full
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._buf.mean() if self._buf.count else None
+
+
+class EMA(Indicator):
+    def __init__(self, period: int = 20):
+        self.period = int(period)
+        self.alpha = 2.0 / (self.period + 1)
+        self._value: Optional[float] = None
+        self._count = 0
+
+    def update(self, price: float, volume: float = 1.0) -> None:
+        self._count += 1
+        if self._value is None:
+            self._value = price
+        else:
+            self._value += self.alpha * (price - self._value)
+
+    @property
+    def ready(self) -> bool:
+        return self._count >= self.period
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._value
+
+
+class RSI(Indicator):
+    """Wilder's RSI: simple average seed, then exponential smoothing."""
+
+    def __init__(self, period: int = 14):
+        self.period = int(period)
+        self._prev: Optional[float] = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._count = 0
+
+    def update(self, price: float, volume: float = 1.0) -> None:
+        if self._prev is None:
+            self._prev = price
+            return
+        change = price - self._prev
+        self._prev = price
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        self._count += 1
+        if self._count <= self.period:
+            self._avg_gain += gain / self.period
+            self._avg_loss += loss / self.period
+        else:
+            self._avg_gain = (self._avg_gain * (self.period - 1) + gain) / self.period
+            self._avg_loss = (self._avg_loss * (self.period - 1) + loss) / self.period
+
+    @property
+    def ready(self) -> bool:
+        return self._count >= self.period
+
+    @property
+    def value(self) -> Optional[float]:
+        if not self._count:
+            return None
+        if self._avg_loss == 0:
+            return 100.0 if self._avg_gain > 0 else 50.0
+        rs = self._avg_gain / self._avg_loss
+        return 100.0 - 100.0 / (1.0 + rs)
+
+
+class RollingVolatility(Indicator):
+    """Sample standard deviation of log returns over a window of ticks."""
+
+    def __init__(self, window: int = 20):
+        self.window = int(window)
+        self._buf = _RingBuffer(self.window)
+        self._prev: Optional[float] = None
+
+    def update(self, price: float, volume: float = 1.0) -> None:
+        if self._prev is not None and self._prev > 0 and price > 0:
+            self._buf.push(math.log(price / self._prev))
+        self._prev = price
+
+    @property
+    def ready(self) -> bool:
+        return self._buf.full
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._buf.std(ddof=1) if self._buf.count > 1 else None
+
+
+class BollingerBands(Indicator):
+    def __init__(self, window: int = 20, k: float = 2.0):
+        self.window = int(window)
+        self.k = float(k)
+        self._buf = _RingBuffer(self.window)
+
+    def update(self, price: float, volume: float = 1.0) -> None:
+        self._buf.push(price)
+
+    @property
+    def ready(self) -> bool:
+        return self._buf.full
+
+    @property
+    def value(self) -> Optional[Dict[str, float]]:
+        if not self._buf.count:
+            return None
+        mid = self._buf.mean()
+        width = self.k * self._buf.std()
+        return {"lower": mid - width, "middle": mid, "upper": mid + width}
+
+
+class VWAP(Indicator):
+    """Volume-weighted average price, cumulative or over a rolling window.
+
+    Price ticks carry no volume, so each tick defaults to weight 1.
+    """
+
+    def __init__(self, window: int = 0):
+        self.window = int(window)
+        self._pv = _RingBuffer(self.window) if self.window else None
+        self._v = _RingBuffer(self.window) if self.window else None
+        self._cum_pv = 0.0
+        self._cum_v = 0.0
+
+    def update(self, price: float, volume: float = 1.0) -> None:
+        if self._pv is not None:
+            self._pv.push(price * volume)
+            self._v.push(volume)
+        else:
+            self._cum_pv += price * volume
+            self._cum_v += volume
+
+    @property
+    def ready(self) -> bool:
+        return self._v.full if self._v is not None else self._cum_v > 0
+
+    @property
+    def value(self) -> Optional[float]:
+        if self._v is not None:
+            return self._pv.total / self._v.total if self._v.total else None
+        return self._cum_pv / self._cum_v if self._cum_v else None
+
+
+INDICATORS = {
+    "sma": SMA,
+    "ema": EMA,
+    "rsi": RSI,
+    "volatility": RollingVolatility,
+    "bollinger": BollingerBands,
+    "vwap": VWAP,
+}
+
+
+def parse_spec(spec: str) -> Tuple[str, List[float]]:
+    """Parse 'ema:20' or 'bollinger:20:2' into (name, args)."""
+    name, *args = spec.lower().split(":")
+    if name not in INDICATORS:
+        raise ValueError(f"Unknown indicator: {name}")
+    return name, [float(a) if "." in a else int(a) for a in args]
+
+
+def create_indicator(spec: str) -> Indicator:
+    name, args = parse_spec(spec)
+    return INDICATORS[name](*args)
+
+
+class IndicatorHub:
+    """Shared per-symbol indicators, updated once per tick for all subscribers.
+
+    Bots subscribe to specs such as ``"ema:12"``; identical specs on the
+    same symbol share a single instance, reference-counted so the last
+    unsubscribe drops it.
+    """
+
+    def __init__(self):
+        self._indicators: Dict[str, Dict[str, Indicator]] = {}
+        self._refs: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, symbol: str, spec: str) -> str:
+        key = spec.lower()
+        with self._lock:
+            per_symbol = self._indicators.setdefault(symbol, {})
+            if key not in per_symbol:
+                per_symbol[key] = create_indicator(key)
+            self._refs[(symbol, key)] = self._refs.get((symbol, key), 0) + 1
+        return key
+
+    def unsubscribe(self, symbol: str, spec: str) -> None:
+        key = spec.lower()
+        with self._lock:
+            refs = self._refs.get((symbol, key), 0) - 1
+            if refs > 0:
+                self._refs[(symbol, key)] = refs
+                return
+            self._refs.pop((symbol, key), None)
+            per_symbol = self._indicators.get(symbol, {})
+            per_symbol.pop(key, None)
+            if not per_symbol:
+                self._indicators.pop(symbol, None)
+
+    def update(self, symbol: str, price: float, volume: float = 1.0) -> None:
+        with self._lock:
+            for indicator in self._indicators.get(symbol, {}).values():
+                indicator.update(price, volume)
+
+    def get(self, symbol: str, spec: str) -> Optional[Indicator]:
+        return self._indicators.get(symbol, {}).get(spec.lower())
+
+    def snapshot(self, symbol: str) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                key: {"value": ind.value, "ready": ind.ready}
+                for key, ind in self._indicators.get(symbol, {}).items()
+            }
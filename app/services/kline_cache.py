@@ -0,0 +1,90 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .kline_store import KlineStore, klines_to_arrays, empty_arrays, concat_arrays, interval_ms
+
+KLINES_LIMIT = 1000
+
+
+class KlineCache:
+    """Read-through kline cache backed by the persistent ``KlineStore``.
+
+    Closed candles are written to the store once and never refetched; a
+    window request only asks Binance for candles after the last stored
+    one (plus, once, any head gap before the first). The still-open
+    candle is held in memory for ``open_ttl`` seconds, so repeated chart
+    loads within that time cost no request at all.
+    """
+
+    def __init__(self, binance, store: KlineStore, open_ttl: float = 5.0):
+        self.binance = binance
+        self.store = store
+        self.open_ttl = open_ttl
+        # (symbol, interval) -> (fetched_at monotonic, open candle arrays)
+        self._open: Dict[Tuple[str, str], Tuple[float, Dict[str, np.ndarray]]] = {}
+        # (symbol, interval) -> earliest start already checked against Binance
+        self._covered_from: Dict[Tuple[str, str], int] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _fetch(self, symbol: str, interval: str, start_ts: int, end_ts: Optional[int]) -> Dict[str, np.ndarray]:
+        """Fetch [start_ts, end_ts] page by page and store closed candles; returns the open candle."""
+        step = interval_ms(interval)
+        cursor = start_ts
+        open_candle = empty_arrays()
+        while True:
+            page = self.binance.get_klines(symbol, interval, start_time=cursor, end_time=end_ts, limit=KLINES_LIMIT)
+            if not page:
+                break
+            arrays = klines_to_arrays(page)
+            closed = arrays["close_time"] < int(time.time() * 1000)
+            if closed.any():
+                self.store.write(symbol, interval, {k: v[closed] for k, v in arrays.items()})
+            if not closed.all():
+                open_candle = {k: v[~closed] for k, v in arrays.items()}
+            if len(page) < KLINES_LIMIT:
+                break
+            cursor = int(arrays["open_time"][-1]) + step
+            if end_ts is not None and cursor > end_ts:
+                break
+        return open_candle
+
+    def get(self, symbol: str, interval: str, start_ts: int) -> Dict[str, np.ndarray]:
+        """Candles from start_ts to now, closed ones from the store plus the open one."""
+        key = (symbol, interval)
+        step = interval_ms(interval)
+        with self._lock_for(key):
+            now = time.monotonic()
+            cached = self._open.get(key)
+            if cached is None or now - cached[0] >= self.open_ttl:
+                last_open = self.store.last_open_time(symbol, interval)
+                tail_start = start_ts if last_open is None else max(last_open + step, start_ts)
+                open_candle = self._fetch(symbol, interval, tail_start, None)
+                self._open[key] = (now, open_candle)
+                if last_open is None:
+                    self._covered_from[key] = start_ts
+
+            # Head gap: window starts before anything we have stored or checked
+            covered_from = self._covered_from.get(key)
+            if covered_from is None or start_ts < covered_from:
+                first_open = self.store.first_open_time(symbol, interval)
+                if first_open is not None and start_ts < first_open:
+                    self._fetch(symbol, interval, start_ts, first_open - 1)
+                self._covered_from[key] = start_ts
+
+            stored = self.store.read_range(symbol, interval, start_ts)
+            open_candle = self._open[key][1]
+        if open_candle["open_time"].size and (
+                not stored["open_time"].size or open_candle["open_time"][0] > stored["open_time"][-1]):
+            return concat_arrays([stored, open_candle])
+        return stored
+
+    def invalidate(self, symbol: str, interval: str) -> None:
+        self._open.pop((symbol, interval), None)
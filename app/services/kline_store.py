@@ -0,0 +1,149 @@
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Iterable, Any
+
+import numpy as np
+
+from .price_archive import save_npz
+
+INTERVAL_MS = {
+    "1s": 1_000,
+    "1m": 60_000,
+    "3m": 180_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "2h": 7_200_000,
+    "4h": 14_400_000,
+    "6h": 21_600_000,
+    "8h": 28_800_000,
+    "12h": 43_200_000,
+    "1d": 86_400_000,
+    "3d": 259_200_000,
+    "1w": 604_800_000,
+}
+
+COLUMNS = ("open_time", "open", "high", "low", "close", "volume", "close_time")
+_INT_COLUMNS = ("open_time", "close_time")
+_PARTITION_RE = re.compile(r"^(\d{4}-\d{2}(?:-\d{2})?)\.npz$")
+# Partition granularity -> numpy datetime unit
+PARTITION_UNITS = {"month": "M", "day": "D"}
+
+
+def interval_ms(interval: str) -> int:
+    try:
+        return INTERVAL_MS[interval]
+    except KeyError:
+        raise ValueError(f"Unsupported kline interval: {interval}") from None
+
+
+def klines_to_arrays(klines: Iterable[List[Any]]) -> Dict[str, np.ndarray]:
+    """Convert raw Binance kline rows into column arrays."""
+    rows = [k[:7] for k in klines]
+    if not rows:
+        return empty_arrays()
+    table = np.array(rows, dtype=object)
+    return {
+        name: table[:, i].astype(np.int64 if name in _INT_COLUMNS else np.float64)
+        for i, name in enumerate(COLUMNS)
+    }
+
+
+def empty_arrays() -> Dict[str, np.ndarray]:
+    return {name: np.empty(0, dtype=np.int64 if name in _INT_COLUMNS else np.float64) for name in COLUMNS}
+
+
+def concat_arrays(parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    if not parts:
+        return empty_arrays()
+    return {name: np.concatenate([p[name] for p in parts]) for name in COLUMNS}
+
+
+class KlineStore:
+    """Closed candles per (symbol, interval), partitioned by UTC month.
+
+    Layout is ``<base_dir>/<symbol>/<interval>/<YYYY-MM>.npz`` with one
+    array per OHLCV column, sorted and unique on ``open_time``. With
+    ``partition="day"`` files are ``<YYYY-MM-DD>.npz`` instead, which keeps
+    the rewrite per write small for second bars.
+    """
+
+    def __init__(self, base_dir: str, compresslevel: int = 1, partition: str = "month"):
+        if partition not in PARTITION_UNITS:
+            raise ValueError(f"partition must be one of {tuple(PARTITION_UNITS)}")
+        self.base_dir = base_dir
+        self.compresslevel = compresslevel
+        self._unit = PARTITION_UNITS[partition]
+        self._lock = threading.Lock()
+        os.makedirs(base_dir, exist_ok=True)
+
+    def _series_dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.base_dir, symbol.lower(), interval)
+
+    def partitions(self, symbol: str, interval: str) -> List[str]:
+        path = self._series_dir(symbol, interval)
+        if not os.path.isdir(path):
+            return []
+        return sorted(m.group(1) for m in map(_PARTITION_RE.match, os.listdir(path)) if m)
+
+    def _load(self, symbol: str, interval: str, month: str) -> Dict[str, np.ndarray]:
+        with np.load(os.path.join(self._series_dir(symbol, interval), f"{month}.npz")) as data:
+            return {name: data[name] for name in COLUMNS}
+
+    def _months(self, open_times: np.ndarray) -> np.ndarray:
+        return open_times.astype("datetime64[ms]").astype(f"datetime64[{self._unit}]")
+
+    def write(self, symbol: str, interval: str, arrays: Dict[str, np.ndarray]) -> int:
+        """Merge candles into their partitions; returns candles written."""
+        if arrays["open_time"].size == 0:
+            return 0
+        path = self._series_dir(symbol, interval)
+        os.makedirs(path, exist_ok=True)
+        months = self._months(arrays["open_time"])
+        with self._lock:
+            for month in np.unique(months):
+                mask = months == month
+                name = str(month)
+                chunk = {k: v[mask] for k, v in arrays.items()}
+                file_path = os.path.join(path, f"{name}.npz")
+                if os.path.exists(file_path):
+                    chunk = concat_arrays([self._load(symbol, interval, name), chunk])
+                # Later writes win for a repeated open_time
+                order = np.argsort(chunk["open_time"], kind="stable")
+                chunk = {k: v[order] for k, v in chunk.items()}
+                keep = np.append(chunk["open_time"][1:] != chunk["open_time"][:-1], True)
+                tmp_path = file_path + ".tmp"
+                save_npz(tmp_path, {k: v[keep] for k, v in chunk.items()}, self.compresslevel)
+                os.replace(tmp_path, file_path)
+        return int(arrays["open_time"].size)
+
+    def read_range(self, symbol: str, interval: str, start_ts: int, end_ts: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Candles with open_time in [start_ts, end_ts] from overlapping partitions only."""
+        first = str(self._months(np.array([int(start_ts)]))[0])
+        last = str(self._months(np.array([int(end_ts)]))[0]) if end_ts is not None else None
+        parts = []
+        for month in self.partitions(symbol, interval):
+            if month < first or (last is not None and month > last):
+                continue
+            data = self._load(symbol, interval, month)
+            lo = np.searchsorted(data["open_time"], start_ts, side="left")
+            hi = np.searchsorted(data["open_time"], end_ts, side="right") if end_ts is not None else data["open_time"].size
+            if hi > lo:
+                parts.append({k: v[lo:hi] for k, v in data.items()})
+        return concat_arrays(parts)
+
+    def first_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        months = self.partitions(symbol, interval)
+        if not months:
+            return None
+        open_times = self._load(symbol, interval, months[0])["open_time"]
+        return int(open_times[0]) if open_times.size else None
+
+    def last_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        months = self.partitions(symbol, interval)
+        if not months:
+            return None
+        open_times = self._load(symbol, interval, months[-1])["open_time"]
+        return int(open_times[-1]) if open_times.size else None
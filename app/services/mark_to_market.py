@@ -0,0 +1,110 @@
+import threading
+import time
+from typing import Dict, Any, List, Optional, Iterable
+
+import numpy as np
+
+
+def mark_positions(positions: List[Dict[str, Any]], prices: Dict[str, float]) -> List[Dict[str, Any]]:
+    """Unrealized PnL for position rows ``{user_id, symbol, quantity, cost}``.
+
+    Entry price is the average cost; rows whose symbol has no price are
+    returned unmarked. One array expression covers every row.
+    """
+    if not positions:
+        return []
+    quantity = np.fromiter((p["quantity"] for p in positions), dtype=np.float64, count=len(positions))
+    cost = np.fromiter((p["cost"] for p in positions), dtype=np.float64, count=len(positions))
+    current = np.fromiter((prices.get(p["symbol"], np.nan) for p in positions), dtype=np.float64, count=len(positions))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        entry = np.where(quantity > 0, cost / quantity, np.nan)
+    pnl = (current - entry) * quantity
+
+    marked = []
+    for row, entry_price, price, value in zip(positions, entry.tolist(), current.tolist(), pnl.tolist()):
+        marked.append({
+            "user_id": row["user_id"],
+            "symbol": row["symbol"],
+            "quantity": row["quantity"],
+            "entry_price": None if entry_price != entry_price else entry_price,
+            "current_price": None if price != price else price,
+            "unrealized_pnl": None if value != value else value,
+        })
+    return marked
+
+
+class MarkToMarketJob(threading.Thread):
+    """Periodically prices every held symbol and publishes unrealized PnL.
+
+    Prices come from the threshold engine's symbol loops when they are
+    polling the symbol already, and the rest from one batched ticker
+    call. The engine portfolio is marked through ``update_prices`` and
+    every user's open positions with ``mark_positions``; readers only ever
+    see the published ``marks``. Positions are the risk engine's counters,
+    kept per fill and seeded from trades once at startup, so a run never
+    queries the database.
+    """
+
+    def __init__(self, binance, portfolio, threshold_engine=None, risk=None, interval: float = 5.0):
+        super().__init__(daemon=True, name="mark-to-market")
+        self.binance = binance
+        self.portfolio = portfolio
+        self.threshold_engine = threshold_engine
+        self.risk = risk
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._marks: Dict[str, Any] = {"prices": {}, "positions": {}, "updated_at": None}
+        self.last_error: Optional[str] = None
+
+    def fetch_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        symbols = sorted(set(symbols))
+        prices = {}
+        if self.threshold_engine is not None:
+            cached = self.threshold_engine.last_prices()
+            prices.update({s: cached[s] for s in symbols if s in cached})
+        missing = [s for s in symbols if s not in prices]
+        if missing:
+            prices.update(self.binance.get_prices(missing))
+        return prices
+
+    def _user_positions(self) -> List[Dict[str, Any]]:
+        return self.risk.open_positions() if self.risk is not None else []
+
+    def run_once(self) -> Dict[str, Any]:
+        positions = self._user_positions()
+        symbols = set(self.portfolio.held_symbols()) | {p["symbol"] for p in positions}
+        prices = self.fetch_prices(symbols) if symbols else {}
+        self.portfolio.update_prices(prices)
+
+        by_user: Dict[str, List[Dict[str, Any]]] = {}
+        for row in mark_positions(positions, prices):
+            by_user.setdefault(str(row.pop("user_id")), []).append(row)
+        marks = {"prices": prices, "positions": by_user, "updated_at": int(time.time() * 1000)}
+        with self._lock:
+            self._marks = marks
+        return marks
+
+    def marks(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Published prices, plus the given user's marked positions (all users if None)."""
+        with self._lock:
+            marks = self._marks
+        if user_id is None:
+            return marks
+        return {"prices": marks["prices"], "updated_at": marks["updated_at"],
+                "positions": marks["positions"].get(str(user_id), [])}
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Warning: mark-to-market failed: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=timeout)
@@ -29,6 +29,8 @@ class PortfolioManager:
         self.binance = binance_client
         self.positions: Dict[str, Position] = {}
         self.trades: List[Trade] = []
+        # PnL realized on positions that have since been closed and removed
+        self.closed_realized_pnl = 0.0
         self._lock = None  # Will be set by Flask app
         
     def set_lock(self, lock):
@@ -73,11 +75,17 @@ class PortfolioManager:
                     
                     # Remove position if quantity becomes 0
                     if pos.quantity <= 0:
-                        del self.positions[trade.symbol]
+                        self._close_position(trade.symbol)
                 else:
-                    # Partial sell - this shouldn't happen in normal trading
+                    # Oversells are rejected by the pre-trade risk checks; if one slips through
+                    # (e.g. limits disabled) realize PnL on what was actually held
+                    pos.realized_pnl += (trade.price - pos.entry_price) * pos.quantity
                     pos.quantity = 0
-                    del self.positions[trade.symbol]
+                    self._close_position(trade.symbol)
+
+    def _close_position(self, symbol: str) -> None:
+        """Drop a flat position, keeping its realized PnL in the portfolio total."""
+        self.closed_realized_pnl += self.positions.pop(symbol).realized_pnl
     
     def update_prices(self, prices: Dict[str, float]) -> None:
         """Update current prices and calculate unrealized PnL"""
@@ -92,6 +100,12 @@ class PortfolioManager:
             if symbol in prices:
                 position.current_price = prices[symbol]
                 position.unrealized_pnl = (position.current_price - position.entry_price) * position.quantity
+
+    def held_symbols(self) -> List[str]:
+        if self._lock:
+            with self._lock:
+                return list(self.positions)
+        return list(self.positions)
     
     def get_portfolio_summary(self) -> Dict[str, Any]:
         """Get portfolio summary with positions and PnL"""
@@ -102,7 +116,7 @@ class PortfolioManager:
             return self._get_portfolio_summary_internal()
     
     def _get_portfolio_summary_internal(self) -> Dict[str, Any]:
-        total_realized_pnl = sum(pos.realized_pnl for pos in self.positions.values())
+        total_realized_pnl = self.closed_realized_pnl + sum(pos.realized_pnl for pos in self.positions.values())
         total_unrealized_pnl = sum(pos.unrealized_pnl or 0 for pos in self.positions.values())
         
         positions_data = []
@@ -0,0 +1,146 @@
+import os
+import re
+import threading
+import zipfile
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Tuple, Optional
+
+import numpy as np
+
+DAY_MS = 86_400_000
+_PARTITION_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})\.npz$")
+
+
+def _day_of(timestamp_ms: int) -> int:
+    return int(timestamp_ms) // DAY_MS
+
+
+def _day_name(day: int) -> str:
+    return datetime.fromtimestamp(day * 86_400, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _name_day(name: str) -> int:
+    dt = datetime.strptime(name, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return int(dt.timestamp()) // 86_400
+
+
+def save_npz(path: str, arrays: Dict[str, np.ndarray], compresslevel: int = 1) -> None:
+    """Write an .npz readable by np.load, deflated at a fast compression level.
+
+    ``np.savez_compressed`` always uses zlib's default level, which made
+    compression the bulk of partition write time.
+    """
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zf:
+        for name, array in arrays.items():
+            with zf.open(f"{name}.npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, np.ascontiguousarray(array), allow_pickle=False)
+
+
+class PriceArchive:
+    """Cold tier of price ticks: one compressed partition per symbol per UTC day.
+
+    Layout is ``<base_dir>/<symbol>/<YYYY-MM-DD>.npz`` holding sorted
+    ``timestamp`` (int64 ms) and ``price`` (float64) arrays. Range reads
+    open only the partitions overlapping the window, and retention is a
+    matter of unlinking whole partitions.
+    """
+
+    def __init__(self, base_dir: str, compresslevel: int = 1):
+        self.base_dir = base_dir
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        os.makedirs(base_dir, exist_ok=True)
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.base_dir, symbol.lower())
+
+    def _partition_path(self, symbol: str, day: int) -> str:
+        return os.path.join(self._symbol_dir(symbol), f"{_day_name(day)}.npz")
+
+    def symbols(self) -> List[str]:
+        if not os.path.isdir(self.base_dir):
+            return []
+        return sorted(d.upper() for d in os.listdir(self.base_dir)
+                      if os.path.isdir(os.path.join(self.base_dir, d)))
+
+    def partitions(self, symbol: str) -> List[int]:
+        """Sorted day numbers (days since epoch) that have a partition."""
+        path = self._symbol_dir(symbol)
+        if not os.path.isdir(path):
+            return []
+        days = []
+        for name in os.listdir(path):
+            match = _PARTITION_RE.match(name)
+            if match:
+                days.append(_name_day(match.group(1)))
+        return sorted(days)
+
+    @staticmethod
+    def _load(path: str) -> Tuple[np.ndarray, np.ndarray]:
+        with np.load(path) as data:
+            return data["timestamp"], data["price"]
+
+    def _save(self, path: str, timestamps: np.ndarray, prices: np.ndarray) -> None:
+        save_npz(path, {"timestamp": timestamps, "price": prices}, self.compresslevel)
+
+    def write(self, symbol: str, timestamps: np.ndarray, prices: np.ndarray) -> int:
+        """Merge ticks into their day partitions; returns partitions touched."""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if timestamps.size == 0:
+            return 0
+        os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+        days = timestamps // DAY_MS
+        order = np.argsort(days, kind="stable")
+        timestamps, prices, days = timestamps[order], prices[order], days[order]
+        bounds = np.flatnonzero(np.diff(days)) + 1
+        touched = 0
+        with self._lock:
+            for ts_chunk, px_chunk in zip(np.split(timestamps, bounds), np.split(prices, bounds)):
+                day = int(ts_chunk[0] // DAY_MS)
+                path = self._partition_path(symbol, day)
+                if os.path.exists(path):
+                    old_ts, old_px = self._load(path)
+                    ts_chunk = np.concatenate([old_ts, ts_chunk])
+                    px_chunk = np.concatenate([old_px, px_chunk])
+                # Sort and keep the last value written for duplicate timestamps
+                order = np.argsort(ts_chunk, kind="stable")
+                ts_chunk, px_chunk = ts_chunk[order], px_chunk[order]
+                keep = np.append(ts_chunk[1:] != ts_chunk[:-1], True)
+                tmp_path = path + ".tmp"
+                self._save(tmp_path, ts_chunk[keep], px_chunk[keep])
+                os.replace(tmp_path, path)
+                touched += 1
+        return touched
+
+    def iter_range(self, symbol: str, start_ts: int, end_ts: Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield per-partition tick arrays within [start_ts, end_ts], oldest first."""
+        first_day = _day_of(start_ts)
+        last_day = _day_of(end_ts) if end_ts is not None else None
+        for day in self.partitions(symbol):
+            if day < first_day or (last_day is not None and day > last_day):
+                continue
+            ts, px = self._load(self._partition_path(symbol, day))
+            lo = np.searchsorted(ts, start_ts, side="left")
+            hi = np.searchsorted(ts, end_ts, side="right") if end_ts is not None else ts.size
+            if hi > lo:
+                yield ts[lo:hi], px[lo:hi]
+
+    def read_range(self, symbol: str, start_ts: int, end_ts: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Ticks in [start_ts, end_ts] from overlapping partitions only."""
+        parts = list(self.iter_range(symbol, start_ts, end_ts))
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def drop_before(self, cutoff_ts: int, symbol: Optional[str] = None) -> int:
+        """Delete whole partitions for days entirely before the cutoff."""
+        cutoff_day = _day_of(cutoff_ts)
+        dropped = 0
+        with self._lock:
+            for sym in ([symbol] if symbol else self.symbols()):
+                for day in self.partitions(sym):
+                    if day < cutoff_day:
+                        os.remove(self._partition_path(sym, day))
+                        dropped += 1
+        return dropped
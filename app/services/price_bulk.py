@@ -0,0 +1,172 @@
+import io
+import os
+import time
+from typing import Iterator, Tuple, Optional, Dict, Any, List
+
+import numpy as np
+
+from .price_archive import DAY_MS
+
+EXPORT_FORMATS = ("parquet", "arrow")
+IMPORT_FORMATS = ("parquet", "csv")
+DEFAULT_BATCH_ROWS = 1_000_000
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError("pyarrow is required for Parquet/Arrow export and import") from exc
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back in chunks."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+def iter_history_batches(storage, symbol: str, start_ts: int = 0, end_ts: Optional[int] = None,
+                         batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield (timestamps, prices) chunks for a time range, oldest first.
+
+    Archive partitions are read one at a time, then the hot CSV in
+    ``batch_rows`` chunks, so memory is bounded by the largest of one
+    partition or one chunk regardless of the range requested.
+    """
+    import pandas as pd
+    end_ts = end_ts if end_ts is not None else int(time.time() * 1000)
+    for ts, px in storage.archive.iter_range(symbol, start_ts, end_ts):
+        for offset in range(0, ts.size, batch_rows):
+            yield ts[offset:offset + batch_rows], px[offset:offset + batch_rows]
+
+    file_path = storage._get_file_path(symbol)
+    if not os.path.exists(file_path):
+        return
+    for chunk in pd.read_csv(file_path, usecols=['timestamp', 'price'], chunksize=batch_rows):
+        chunk = chunk[(chunk['timestamp'] >= start_ts) & (chunk['timestamp'] <= end_ts)]
+        if not chunk.empty:
+            yield chunk['timestamp'].to_numpy(dtype=np.int64), chunk['price'].to_numpy(dtype=np.float64)
+
+
+def export_history(storage, symbol: str, fmt: str = "parquet", start_ts: int = 0, end_ts: Optional[int] = None,
+                   batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[bytes]:
+    """Stream a symbol's history as Parquet (one row group per chunk) or Arrow IPC."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {EXPORT_FORMATS}")
+    _require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([("timestamp", pa.int64()), ("price", pa.float64())])
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for ts, px in iter_history_batches(storage, symbol, start_ts, end_ts, batch_rows):
+            writer.write_batch(pa.record_batch([pa.array(ts), pa.array(px)], schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _iter_import_chunks(path_or_file, fmt: str, batch_rows: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    import pandas as pd
+    if fmt == "parquet":
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path_or_file)
+        for batch in parquet.iter_batches(batch_size=batch_rows, columns=["timestamp", "price"]):
+            yield (batch.column(0).to_numpy(zero_copy_only=False).astype(np.int64, copy=False),
+                   batch.column(1).to_numpy(zero_copy_only=False).astype(np.float64, copy=False))
+    elif fmt == "csv":
+        for chunk in pd.read_csv(path_or_file, usecols=['timestamp', 'price'], chunksize=batch_rows,
+                                 dtype={'timestamp': np.int64, 'price': np.float64}, engine='c'):
+            yield chunk['timestamp'].to_numpy(), chunk['price'].to_numpy()
+    else:
+        raise ValueError(f"format must be one of {IMPORT_FORMATS}")
+
+
+def import_history(storage, symbol: str, path_or_file, fmt: str = "parquet", to_db: bool = True,
+                   batch_rows: int = DEFAULT_BATCH_ROWS, max_buffered_rows: Optional[int] = None) -> Dict[str, Any]:
+    """Bulk-load a Parquet or CSV dump into archive partitions and MongoDB.
+
+    Input is consumed in ``batch_rows`` chunks. Ticks are buffered per
+    day and each day partition is written once the input has moved past
+    that day (or the buffer exceeds ``max_buffered_rows``), so sorted dumps
+    rewrite every partition exactly once. When ``to_db``, each chunk is
+    inserted with one unordered ``insert_many``.
+    """
+    started = time.perf_counter()
+    max_buffered_rows = max_buffered_rows or 4 * batch_rows
+    rows = 0
+    partitions = 0
+    db_rows = 0
+    db = storage.db if to_db and storage.db and getattr(storage.db, 'prices', None) is not None else None
+    # day -> ([timestamp arrays], [price arrays]) not yet written, in input order
+    buffered: Dict[int, Tuple[List[np.ndarray], List[np.ndarray]]] = {}
+    buffered_rows = 0
+
+    def write_days(days) -> int:
+        parts_ts, parts_px = [], []
+        for day in days:
+            ts_parts, px_parts = buffered.pop(day)
+            parts_ts.extend(ts_parts)
+            parts_px.extend(px_parts)
+        if not parts_ts:
+            return 0
+        return storage.archive.write(symbol, np.concatenate(parts_ts), np.concatenate(parts_px))
+
+    for ts, px in _iter_import_chunks(path_or_file, fmt, batch_rows):
+        if ts.size == 0:
+            continue
+        days = ts // DAY_MS
+        for day in np.unique(days).tolist():
+            mask = days == day
+            ts_parts, px_parts = buffered.setdefault(day, ([], []))
+            ts_parts.append(ts[mask])
+            px_parts.append(px[mask])
+        buffered_rows += ts.size
+        if buffered_rows > max_buffered_rows:
+            partitions += write_days(list(buffered))
+        else:
+            # Days before this chunk's first tick are complete in a sorted dump
+            partitions += write_days([day for day in buffered if day < int(days.min())])
+        buffered_rows = sum(part.size for ts_parts, _ in buffered.values() for part in ts_parts)
+        if db is not None:
+            db_rows += db.save_price_points(symbol, ts.tolist(), px.tolist())
+        rows += ts.size
+    partitions += write_days(list(buffered))
+    storage.invalidate_window(symbol)
+    elapsed = time.perf_counter() - started
+    return {
+        "symbol": symbol,
+        "rows": rows,
+        "db_rows": db_rows,
+        "partition_writes": partitions,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": int(rows / elapsed) if elapsed > 0 else rows,
+    }
@@ -1,21 +1,84 @@
 import csv
+import hashlib
 import os
+import threading
 import time
-from typing import List, Dict, Any, Optional
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
-import pandas as pd
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialised
+    fcntl = None
+
+from .price_archive import PriceArchive, DAY_MS
+from .kline_store import KlineStore, klines_to_arrays
+from .kline_cache import KlineCache
+from .price_wire import to_records
+
+
+def _merge_first(ts_parts: List[np.ndarray], px_parts: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted union of tick arrays; for a repeated timestamp the earliest part wins."""
+    if not ts_parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    ts = np.concatenate(ts_parts).astype(np.int64, copy=False)
+    px = np.concatenate(px_parts).astype(np.float64, copy=False)
+    ts, first = np.unique(ts, return_index=True)
+    return ts, px[first]
 
 
 class PriceStorage:
-    def __init__(self, data_dir: str = "data", binance_client=None, db=None):
+    """Tick storage with a hot CSV tier and a partitioned cold archive.
+
+    Recent ticks are appended to ``<symbol>_prices.csv``; ``archive_hot_data``
+    moves older ticks into compressed per-day partitions under
+    ``<data_dir>/archive`` and retention drops whole partitions.
+    """
+
+    def __init__(self, data_dir: str = "data", binance_client=None, db=None, hot_days: int = 1,
+                 kline_store: Optional[KlineStore] = None, kline_open_ttl: float = 5.0, candles=None,
+                 window_ttl: float = 1.0):
         self.data_dir = data_dir
         self.binance = binance_client
         self.db = db
+        self.hot_days = hot_days
         os.makedirs(data_dir, exist_ok=True)
+        self.archive = PriceArchive(os.path.join(data_dir, "archive"))
+        # Closed candles persist in the kline store; only the tail is fetched
+        self.kline_cache = KlineCache(binance_client, kline_store, kline_open_ttl) if kline_store is not None and binance_client else None
+        # Sink of saved ticks with ``on_tick``: the CandleAggregator, or a remote engine building it
+        self.candles = candles
+        # Serialises CSV appends against hot-tier compaction
+        self._hot_lock = threading.Lock()
+        # (symbol, period) -> (loaded at, timestamps, prices, version) behind get_price_window
+        self.window_ttl = window_ttl
+        self._windows: Dict[Tuple[str, str], Tuple[float, np.ndarray, np.ndarray, str]] = {}
+        self._windows_lock = threading.Lock()
         
     def _get_file_path(self, symbol: str) -> str:
         """Get CSV file path for a symbol"""
         return os.path.join(self.data_dir, f"{symbol.lower()}_prices.csv")
+
+    @contextmanager
+    def _hot_file(self, file_path: str):
+        """Hold one hot CSV against appends and compaction from every process sharing the data dir.
+
+        Web workers append ticks while the archive job (in another process)
+        rewrites the file; without the file lock an append to the replaced
+        file would be lost.
+        """
+        with self._hot_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(file_path + ".lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
     
     def save_price(self, symbol: str, price: float, timestamp: Optional[int] = None) -> None:
         """Save a single price point to CSV and MongoDB (if available)."""
@@ -23,15 +86,24 @@ class PriceStorage:
             timestamp = int(time.time() * 1000)
             
         file_path = self._get_file_path(symbol)
-        file_exists = os.path.exists(file_path)
-        
-        with open(file_path, 'a', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            if not file_exists:
-                writer.writerow(['timestamp', 'price', 'datetime'])
-            
-            dt = datetime.fromtimestamp(timestamp / 1000)
-            writer.writerow([timestamp, price, dt.isoformat()])
+
+        with self._hot_file(file_path):
+            file_exists = os.path.exists(file_path)
+            with open(file_path, 'a', newline='') as csvfile:
+                writer = csv.writer(csvfile)
+                if not file_exists:
+                    writer.writerow(['timestamp', 'price', 'datetime'])
+
+                dt = datetime.fromtimestamp(timestamp / 1000)
+                writer.writerow([timestamp, price, dt.isoformat()])
+
+        self.invalidate_window(symbol)
+
+        if self.candles is not None:
+            try:
+                self.candles.on_tick(symbol, price, timestamp)
+            except Exception as e:
+                print(f"Warning: failed to aggregate tick for {symbol}: {e}")
 
         # Also write to MongoDB if available
         if self.db and getattr(self.db, 'prices', None) is not None:
@@ -43,8 +115,13 @@ class PriceStorage:
     
     def fetch_historical_data(self, symbol: str, period: str = "1d") -> List[Dict[str, Any]]:
         """Fetch historical data from Binance API"""
+        return to_records(*self.fetch_historical_arrays(symbol, period))
+
+    def fetch_historical_arrays(self, symbol: str, period: str = "1d") -> Tuple[np.ndarray, np.ndarray]:
+        """Candle open times and close prices for the period, as int64/float64 arrays."""
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
         if not self.binance:
-            return []
+            return empty
         
         try:
             # Calculate time range
@@ -69,71 +146,81 @@ class PriceStorage:
                 interval = "5m"
             
             start_timestamp = int(start_time.timestamp() * 1000)
-            
+
+            # Incremental cache: only candles after the last stored one hit Binance
+            if self.kline_cache is not None:
+                candles = self.kline_cache.get(symbol, interval, start_timestamp)
+                return candles["open_time"], candles["close"]
+
             # Fetch klines/candlestick data from Binance
-            klines = self.binance.client.klines(
-                symbol=symbol,
-                interval=interval,
-                startTime=start_timestamp,
-                limit=1000
-            )
-            
-            data = []
-            for kline in klines:
-                timestamp = int(kline[0])  # Open time
-                price = float(kline[4])    # Close price
-                dt = datetime.fromtimestamp(timestamp / 1000)
-                
-                data.append({
-                    'timestamp': timestamp,
-                    'price': price,
-                    'datetime': dt.isoformat()
-                })
-            
-            return data
+            klines = self.binance.get_klines(symbol, interval, start_time=start_timestamp, limit=1000)
+            candles = klines_to_arrays(klines)
+            return candles["open_time"], candles["close"]
             
         except Exception as e:
             print(f"Error fetching historical data for {symbol}: {e}")
-            return []
+            return empty
     
     def get_price_history(self, symbol: str, period: str = "1d") -> List[Dict[str, Any]]:
         """Get price history combining local storage and Binance API"""
+        return to_records(*self.get_price_arrays(symbol, period))
+
+    def get_price_arrays(self, symbol: str, period: str = "1d") -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted (timestamps, prices) arrays combining local storage and Binance API."""
         # First try to get data from local storage
-        local_data = self._get_local_price_history(symbol, period)
+        local_ts, local_px = self._get_local_price_arrays(symbol, period)
         
         # If we have enough local data, return it
-        if len(local_data) > 10:
-            return local_data
+        if local_ts.size > 10:
+            return local_ts, local_px
         
         # Otherwise, fetch from Binance API and merge
-        api_data = self.fetch_historical_data(symbol, period)
+        api_ts, api_px = self.fetch_historical_arrays(symbol, period)
         
-        if api_data:
-            # Merge API data with local data, avoiding duplicates
-            all_data = {}
-            
-            # Add local data
-            for item in local_data:
-                all_data[item['timestamp']] = item
-            
-            # Add API data (overwrite if newer)
-            for item in api_data:
-                all_data[item['timestamp']] = item
-            
-            # Convert back to list and sort by timestamp
-            merged_data = list(all_data.values())
-            merged_data.sort(key=lambda x: x['timestamp'])
-            
-            return merged_data
+        if api_ts.size:
+            # API points win over local ones with the same timestamp
+            return _merge_first([api_ts, local_ts], [api_px, local_px])
         
-        return local_data
+        return local_ts, local_px
     
+    def get_price_window(self, symbol: str, period: str = "1d") -> Tuple[np.ndarray, np.ndarray, str]:
+        """``get_price_arrays`` plus a content version, reused for ``window_ttl`` seconds.
+
+        The version covers the point count and a digest of every point, so
+        interior changes (gap repair, imports) change it too. Writes through
+        this storage drop the symbol's windows at once; writes by other
+        processes show up within ``window_ttl``.
+        """
+        key = (symbol.upper(), period)
+        now = time.monotonic()
+        with self._windows_lock:
+            cached = self._windows.get(key)
+        if cached is not None and now - cached[0] < self.window_ttl:
+            return cached[1], cached[2], cached[3]
+        timestamps, prices = self.get_price_arrays(symbol, period)
+        digest = hashlib.blake2b(timestamps.tobytes(), digest_size=8)
+        digest.update(prices.tobytes())
+        version = f"{timestamps.size}-{digest.hexdigest()}"
+        with self._windows_lock:
+            self._windows[key] = (now, timestamps, prices, version)
+        return timestamps, prices, version
+
+    def invalidate_window(self, symbol: str) -> None:
+        """Forget the cached windows of a symbol after its ticks changed."""
+        symbol = symbol.upper()
+        with self._windows_lock:
+            if self._windows:
+                for key in [key for key in self._windows if key[0] == symbol]:
+                    del self._windows[key]
+
     def _get_local_price_history(self, symbol: str, period: str = "1d") -> List[Dict[str, Any]]:
-        """Get price history from local CSV storage and merge with MongoDB points."""
-        file_path = self._get_file_path(symbol)
-        if not os.path.exists(file_path):
-            return []
-        
+        """Get price history from the hot CSV, overlapping archive partitions and MongoDB points."""
+        return to_records(*self._get_local_price_arrays(symbol, period))
+
+    def _get_local_price_arrays(self, symbol: str, period: str = "1d") -> Tuple[np.ndarray, np.ndarray]:
+        # pandas is imported on first use; it is most of this module's import time
+        import pandas as pd
+
         # Calculate time range
         now = datetime.now()
         if period == "1h":
@@ -150,46 +237,43 @@ class PriceStorage:
             start_time = now - timedelta(days=1)
         
         start_timestamp = int(start_time.timestamp() * 1000)
+
+        # Parts in priority order: hot CSV over archive, MongoDB only fills holes
+        ts_parts, px_parts = [], []
+
+        # Hot tier
+        file_path = self._get_file_path(symbol)
+        if os.path.exists(file_path):
+            try:
+                df = pd.read_csv(file_path, usecols=['timestamp', 'price'])
+                df = df[df['timestamp'] >= start_timestamp]
+                ts_parts.append(df['timestamp'].to_numpy(dtype=np.int64))
+                px_parts.append(df['price'].to_numpy(dtype=np.float64))
+            except Exception as e:
+                print(f"Error reading price data: {e}")
         
-        # Read CSV and filter by time
-        data = []
+        # Cold tier: only partitions overlapping the window are opened
         try:
-            df = pd.read_csv(file_path)
-            df = df[df['timestamp'] >= start_timestamp]
-            
-            for _, row in df.iterrows():
-                data.append({
-                    'timestamp': int(row['timestamp']),
-                    'price': float(row['price']),
-                    'datetime': row['datetime']
-                })
+            archived_ts, archived_px = self.archive.read_range(symbol, start_timestamp)
+            ts_parts.append(archived_ts)
+            px_parts.append(archived_px)
         except Exception as e:
-            print(f"Error reading price data: {e}")
+            print(f"Error reading archived price data: {e}")
 
         # Merge with MongoDB ticks if available
         if self.db and getattr(self.db, 'prices', None) is not None:
             try:
                 db_points = self.db.get_price_points_since(symbol, start_timestamp)
-                # Index existing by timestamp to dedupe
-                existing = {item['timestamp']: item for item in data}
-                for p in db_points:
-                    ts = int(p['timestamp'])
-                    if ts not in existing:
-                        existing[ts] = {
-                            'timestamp': ts,
-                            'price': float(p['price']),
-                            'datetime': datetime.fromtimestamp(ts / 1000).isoformat()
-                        }
-                merged = list(existing.values())
-                merged.sort(key=lambda x: x['timestamp'])
-                return merged
+                ts_parts.append(np.fromiter((p['timestamp'] for p in db_points), dtype=np.int64))
+                px_parts.append(np.fromiter((p['price'] for p in db_points), dtype=np.float64))
             except Exception as e:
                 print(f"Warning: failed to merge MongoDB price points for {symbol}: {e}")
 
-        return data
+        return _merge_first(ts_parts, px_parts)
     
     def get_latest_price(self, symbol: str) -> Optional[float]:
         """Get the most recent price for a symbol"""
+        import pandas as pd
         file_path = self._get_file_path(symbol)
         if not os.path.exists(file_path):
             return None
@@ -203,17 +287,94 @@ class PriceStorage:
         
         return None
     
-    def cleanup_old_data(self, days_to_keep: int = 30) -> None:
-        """Remove price data older than specified days"""
-        cutoff_time = datetime.now() - timedelta(days=days_to_keep)
-        cutoff_timestamp = int(cutoff_time.timestamp() * 1000)
-        
+    def archive_hot_data(self, hot_days: Optional[int] = None) -> Dict[str, int]:
+        """Move ticks older than ``hot_days`` from the CSVs into archive partitions.
+
+        Only the (small) hot CSV is rewritten; archived ticks are merged
+        into the day partitions they belong to. Returns rows moved per symbol.
+        """
+        import pandas as pd
+        hot_days = self.hot_days if hot_days is None else hot_days
+        cutoff_timestamp = int((datetime.now() - timedelta(days=hot_days)).timestamp() * 1000)
+        # Keep whole UTC days together so a partition is never split across tiers
+        cutoff_timestamp -= cutoff_timestamp % DAY_MS
+
+        moved: Dict[str, int] = {}
         for filename in os.listdir(self.data_dir):
-            if filename.endswith('_prices.csv'):
-                file_path = os.path.join(self.data_dir, filename)
-                try:
+            if not filename.endswith('_prices.csv'):
+                continue
+            symbol = filename[:-len('_prices.csv')].upper()
+            file_path = os.path.join(self.data_dir, filename)
+            try:
+                with self._hot_file(file_path):
                     df = pd.read_csv(file_path)
-                    df = df[df['timestamp'] >= cutoff_timestamp]
-                    df.to_csv(file_path, index=False)
-                except Exception as e:
-                    print(f"Error cleaning up {filename}: {e}")
+                    old = df[df['timestamp'] < cutoff_timestamp]
+                    if old.empty:
+                        continue
+                    self.archive.write(
+                        symbol,
+                        old['timestamp'].to_numpy(dtype=np.int64),
+                        old['price'].to_numpy(dtype=np.float64),
+                    )
+                    tmp_path = file_path + '.tmp'
+                    df[df['timestamp'] >= cutoff_timestamp].to_csv(tmp_path, index=False)
+                    os.replace(tmp_path, file_path)
+                moved[symbol] = len(old)
+            except Exception as e:
+                print(f"Error archiving {filename}: {e}")
+        return moved
+
+    def cleanup_old_data(self, days_to_keep: int = 30) -> int:
+        """Apply retention by dropping archive partitions older than ``days_to_keep``.
+
+        Hot data past the hot window is archived first, so nothing is
+        deleted by rewriting files. Returns the number of partitions dropped.
+        """
+        self.archive_hot_data()
+        cutoff_time = datetime.now() - timedelta(days=days_to_keep)
+        cutoff_timestamp = int(cutoff_time.timestamp() * 1000)
+        return self.archive.drop_before(cutoff_timestamp)
+
+
+class ArchiveJob(threading.Thread):
+    """Moves aged ticks out of the hot CSVs every ``interval`` seconds.
+
+    Each run calls ``archive_hot_data`` and, when ``retention_days`` is
+    set, drops archive partitions older than that. The first run happens
+    right after start, so a backlog built up while the app was down is
+    archived without waiting a full interval. Run one per data directory:
+    the web app starts it only with ``BOT_ENGINE=local``, ``bot_worker.py``
+    otherwise.
+    """
+
+    def __init__(self, storage: PriceStorage, interval: float = 3600.0, retention_days: int = 0):
+        super().__init__(daemon=True, name="price-archive")
+        self.storage = storage
+        self.interval = interval
+        self.retention_days = retention_days
+        self._stop_event = threading.Event()
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    def run_once(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        moved = self.storage.archive_hot_data()
+        dropped = self.storage.archive.drop_before(
+            int((datetime.now() - timedelta(days=self.retention_days)).timestamp() * 1000)
+        ) if self.retention_days > 0 else 0
+        self.last_result = {"moved": moved, "partitions_dropped": dropped,
+                            "seconds": round(time.perf_counter() - started, 3), "at": int(time.time() * 1000)}
+        return self.last_result
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                result = self.run_once()
+                if result["moved"] or result["partitions_dropped"]:
+                    print(f"🗄️  Archived {sum(result['moved'].values())} ticks, "
+                          f"dropped {result['partitions_dropped']} partitions in {result['seconds']}s")
+            except Exception as e:
+                print(f"Warning: price archive run failed: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stop_event.set()
@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Tuple
+
+import numpy as np
+
+FORMATS = ("rows", "columnar", "binary")
+BINARY_MIMETYPE = "application/octet-stream"
+
+
+def to_records(timestamps: np.ndarray, prices: np.ndarray) -> List[Dict[str, Any]]:
+    """Row-per-point view of history arrays, as returned by the original API."""
+    return [{
+        'timestamp': ts,
+        'price': price,
+        'datetime': datetime.fromtimestamp(ts / 1000).isoformat()
+    } for ts, price in zip(timestamps.tolist(), prices.tolist())]
+
+
+def encode_history(timestamps: np.ndarray, prices: np.ndarray, fmt: str, meta: Dict[str, Any],
+                   dumps: Callable[[Any], str]) -> Tuple[bytes, str]:
+    """Serialize history arrays as (body, mimetype).
+
+    ``rows`` is the original list of ``{timestamp, price, datetime}``
+    objects; ``columnar`` sends parallel ``timestamps``/``prices`` arrays;
+    ``binary`` is ``count`` little-endian int64 timestamps followed by
+    ``count`` float64 prices, with ``meta`` left to response headers.
+    """
+    if fmt == "binary":
+        body = np.ascontiguousarray(timestamps, dtype="<i8").tobytes() + np.ascontiguousarray(prices, dtype="<f8").tobytes()
+        return body, BINARY_MIMETYPE
+    if fmt == "columnar":
+        payload = dict(meta, timestamps=timestamps.tolist(), prices=prices.tolist(), count=int(timestamps.size))
+    elif fmt == "rows":
+        payload = dict(meta, data=to_records(timestamps, prices), count=int(timestamps.size))
+    else:
+        raise ValueError(f"format must be one of {FORMATS}")
+    return dumps(payload).encode(), "application/json"
+
+
+def binary_headers(meta: Dict[str, Any], count: int) -> Dict[str, str]:
+    """Metadata for binary bodies, as ``X-History-*`` headers."""
+    headers = {f"X-History-{key.capitalize()}": str(value) for key, value in meta.items()}
+    headers["X-History-Count"] = str(count)
+    return headers
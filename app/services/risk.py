@@ -0,0 +1,237 @@
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+DAY_MS = 86_400_000
+
+
+class RiskRejected(ValueError):
+    """An order would breach a pre-trade limit; ``limit`` names which one."""
+
+    def __init__(self, limit: str, message: str):
+        super().__init__(message)
+        self.limit = limit
+
+
+@dataclass
+class RiskLimits:
+    """Pre-trade limits applied to every user; 0 disables a limit."""
+    max_order_notional: float = 0.0
+    max_position_notional: float = 0.0  # per user and symbol, at cost
+    max_user_notional: float = 0.0  # per user across symbols, at cost
+    max_daily_loss: float = 0.0  # realized loss per user per UTC day
+    block_oversell: bool = True  # reject sells beyond the position traded through the app
+    symbol_max_quantity: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RiskLimits":
+        symbol_limits = {}
+        for item in str(config.get("RISK_SYMBOL_MAX_QTY", "") or "").split(","):
+            if "=" in item:
+                symbol, quantity = item.split("=", 1)
+                symbol_limits[symbol.strip().upper()] = float(quantity)
+        return cls(
+            max_order_notional=float(config.get("RISK_MAX_ORDER_NOTIONAL", 0) or 0),
+            max_position_notional=float(config.get("RISK_MAX_POSITION_NOTIONAL", 0) or 0),
+            max_user_notional=float(config.get("RISK_MAX_USER_NOTIONAL", 0) or 0),
+            max_daily_loss=float(config.get("RISK_MAX_DAILY_LOSS", 0) or 0),
+            block_oversell=bool(config.get("RISK_BLOCK_OVERSELL", True)),
+            symbol_max_quantity=symbol_limits,
+        )
+
+
+class RiskEngine:
+    """Pre-trade checks against exposure counters kept up to date per fill.
+
+    For every (user, symbol) the engine holds quantity and cost, per user
+    the total cost and the day's realized loss. ``check`` reads a few
+    dict entries and ``record_fill`` adjusts them, so neither depends on
+    the number of positions or touches the database. Buys are checked
+    against the notional, quantity and daily-loss limits; sells only
+    against what is actually held, so reducing risk is never blocked.
+
+    A passing ``check`` reserves the order until ``record_fill`` (or
+    ``release`` if the order fails), so concurrent orders of one user
+    are checked against each other and cannot all squeeze under a limit.
+    Reservations not settled within ``reservation_ttl`` seconds lapse.
+    """
+
+    def __init__(self, limits: Optional[RiskLimits] = None, reservation_ttl: float = 60.0):
+        self.limits = limits or RiskLimits()
+        self.reservation_ttl = reservation_ttl
+        # (user_id, symbol) -> [quantity, cost]
+        self._positions: Dict[Tuple[str, str], List[float]] = {}
+        self._user_cost: Dict[str, float] = {}
+        # user_id -> (day number, realized loss that day)
+        self._daily_loss: Dict[str, Tuple[int, float]] = {}
+        # reservation id -> (key, side, quantity, notional)
+        self._reservations: Dict[int, Tuple[Tuple[str, str], str, float, float]] = {}
+        # (reserved at, reservation id) in reservation order, which is expiry order as the TTL is fixed;
+        # settled ids stay until they reach the front, so expiring is amortized O(1) per check
+        self._expiry: "deque[Tuple[float, int]]" = deque()
+        # (user_id, symbol) -> [buy quantity, buy notional, sell quantity] held by open reservations
+        self._reserved: Dict[Tuple[str, str], List[float]] = {}
+        self._reserved_user: Dict[str, float] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(user_id: Optional[str], symbol: str) -> Tuple[str, str]:
+        return (str(user_id), symbol.upper())
+
+    def _loss_today(self, user_id: str, day: int) -> float:
+        loss_day, loss = self._daily_loss.get(user_id, (day, 0.0))
+        return loss if loss_day == day else 0.0
+
+    def _unreserve_locked(self, reservation: Optional[int]) -> None:
+        entry = self._reservations.pop(reservation, None) if reservation is not None else None
+        if entry is None:
+            return
+        key, side, quantity, notional = entry
+        reserved = self._reserved[key]
+        if side == "SELL":
+            reserved[2] -= quantity
+        else:
+            reserved[0] -= quantity
+            reserved[1] -= notional
+            self._reserved_user[key[0]] -= notional
+            if self._reserved_user[key[0]] <= 1e-9:
+                self._reserved_user.pop(key[0])
+        if max(reserved) <= 1e-12:
+            self._reserved.pop(key)
+
+    def _expire_locked(self) -> None:
+        cutoff = time.monotonic() - self.reservation_ttl
+        expiry = self._expiry
+        while expiry and expiry[0][0] < cutoff:
+            self._unreserve_locked(expiry.popleft()[1])
+
+    def _reserve_locked(self, key: Tuple[str, str], side: str, quantity: float, notional: float) -> int:
+        reservation = next(self._ids)
+        now = time.monotonic()
+        self._reservations[reservation] = (key, side, quantity, notional)
+        self._expiry.append((now, reservation))
+        reserved = self._reserved.setdefault(key, [0.0, 0.0, 0.0])
+        if side == "SELL":
+            reserved[2] += quantity
+        else:
+            reserved[0] += quantity
+            reserved[1] += notional
+            self._reserved_user[key[0]] = self._reserved_user.get(key[0], 0.0) + notional
+        return reservation
+
+    def check(self, user_id: Optional[str], symbol: str, side: str, quantity: float, price: float) -> int:
+        """Raise RiskRejected if the order would breach a limit, else reserve it and return the reservation id.
+
+        Pass the id to ``record_fill`` once the order fills or to ``release`` if it fails.
+        """
+        limits = self.limits
+        key = self._key(user_id, symbol)
+        side = side.upper()
+        notional = quantity * price
+        with self._lock:
+            if self._expiry:
+                self._expire_locked()
+            held, cost = self._positions.get(key, (0.0, 0.0))
+            reserved_quantity, reserved_notional, reserved_sell = self._reserved.get(key, (0.0, 0.0, 0.0))
+            if side == "SELL":
+                available = held - reserved_sell
+                if limits.block_oversell and quantity > available + 1e-12:
+                    raise RiskRejected("oversell", f"Sell of {quantity} {symbol} exceeds position of {available}")
+                return self._reserve_locked(key, side, quantity, notional)
+            held += reserved_quantity
+            cost += reserved_notional
+            if limits.max_order_notional and notional > limits.max_order_notional:
+                raise RiskRejected("order_notional",
+                                   f"Order notional {notional:.2f} exceeds limit {limits.max_order_notional:.2f}")
+            max_quantity = limits.symbol_max_quantity.get(key[1])
+            if max_quantity is not None and held + quantity > max_quantity:
+                raise RiskRejected("position_quantity",
+                                   f"{symbol} position would reach {held + quantity} (limit {max_quantity})")
+            if limits.max_position_notional and cost + notional > limits.max_position_notional:
+                raise RiskRejected("position_notional",
+                                   f"{symbol} exposure would reach {cost + notional:.2f} (limit {limits.max_position_notional:.2f})")
+            user_cost = self._user_cost.get(key[0], 0.0) + self._reserved_user.get(key[0], 0.0)
+            if limits.max_user_notional and user_cost + notional > limits.max_user_notional:
+                raise RiskRejected("user_notional",
+                                   f"Total exposure would reach {user_cost + notional:.2f} (limit {limits.max_user_notional:.2f})")
+            if limits.max_daily_loss:
+                loss = self._loss_today(key[0], int(time.time() * 1000) // DAY_MS)
+                if loss >= limits.max_daily_loss:
+                    raise RiskRejected("daily_loss", f"Daily loss {loss:.2f} reached limit {limits.max_daily_loss:.2f}")
+            return self._reserve_locked(key, side, quantity, notional)
+
+    def release(self, reservation: Optional[int]) -> None:
+        """Drop the reservation of an order that was not placed or did not fill."""
+        with self._lock:
+            self._unreserve_locked(reservation)
+
+    def record_fill(self, user_id: Optional[str], symbol: str, side: str, quantity: float, price: float,
+                    reservation: Optional[int] = None) -> None:
+        """Apply an executed order to the exposure counters (average cost basis), settling its reservation."""
+        key = self._key(user_id, symbol)
+        with self._lock:
+            self._unreserve_locked(reservation)
+            if side.upper() == "BUY":
+                position = self._positions.setdefault(key, [0.0, 0.0])
+                position[0] += quantity
+                position[1] += quantity * price
+                self._user_cost[key[0]] = self._user_cost.get(key[0], 0.0) + quantity * price
+                return
+            position = self._positions.get(key)
+            sold = min(quantity, position[0]) if position else 0.0
+            if sold <= 0:
+                return
+            released = position[1] * sold / position[0]
+            position[0] -= sold
+            position[1] -= released
+            self._user_cost[key[0]] = max(0.0, self._user_cost.get(key[0], 0.0) - released)
+            pnl = sold * price - released
+            if pnl < 0:
+                day = int(time.time() * 1000) // DAY_MS
+                self._daily_loss[key[0]] = (day, self._loss_today(key[0], day) - pnl)
+            if position[0] <= 1e-12:
+                self._positions.pop(key, None)
+
+    def load_positions(self, positions: List[Dict[str, Any]]) -> int:
+        """Seed counters from open positions ``{user_id, symbol, quantity, buy_quantity, buy_value}``."""
+        with self._lock:
+            self._positions.clear()
+            self._user_cost.clear()
+            for row in positions:
+                quantity = float(row["quantity"])
+                if quantity <= 0:
+                    continue
+                average = row["buy_value"] / row["buy_quantity"] if row.get("buy_quantity") else 0.0
+                key = self._key(row["user_id"], row["symbol"])
+                self._positions[key] = [quantity, quantity * average]
+                self._user_cost[key[0]] = self._user_cost.get(key[0], 0.0) + quantity * average
+            return len(self._positions)
+
+    def load_daily_losses(self, losses: Dict[str, float]) -> int:
+        """Seed today's realized loss per user, e.g. from analytics after a restart."""
+        day = int(time.time() * 1000) // DAY_MS
+        with self._lock:
+            for user_id, loss in losses.items():
+                self._daily_loss[str(user_id)] = (day, float(loss))
+            return len(losses)
+
+    def open_positions(self) -> List[Dict[str, Any]]:
+        """Every held position as ``{user_id, symbol, quantity, cost}``."""
+        with self._lock:
+            return [{"user_id": uid, "symbol": symbol, "quantity": quantity, "cost": cost}
+                    for (uid, symbol), (quantity, cost) in self._positions.items()]
+
+    def exposure(self, user_id: str) -> Dict[str, Any]:
+        user_id = str(user_id)
+        with self._lock:
+            positions = {symbol: {"quantity": quantity, "cost": cost}
+                         for (uid, symbol), (quantity, cost) in self._positions.items() if uid == user_id}
+            return {
+                "positions": positions,
+                "total_cost": self._user_cost.get(user_id, 0.0),
+                "daily_loss": self._loss_today(user_id, int(time.time() * 1000) // DAY_MS),
+            }
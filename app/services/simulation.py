@@ -0,0 +1,298 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+import numpy as np
+
+from .strategies import STRATEGIES
+
+PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_CHUNK_PATHS = 500
+
+
+# History
+
+def load_history(storage, symbol: str, start_ts: int = 0, end_ts: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted unique (timestamps, prices) from archive partitions and the hot CSV."""
+    from .price_bulk import iter_history_batches
+    parts = list(iter_history_batches(storage, symbol, start_ts, end_ts))
+    if not parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    ts = np.concatenate([p[0] for p in parts])
+    px = np.concatenate([p[1] for p in parts])
+    ts, first = np.unique(ts, return_index=True)
+    return ts, px[first]
+
+
+def resample_last(timestamps: np.ndarray, prices: np.ndarray, bar_ms: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Last price per bar, so irregular ticks become evenly spaced closes."""
+    if timestamps.size == 0:
+        return timestamps, prices
+    bars = timestamps // bar_ms
+    last = np.append(np.flatnonzero(bars[1:] != bars[:-1]), bars.size - 1)
+    return bars[last] * bar_ms, prices[last]
+
+
+def log_returns(prices: np.ndarray) -> np.ndarray:
+    prices = prices[prices > 0]
+    return np.diff(np.log(prices))
+
+
+def block_bootstrap(returns: np.ndarray, n_paths: int, length: int, block: int, start_price: float,
+                    rng: np.random.Generator) -> np.ndarray:
+    """Price paths of shape (n_paths, length + 1) from resampled blocks of returns.
+
+    Contiguous blocks keep short-range autocorrelation and volatility
+    clustering that resampling single returns would destroy.
+    """
+    block = max(1, min(int(block), returns.size))
+    n_blocks = math.ceil(length / block)
+    starts = rng.integers(0, returns.size - block + 1, size=(n_paths, n_blocks))
+    index = (starts[:, :, None] + np.arange(block)).reshape(n_paths, -1)[:, :length]
+    paths = np.zeros((n_paths, length + 1))
+    np.cumsum(returns[index], axis=1, out=paths[:, 1:])
+    return start_price * np.exp(paths)
+
+
+# Vectorized strategies: (paths, bars) prices -> +1 buy / -1 sell / 0 signals
+
+def _ema(prices: np.ndarray, period: int) -> np.ndarray:
+    alpha = 2.0 / (period + 1)
+    out = np.empty_like(prices)
+    out[:, 0] = prices[:, 0]
+    for t in range(1, prices.shape[1]):
+        out[:, t] = out[:, t - 1] + alpha * (prices[:, t] - out[:, t - 1])
+    out[:, :period - 1] = np.nan
+    return out
+
+
+def _rsi(prices: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's RSI as in ``indicators.RSI``: simple-average seed, then smoothing."""
+    out = np.full_like(prices, np.nan)
+    change = np.diff(prices, axis=1)
+    if change.shape[1] < period:
+        return out
+    gain = np.where(change > 0, change, 0.0)
+    loss = np.where(change < 0, -change, 0.0)
+    avg_gain = gain[:, :period].mean(axis=1)
+    avg_loss = loss[:, :period].mean(axis=1)
+    for t in range(period, prices.shape[1]):
+        if t > period:
+            avg_gain = (avg_gain * (period - 1) + gain[:, t - 1]) / period
+            avg_loss = (avg_loss * (period - 1) + loss[:, t - 1]) / period
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        out[:, t] = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), rsi)
+    return out
+
+
+def _rolling_mean_std(prices: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    csum = np.cumsum(np.pad(prices, ((0, 0), (1, 0))), axis=1)
+    csum_sq = np.cumsum(np.pad(prices * prices, ((0, 0), (1, 0))), axis=1)
+    mean = np.full_like(prices, np.nan)
+    std = np.full_like(prices, np.nan)
+    total = csum[:, window:] - csum[:, :-window]
+    total_sq = csum_sq[:, window:] - csum_sq[:, :-window]
+    mean[:, window - 1:] = total / window
+    std[:, window - 1:] = np.sqrt(np.maximum(total_sq / window - (total / window) ** 2, 0.0))
+    return mean, std
+
+
+def _signals(buy: np.ndarray, sell: np.ndarray) -> np.ndarray:
+    return np.where(buy, 1, np.where(sell, -1, 0)).astype(np.int8)
+
+
+def threshold_signals(prices: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    return _signals(prices <= float(params["buy_threshold"]), prices >= float(params["sell_threshold"]))
+
+
+def ema_cross_signals(prices: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    fast, slow = _ema(prices, int(params["fast"])), _ema(prices, int(params["slow"]))
+    return _signals(fast > slow, fast < slow)
+
+
+def rsi_signals(prices: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    rsi = _rsi(prices, int(params["period"]))
+    return _signals(rsi <= float(params["oversold"]), rsi >= float(params["overbought"]))
+
+
+def bollinger_signals(prices: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    mean, std = _rolling_mean_std(prices, int(params["window"]))
+    width = float(params["k"]) * std
+    return _signals(prices <= mean - width, prices >= mean + width)
+
+
+# New bot types register their vectorized rule here
+VECTOR_STRATEGIES: Dict[str, Callable[[np.ndarray, Dict[str, Any]], np.ndarray]] = {
+    "THRESHOLD": threshold_signals,
+    "EMA_CROSS": ema_cross_signals,
+    "RSI": rsi_signals,
+    "BOLLINGER": bollinger_signals,
+}
+
+
+def strategy_params(bot_type: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    if bot_type not in VECTOR_STRATEGIES:
+        raise ValueError(f"No vectorized strategy for bot_type: {bot_type}")
+    defaults = STRATEGIES[bot_type].defaults if bot_type in STRATEGIES else {}
+    return {**defaults, **(params or {})}
+
+
+def positions(signals: np.ndarray) -> np.ndarray:
+    """Holding flag after each bar: the latest non-zero signal was a buy.
+
+    Equivalent to the live bots' rule of buying only when flat and
+    selling only when holding, without a loop over bars.
+    """
+    index = np.where(signals != 0, np.arange(signals.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    return (np.take_along_axis(signals, index, axis=1) > 0).astype(np.float64)
+
+
+def evaluate(prices: np.ndarray, bot_type: str, params: Optional[Dict[str, Any]] = None, quantity: float = 1.0,
+             fee_rate: float = 0.0) -> Dict[str, np.ndarray]:
+    """Per-path PnL, max drawdown and trade count for every row of ``prices``.
+
+    Orders fill at the close of the bar that signalled; an open position
+    is marked at the last price.
+    """
+    prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+    held = positions(VECTOR_STRATEGIES[bot_type](prices, strategy_params(bot_type, params)))
+    trades = np.abs(np.diff(held, axis=1, prepend=0.0))
+    equity = np.zeros_like(prices)
+    np.cumsum(held[:, :-1] * np.diff(prices, axis=1) * quantity, axis=1, out=equity[:, 1:])
+    equity -= np.cumsum(trades * prices * quantity * fee_rate, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 0.0)
+    return {
+        "pnl": equity[:, -1],
+        "max_drawdown": (peak - equity).max(axis=1),
+        "trades": trades.sum(axis=1),
+    }
+
+
+def summarize(values: np.ndarray) -> Dict[str, float]:
+    summary = {"mean": float(values.mean()), "std": float(values.std()),
+               "min": float(values.min()), "max": float(values.max())}
+    summary.update({f"p{q}": float(v) for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))})
+    return summary
+
+
+# Fan-out
+
+def _simulate_chunk(task: Tuple) -> Dict[str, np.ndarray]:
+    """Worker entry point: build one chunk of paths and evaluate every candidate on them."""
+    returns, start_price, n_paths, length, block, seed, bot_type, candidates, quantity, fee_rate = task
+    paths = block_bootstrap(returns, n_paths, length, block, start_price, np.random.default_rng(seed))
+    results = [evaluate(paths, bot_type, params, quantity, fee_rate) for params in candidates]
+    return {key: np.stack([r[key] for r in results]) for key in ("pnl", "max_drawdown", "trades")}
+
+
+def _run_tasks(tasks: List[Tuple], workers: Optional[int]) -> List[Dict[str, np.ndarray]]:
+    if workers == 1 or len(tasks) == 1:
+        return [_simulate_chunk(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return list(pool.map(_simulate_chunk, tasks))
+
+
+def _bootstrap(prices: np.ndarray, bot_type: str, candidates: List[Dict[str, Any]], n_paths: int, length: int,
+               block: int, quantity: float, fee_rate: float, seed, workers: Optional[int],
+               chunk_paths: int) -> Dict[str, np.ndarray]:
+    """Metrics of shape (candidates, n_paths); all candidates see the same paths."""
+    returns = log_returns(prices)
+    if returns.size < 2:
+        raise ValueError("Not enough price history to resample")
+    chunks = [min(chunk_paths, n_paths - offset) for offset in range(0, n_paths, chunk_paths)]
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    seeds = seed.spawn(len(chunks))
+    tasks = [(returns, float(prices[0]), size, length, block, child, bot_type, candidates, quantity, fee_rate)
+             for size, child in zip(chunks, seeds)]
+    results = _run_tasks(tasks, workers)
+    return {key: np.concatenate([r[key] for r in results], axis=1) for key in ("pnl", "max_drawdown", "trades")}
+
+
+def monte_carlo(prices: np.ndarray, bot_type: str = "THRESHOLD", params: Optional[Dict[str, Any]] = None,
+                n_paths: int = 1000, length: Optional[int] = None, block: int = 60, quantity: float = 1.0,
+                fee_rate: float = 0.001, seed: Optional[int] = None, workers: Optional[int] = None,
+                chunk_paths: int = DEFAULT_CHUNK_PATHS) -> Dict[str, Any]:
+    """PnL and drawdown distributions of a strategy over block-bootstrapped price paths.
+
+    Paths start at the first historical price and default to the
+    history's length, so the realized result can be read against the
+    distribution of outcomes the same market could have produced.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    length = int(length or prices.size - 1)
+    started = time.perf_counter()
+    metrics = _bootstrap(prices, bot_type, [params or {}], n_paths, length, block, quantity, fee_rate, seed,
+                         workers, chunk_paths)
+    historical = evaluate(prices, bot_type, params, quantity, fee_rate)
+    pnl = metrics["pnl"][0]
+    return {
+        "bot_type": bot_type,
+        "params": strategy_params(bot_type, params),
+        "paths": int(pnl.size),
+        "length": length,
+        "block": block,
+        "pnl": summarize(pnl),
+        "max_drawdown": summarize(metrics["max_drawdown"][0]),
+        "trades": summarize(metrics["trades"][0]),
+        "prob_loss": float((pnl < 0).mean()),
+        "historical": {key: float(value[0]) for key, value in historical.items()},
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def default_grid(bot_type: str, prices: np.ndarray) -> List[Dict[str, Any]]:
+    """Candidate params for a training window; thresholds come from its price quantiles."""
+    if bot_type != "THRESHOLD":
+        return [{}]
+    buys = np.quantile(prices, (0.1, 0.2, 0.3))
+    sells = np.quantile(prices, (0.7, 0.8, 0.9))
+    return [{"buy_threshold": float(b), "sell_threshold": float(s)} for b in buys for s in sells]
+
+
+def walk_forward(prices: np.ndarray, bot_type: str = "THRESHOLD", grid: Optional[List[Dict[str, Any]]] = None,
+                 train_bars: int = 1440, test_bars: int = 360, n_paths: int = 500, block: int = 60,
+                 quantity: float = 1.0, fee_rate: float = 0.001, seed: Optional[int] = None,
+                 workers: Optional[int] = None, chunk_paths: int = DEFAULT_CHUNK_PATHS) -> Dict[str, Any]:
+    """Pick params on bootstrapped paths of each training window, then trade the next window.
+
+    Candidates are ranked by mean PnL over paths resampled from the
+    training window; the winner is evaluated on the actual prices of the
+    following ``test_bars``. Windows roll forward by ``test_bars``.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if prices.size < train_bars + test_bars + 1:
+        raise ValueError(f"Need at least {train_bars + test_bars + 1} bars, have {prices.size}")
+    started = time.perf_counter()
+    seeds = np.random.SeedSequence(seed)
+    windows = []
+    for start in range(0, prices.size - train_bars - test_bars, test_bars):
+        train = prices[start:start + train_bars + 1]
+        test = prices[start + train_bars:start + train_bars + test_bars + 1]
+        candidates = grid or default_grid(bot_type, train)
+        metrics = _bootstrap(train, bot_type, candidates, n_paths, train_bars, block, quantity, fee_rate,
+                             seeds.spawn(1)[0], workers, chunk_paths)
+        scores = metrics["pnl"].mean(axis=1)
+        best = int(np.argmax(scores))
+        result = evaluate(test, bot_type, candidates[best], quantity, fee_rate)
+        windows.append({
+            "train_start": start,
+            "test_start": start + train_bars,
+            "params": strategy_params(bot_type, candidates[best]),
+            "train_mean_pnl": float(scores[best]),
+            "test_pnl": float(result["pnl"][0]),
+            "test_max_drawdown": float(result["max_drawdown"][0]),
+            "test_trades": int(result["trades"][0]),
+        })
+    test_pnl = np.array([w["test_pnl"] for w in windows])
+    return {
+        "bot_type": bot_type,
+        "windows": windows,
+        "test_pnl": summarize(test_pnl),
+        "total_test_pnl": float(test_pnl.sum()),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,121 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from ..monitoring.metrics import DASHBOARD_SECTIONS
+
+DEFAULT_TTLS = {
+    "status": 2.0,
+    "positions": 5.0,
+    "stats": 30.0,
+    "trades": 5.0,
+    "balances": 15.0,
+    "bot_configs": 30.0,
+    "analytics": 5.0,
+}
+
+
+def parse_ttls(value: str) -> Dict[str, float]:
+    """``"trades=5,balances=15"`` -> TTLs in seconds, layered over the defaults."""
+    ttls = dict(DEFAULT_TTLS)
+    for item in str(value or "").split(","):
+        if "=" in item:
+            section, seconds = item.split("=", 1)
+            ttls[section.strip()] = float(seconds)
+    return ttls
+
+
+class SnapshotCache:
+    """Per-section TTL cache that assembles several sections in one pass.
+
+    Each (section, key) entry expires after its section's TTL. ``snapshot``
+    serves fresh entries from memory and refreshes the stale ones
+    concurrently on a small thread pool, so a dashboard load costs at most
+    its slowest source instead of their sum. A per-entry lock makes
+    concurrent requests for the same entry wait for one fetch rather than
+    repeating it; a failing section is reported in ``errors`` and does not
+    take the others down.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_workers: int = 8, max_entries: int = 10_000):
+        self.ttls = ttls or dict(DEFAULT_TTLS)
+        self.max_entries = max_entries
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dashboard")
+        # (section, key) -> (fetched_at monotonic, value)
+        self._entries: Dict[Tuple[str, Hashable], Tuple[float, Any]] = {}
+        self._locks: Dict[Tuple[str, Hashable], threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, entry: Tuple[str, Hashable]) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(entry, threading.Lock())
+
+    def _fresh(self, entry: Tuple[str, Hashable], now: float) -> Optional[Tuple[float, Any]]:
+        cached = self._entries.get(entry)
+        if cached is not None and now - cached[0] < self.ttls.get(entry[0], 0.0):
+            return cached
+        return None
+
+    def _prune(self, now: float) -> None:
+        with self._guard:
+            for entry in [e for e, (at, _) in self._entries.items() if now - at >= self.ttls.get(e[0], 0.0)]:
+                self._entries.pop(entry, None)
+                self._locks.pop(entry, None)
+
+    def get(self, section: str, key: Hashable, fetch: Callable[[], Any]) -> Tuple[float, Any]:
+        """(fetched_at, value) for one entry, fetching it if missing or expired."""
+        entry = (section, key)
+        cached = self._fresh(entry, time.monotonic())
+        if cached is not None:
+            DASHBOARD_SECTIONS.inc(section, "hit")
+            return cached
+        with self._lock_for(entry):
+            # Another request may have refreshed it while we waited
+            cached = self._fresh(entry, time.monotonic())
+            if cached is not None:
+                DASHBOARD_SECTIONS.inc(section, "hit")
+                return cached
+            value = fetch()
+            cached = (time.monotonic(), value)
+            with self._guard:
+                self._entries[entry] = cached
+            DASHBOARD_SECTIONS.inc(section, "miss")
+        if len(self._entries) > self.max_entries:
+            self._prune(cached[0])
+        return cached
+
+    def snapshot(self, sections: Dict[str, Tuple[Hashable, Callable[[], Any]]]) -> Dict[str, Any]:
+        """Build ``{section: value}`` from ``{section: (key, fetch)}``, stale sections in parallel."""
+        now = time.monotonic()
+        result: Dict[str, Any] = {}
+        ages: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
+        pending = {}
+        for section, (key, fetch) in sections.items():
+            cached = self._fresh((section, key), now)
+            if cached is not None:
+                DASHBOARD_SECTIONS.inc(section, "hit")
+                ages[section], result[section] = cached
+            else:
+                pending[section] = self._pool.submit(self.get, section, key, fetch)
+        for section, future in pending.items():
+            try:
+                ages[section], result[section] = future.result()
+            except Exception as e:
+                DASHBOARD_SECTIONS.inc(section, "error")
+                result[section] = None
+                errors[section] = str(e)
+        now = time.monotonic()
+        result["age"] = {section: round(now - at, 3) for section, at in ages.items()}
+        result["errors"] = errors
+        return result
+
+    def invalidate(self, key: Hashable, *sections: str) -> None:
+        """Drop the key's entries in the given sections (all sections if none given)."""
+        with self._guard:
+            for entry in [e for e in self._entries if e[1] == key and (not sections or e[0] in sections)]:
+                self._entries.pop(entry, None)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
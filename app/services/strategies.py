@@ -0,0 +1,101 @@
+from typing import Dict, Any, List, Optional
+
+from .indicators import IndicatorHub
+
+
+class Strategy:
+    """Indicator-driven entry/exit rule evaluated on shared indicators."""
+
+    bot_type = ""
+    defaults: Dict[str, Any] = {}
+
+    def __init__(self, params: Optional[Dict[str, Any]] = None):
+        self.params = {**self.defaults, **(params or {})}
+
+    def indicators(self) -> List[str]:
+        """Indicator specs this strategy reads from the hub."""
+        raise NotImplementedError
+
+    def signal(self, hub: IndicatorHub, symbol: str, price: float, holding: bool) -> Optional[str]:
+        """Return "BUY", "SELL" or None for this tick."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _ready(hub: IndicatorHub, symbol: str, specs: List[str]):
+        indicators = [hub.get(symbol, spec) for spec in specs]
+        if any(ind is None or not ind.ready for ind in indicators):
+            return None
+        return indicators
+
+
+class EmaCrossStrategy(Strategy):
+    """Long while the fast EMA is above the slow EMA."""
+
+    bot_type = "EMA_CROSS"
+    defaults = {"fast": 12, "slow": 26}
+
+    def indicators(self) -> List[str]:
+        return [f"ema:{int(self.params['fast'])}", f"ema:{int(self.params['slow'])}"]
+
+    def signal(self, hub, symbol, price, holding):
+        ready = self._ready(hub, symbol, self.indicators())
+        if not ready:
+            return None
+        fast, slow = ready[0].value, ready[1].value
+        if not holding and fast > slow:
+            return "BUY"
+        if holding and fast < slow:
+            return "SELL"
+        return None
+
+
+class RsiStrategy(Strategy):
+    """Buy oversold, sell overbought."""
+
+    bot_type = "RSI"
+    defaults = {"period": 14, "oversold": 30.0, "overbought": 70.0}
+
+    def indicators(self) -> List[str]:
+        return [f"rsi:{int(self.params['period'])}"]
+
+    def signal(self, hub, symbol, price, holding):
+        ready = self._ready(hub, symbol, self.indicators())
+        if not ready:
+            return None
+        rsi = ready[0].value
+        if not holding and rsi <= self.params["oversold"]:
+            return "BUY"
+        if holding and rsi >= self.params["overbought"]:
+            return "SELL"
+        return None
+
+
+class BollingerStrategy(Strategy):
+    """Buy at the lower band, sell at the upper band."""
+
+    bot_type = "BOLLINGER"
+    defaults = {"window": 20, "k": 2.0}
+
+    def indicators(self) -> List[str]:
+        return [f"bollinger:{int(self.params['window'])}:{float(self.params['k'])}"]
+
+    def signal(self, hub, symbol, price, holding):
+        ready = self._ready(hub, symbol, self.indicators())
+        if not ready:
+            return None
+        bands = ready[0].value
+        if not holding and price <= bands["lower"]:
+            return "BUY"
+        if holding and price >= bands["upper"]:
+            return "SELL"
+        return None
+
+
+STRATEGIES = {cls.bot_type: cls for cls in (EmaCrossStrategy, RsiStrategy, BollingerStrategy)}
+
+
+def create_strategy(bot_type: str, params: Optional[Dict[str, Any]] = None) -> Strategy:
+    try:
+        return STRATEGIES[bot_type](params)
+    except KeyError:
+        raise ValueError(f"Unknown strategy bot_type: {bot_type}") from None
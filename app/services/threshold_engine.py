@@ -0,0 +1,319 @@
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any, List, Tuple
+
+from .trigger_index import TriggerIndex
+from .indicators import IndicatorHub
+from .strategies import create_strategy
+from .trading_bot import record_fill
+from .bot_checkpoint import bot_state
+from .risk import RiskRejected
+from ..monitoring.metrics import BOT_ITERATION, BOT_TICK_TO_ORDER, BOT_ERRORS, BOT_ORDERS, RISK_REJECTIONS
+
+
+@dataclass
+class ThresholdBotState:
+    bot_id: str
+    symbol: str
+    buy_threshold: float
+    sell_threshold: float
+    quantity: float
+    user_id: Optional[str] = None
+    bot_type: str = "THRESHOLD"  # THRESHOLD or a strategies.STRATEGIES key
+    params: Optional[Dict[str, Any]] = None
+    # Owner's mode when the bot was added; None falls back to the user's stored setting
+    dry_run: Optional[bool] = None
+    holding: bool = False
+    entry_price: Optional[float] = None
+    last_order: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class SymbolLoop(threading.Thread):
+    """Polls one symbol and fires every bot the tick triggers.
+
+    Threshold bots come from the trigger index; indicator bots are
+    evaluated against the symbol's shared indicators, which are updated
+    once per tick before any strategy reads them.
+
+    Triggers are price levels, so a bot whose order is rejected or fails
+    stays due on every tick. Such a bot is skipped for ``retry_backoff``
+    seconds, doubling per consecutive failure up to ``max_backoff``,
+    and retried immediately after its next successful order or a
+    replacement of its config.
+    """
+
+    def __init__(self, engine: "ThresholdEngine", symbol: str, poll_interval: float,
+                 retry_backoff: float = 5.0, max_backoff: float = 300.0):
+        super().__init__(daemon=True, name=f"threshold-{symbol}")
+        self.engine = engine
+        self.symbol = symbol
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.index = TriggerIndex(symbol)
+        # bot_id -> Strategy for indicator-driven bots
+        self.strategies: Dict[str, Any] = {}
+        # bot_id -> (monotonic time of the next attempt, current delay) after a failed order
+        self.backoff: Dict[str, Tuple[float, float]] = {}
+        self.stop_event = threading.Event()
+        self.last_price: Optional[float] = None
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            iteration_start = time.perf_counter()
+            try:
+                price = self.engine.binance.get_price(self.symbol)
+                tick_time = time.perf_counter()
+                if self.engine.candles is not None:
+                    self.engine.candles.on_tick(self.symbol, price)
+                self.on_tick(price, tick_time)
+            except Exception as exc:  # noqa: BLE001
+                BOT_ERRORS.inc(self.symbol)
+                print(f"Threshold loop error for {self.symbol}: {exc}")
+            BOT_ITERATION.observe(time.perf_counter() - iteration_start, self.symbol)
+            self.stop_event.wait(self.poll_interval)
+
+    def __len__(self) -> int:
+        return len(self.index) + len(self.strategies)
+
+    def on_tick(self, price: float, tick_time: Optional[float] = None) -> List[str]:
+        """Execute orders for bots triggered at this price; returns fired bot ids."""
+        tick_time = tick_time or time.perf_counter()
+        self.last_price = price
+        fired = []
+        now = time.monotonic()
+        backoff = self.backoff
+
+        buys, sells = self.index.triggered(price)
+        for side, bot_ids in (("BUY", buys), ("SELL", sells)):
+            for bot_id in bot_ids:
+                if backoff and bot_id in backoff and backoff[bot_id][0] > now:
+                    continue
+                bot = self.engine.get_bot(bot_id)
+                if bot is not None and self._execute(bot, side, price, tick_time):
+                    self.index.set_holding(bot_id, bot.holding)
+                    fired.append(bot_id)
+
+        if self.strategies:
+            hub = self.engine.hub
+            hub.update(self.symbol, price)
+            for bot_id, strategy in list(self.strategies.items()):
+                if backoff and bot_id in backoff and backoff[bot_id][0] > now:
+                    continue
+                bot = self.engine.get_bot(bot_id)
+                if bot is None:
+                    continue
+                side = strategy.signal(hub, self.symbol, price, bot.holding)
+                if side and self._execute(bot, side, price, tick_time):
+                    fired.append(bot_id)
+        return fired
+
+    def _defer(self, bot_id: str) -> None:
+        """Hold a bot back after a rejected or failed order, doubling the delay each time."""
+        previous = self.backoff.get(bot_id)
+        delay = self.retry_backoff if previous is None else min(previous[1] * 2, self.max_backoff)
+        self.backoff[bot_id] = (time.monotonic() + delay, delay)
+
+    def _execute(self, bot: ThresholdBotState, side: str, price: float, tick_time: float) -> bool:
+        risk = self.engine.risk
+        reservation = None
+        if risk is not None:
+            try:
+                reservation = risk.check(bot.user_id, self.symbol, side, bot.quantity, price)
+            except RiskRejected as exc:
+                bot.error = str(exc)
+                RISK_REJECTIONS.inc(exc.limit)
+                self._defer(bot.bot_id)
+                return False
+        try:
+            client = self.engine.order_client(bot.user_id, bot.dry_run)
+            order = client.place_market_order(self.symbol, side, bot.quantity)
+        except Exception as exc:  # noqa: BLE001
+            # Leave the bot's state untouched so it retries once the backoff expires
+            if risk is not None:
+                risk.release(reservation)
+            bot.error = str(exc)
+            BOT_ERRORS.inc(self.symbol)
+            self._defer(bot.bot_id)
+            return False
+        self.backoff.pop(bot.bot_id, None)
+        BOT_TICK_TO_ORDER.observe(time.perf_counter() - tick_time, self.symbol, side)
+        BOT_ORDERS.inc(self.symbol, side)
+        if risk is not None:
+            risk.record_fill(bot.user_id, self.symbol, side, bot.quantity, float(order.get("price") or price),
+                             reservation)
+        bot.holding = side == "BUY"
+        bot.entry_price = price if bot.holding else None
+        bot.last_order = {"type": side, "price": price, "response": order}
+        bot.error = None
+        if self.engine.checkpointer is not None:
+            self.engine.checkpointer.mark(bot.user_id, self.symbol, bot_state(bot.holding, bot.entry_price, bot.last_order))
+        bot_config = {"quantity": bot.quantity}
+        if bot.bot_type == "THRESHOLD":
+            bot_config.update(buy_threshold=bot.buy_threshold, sell_threshold=bot.sell_threshold)
+        else:
+            bot_config.update(bot_type=bot.bot_type, params=bot.params)
+        record_fill(
+            self.engine.trade_writer, self.engine.portfolio, bot.user_id, self.symbol, side,
+            bot.quantity, price, order, bot_config=bot_config,
+            trade_type=f"BOT_{bot.bot_type}",
+        )
+        return True
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+
+class ThresholdEngine:
+    """Runs many threshold and indicator bots with one price poll per symbol.
+
+    Bots are plain state records in a per-symbol ``TriggerIndex`` rather
+    than one polling thread each, so adding bots does not add API calls
+    and each tick only touches the bots it actually triggers. Indicator
+    bots share one ``IndicatorHub`` so no window is computed twice.
+    """
+
+    def __init__(self, binance, trade_writer=None, portfolio=None, poll_interval: float = 2.0,
+                 hub: Optional[IndicatorHub] = None, clients=None, checkpointer=None, risk=None,
+                 candles=None, retry_backoff: float = 5.0, max_backoff: float = 300.0):
+        self.binance = binance
+        # Per-user order clients (BinanceClientPool); prices still come from ``binance``
+        self.clients = clients
+        self.hub = hub or IndicatorHub()
+        self.trade_writer = trade_writer
+        self.portfolio = portfolio
+        # BotCheckpointer persisting holding/entry_price after each fill
+        self.checkpointer = checkpointer
+        # Pre-trade limits (RiskEngine) checked before every order
+        self.risk = risk
+        # CandleAggregator fed with every polled price
+        self.candles = candles
+        self.poll_interval = poll_interval
+        # Seconds a bot is skipped after a rejected or failed order (doubling, capped)
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self._bots: Dict[str, ThresholdBotState] = {}
+        self._loops: Dict[str, SymbolLoop] = {}
+        self._lock = threading.Lock()
+
+    def add_bot(self, bot: ThresholdBotState, start: bool = True) -> None:
+        """Add or replace a bot; replacing keeps a loop already running for the symbol."""
+        strategy = None if bot.bot_type == "THRESHOLD" else create_strategy(bot.bot_type, bot.params)
+        with self._lock:
+            existing = self._bots.get(bot.bot_id)
+            if existing is not None:
+                self._detach_locked(existing)
+            self._bots[bot.bot_id] = bot
+            loop = self._loops.get(bot.symbol)
+            if loop is None:
+                loop = SymbolLoop(self, bot.symbol, self.poll_interval, self.retry_backoff, self.max_backoff)
+                self._loops[bot.symbol] = loop
+            if strategy is None:
+                loop.index.add(bot.bot_id, bot.buy_threshold, bot.sell_threshold, bot.holding)
+            else:
+                for spec in strategy.indicators():
+                    self.hub.subscribe(bot.symbol, spec)
+                loop.strategies[bot.bot_id] = strategy
+            if start and not loop.is_alive():
+                loop.start()
+            self._reap_locked()
+
+    def add_bots(self, bots: List[ThresholdBotState]) -> int:
+        """Add many bots, then start each symbol loop once; returns bots added."""
+        added = 0
+        for bot in bots:
+            try:
+                self.add_bot(bot, start=False)
+                added += 1
+            except Exception as exc:  # noqa: BLE001
+                print(f"Warning: could not add bot {bot.bot_id}: {exc}")
+        with self._lock:
+            for loop in self._loops.values():
+                if not loop.is_alive():
+                    loop.start()
+        return added
+
+    def remove_bot(self, bot_id: str) -> Optional[ThresholdBotState]:
+        with self._lock:
+            return self._remove_locked(bot_id)
+
+    def _remove_locked(self, bot_id: str) -> Optional[ThresholdBotState]:
+        bot = self._bots.pop(bot_id, None)
+        if bot is None:
+            return None
+        self._detach_locked(bot)
+        self._reap_locked()
+        return bot
+
+    def _detach_locked(self, bot: ThresholdBotState) -> None:
+        loop = self._loops.get(bot.symbol)
+        if loop is None:
+            return
+        loop.backoff.pop(bot.bot_id, None)
+        if bot.bot_id in loop.index:
+            loop.index.remove(bot.bot_id)
+        if bot.bot_id in loop.strategies:
+            self._unsubscribe(bot.symbol, loop.strategies.pop(bot.bot_id))
+
+    def _reap_locked(self) -> None:
+        """Stop loops for symbols that no longer have any bots."""
+        for symbol in [s for s, loop in self._loops.items() if len(loop) == 0]:
+            self._loops.pop(symbol).stop()
+
+    def _unsubscribe(self, symbol: str, strategy) -> None:
+        for spec in strategy.indicators():
+            self.hub.unsubscribe(symbol, spec)
+
+    def order_client(self, user_id: Optional[str], dry_run: Optional[bool] = None):
+        return self.clients.get(user_id, dry_run=dry_run) if self.clients is not None else self.binance
+
+    def get_bot(self, bot_id: str) -> Optional[ThresholdBotState]:
+        return self._bots.get(bot_id)
+
+    def loop(self, symbol: str) -> Optional[SymbolLoop]:
+        return self._loops.get(symbol)
+
+    def threads(self) -> List[SymbolLoop]:
+        with self._lock:
+            return [loop for loop in self._loops.values() if loop.is_alive()]
+
+    def last_prices(self) -> Dict[str, float]:
+        """Latest polled price of every running symbol loop."""
+        with self._lock:
+            return {symbol: loop.last_price for symbol, loop in self._loops.items()
+                    if loop.is_alive() and loop.last_price is not None}
+
+    def stop_all(self) -> None:
+        with self._lock:
+            for loop in self._loops.values():
+                loop.stop()
+            self._loops.clear()
+            self._bots.clear()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            symbols = {
+                symbol: {
+                    "bots": len(loop),
+                    "backing_off": len(loop.backoff),
+                    "last_price": loop.last_price,
+                    "running": loop.is_alive(),
+                    "indicators": self.hub.snapshot(symbol),
+                }
+                for symbol, loop in self._loops.items()
+            }
+            return {"bot_count": len(self._bots), "symbols": symbols}
+
+    def user_bots(self, user_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [asdict(bot) for bot in self._bots.values() if bot.user_id == user_id]
+
+    def user_bots_all(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [asdict(bot) for bot in self._bots.values()]
+
+    def bot_status(self, bot_id: str) -> Optional[Dict[str, Any]]:
+        bot = self._bots.get(bot_id)
+        return asdict(bot) if bot else None
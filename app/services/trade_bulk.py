@@ -0,0 +1,161 @@
+import csv
+import hashlib
+import io
+import time
+from datetime import datetime
+from typing import Iterator, Optional, Dict, Any, List
+
+from .analytics import to_ms
+from .price_bulk import _ChunkSink, _require_pyarrow
+
+EXPORT_FORMATS = ("csv", "parquet")
+IMPORT_FORMATS = ("csv", "parquet")
+TRADE_COLUMNS = ("timestamp", "symbol", "side", "quantity", "price", "order_id", "trade_type")
+DEFAULT_BATCH_ROWS = 50_000
+# Conflicting order_ids listed in an import result; the count covers all of them
+MAX_REPORTED_CONFLICTS = 100
+
+
+def iter_trade_batches(db, user_id: str, start_ts: Optional[int] = None, end_ts: Optional[int] = None,
+                       batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[Dict[str, List[Any]]]:
+    """Yield a user's trades oldest first as column lists of at most ``batch_rows``.
+
+    The documents come from one server-side cursor fetched ``batch_rows``
+    at a time, so memory stays at one batch however long the history.
+    """
+    columns: Dict[str, List[Any]] = {name: [] for name in TRADE_COLUMNS}
+    for doc in db.iter_user_trades(user_id, start_ts, end_ts, batch_size=batch_rows):
+        columns["timestamp"].append(to_ms(doc.get("timestamp")))
+        for name in TRADE_COLUMNS[1:]:
+            columns[name].append(doc.get(name))
+        if len(columns["timestamp"]) >= batch_rows:
+            yield columns
+            columns = {name: [] for name in TRADE_COLUMNS}
+    if columns["timestamp"]:
+        yield columns
+
+
+def _arrow_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("timestamp", pa.int64()), ("symbol", pa.string()), ("side", pa.string()), ("quantity", pa.float64()),
+        ("price", pa.float64()), ("order_id", pa.string()), ("trade_type", pa.string()),
+    ])
+
+
+def export_trades(db, user_id: str, fmt: str = "csv", start_ts: Optional[int] = None, end_ts: Optional[int] = None,
+                  batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[bytes]:
+    """Stream a user's trade history as CSV or Parquet (one row group per batch)."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {EXPORT_FORMATS}")
+    batches = iter_trade_batches(db, user_id, start_ts, end_ts, batch_rows)
+
+    if fmt == "csv":
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(TRADE_COLUMNS)
+        for columns in batches:
+            writer.writerows(zip(*(columns[name] for name in TRADE_COLUMNS)))
+            yield out.getvalue().encode()
+            out.seek(0)
+            out.truncate()
+        if out.tell():
+            yield out.getvalue().encode()
+        return
+
+    _require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for columns in batches:
+            order_ids = [None if v is None else str(v) for v in columns["order_id"]]
+            writer.write_batch(pa.record_batch(
+                [pa.array(order_ids if name == "order_id" else columns[name], type=schema.field(name).type)
+                 for name in TRADE_COLUMNS], schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _iter_import_rows(path_or_file, fmt: str, batch_rows: int) -> Iterator[List[Dict[str, Any]]]:
+    if fmt == "parquet":
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path_or_file)
+        names = [name for name in TRADE_COLUMNS if name in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=batch_rows, columns=names):
+            yield batch.to_pylist()
+    elif fmt == "csv":
+        import pandas as pd
+        # round_trip parses each float back to the exact value the export wrote
+        for chunk in pd.read_csv(path_or_file, chunksize=batch_rows, dtype={"order_id": str},
+                                 usecols=lambda name: name in TRADE_COLUMNS, float_precision="round_trip"):
+            yield chunk.astype(object).where(chunk.notna(), None).to_dict("records")
+    else:
+        raise ValueError(f"format must be one of {IMPORT_FORMATS}")
+
+
+def _trade_doc(user_id: str, row: Dict[str, Any]) -> Dict[str, Any]:
+    side = str(row["side"]).upper()
+    if side not in ("BUY", "SELL"):
+        raise ValueError(f"Invalid side: {row['side']}")
+    timestamp = to_ms(row["timestamp"])
+    doc = {
+        "user_id": user_id,
+        "symbol": str(row["symbol"]).upper(),
+        "side": side,
+        "quantity": float(row["quantity"]),
+        "price": float(row["price"]),
+        "timestamp": datetime.utcfromtimestamp(timestamp / 1000),
+        "trade_type": row.get("trade_type") or "IMPORT",
+    }
+    order_id = row.get("order_id")
+    if order_id is None or order_id == "":
+        # Stable id from the row itself, so importing the same file twice stays a no-op
+        key = f"{user_id}|{doc['symbol']}|{side}|{doc['quantity']!r}|{doc['price']!r}|{timestamp}"
+        order_id = "import-" + hashlib.sha1(key.encode()).hexdigest()[:24]
+    doc["order_id"] = str(order_id)
+    return doc
+
+
+def import_trades(db, user_id: str, path_or_file, fmt: str = "csv",
+                  batch_rows: int = DEFAULT_BATCH_ROWS) -> Dict[str, Any]:
+    """Load a CSV or Parquet trade dump into a user's history.
+
+    Rows are read and inserted ``batch_rows`` at a time with one unordered
+    ``insert_many`` each; rows whose ``order_id`` already exists are
+    skipped by the unique index, and rows without one get an id derived
+    from their content. Every row is assigned to ``user_id``. A skipped
+    row whose ``order_id`` belongs to another user's trade is reported
+    under ``conflicts``, not counted as a duplicate.
+    """
+    started = time.perf_counter()
+    rows = inserted = 0
+    conflicts: List[str] = []
+    conflict_count = 0
+    for batch in _iter_import_rows(path_or_file, fmt, batch_rows):
+        docs = [_trade_doc(user_id, row) for row in batch]
+        if not docs:
+            continue
+        batch_inserted, batch_conflicts = db.insert_trades_ignore_duplicates(docs)
+        inserted += batch_inserted
+        conflict_count += len(batch_conflicts)
+        conflicts.extend(batch_conflicts[:MAX_REPORTED_CONFLICTS - len(conflicts)])
+        rows += len(docs)
+    elapsed = time.perf_counter() - started
+    return {
+        "user_id": user_id,
+        "rows": rows,
+        "inserted": inserted,
+        "duplicates": rows - inserted - conflict_count,
+        "conflicts": conflict_count,
+        "conflicting_order_ids": conflicts,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": int(rows / elapsed) if elapsed > 0 else rows,
+    }
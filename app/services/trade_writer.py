@@ -0,0 +1,134 @@
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import List, Optional
+
+from ..monitoring.metrics import TRADE_QUEUE_DEPTH, TRADE_WRITES
+
+
+@dataclass
+class TradeEvent:
+    """A filled order handed off by a bot for persistence."""
+    trade: "object"  # models.trade.Trade
+    portfolio_trade: Optional["object"] = None  # services.portfolio.Trade
+
+
+class TradeWriter(threading.Thread):
+    """Background pipeline persisting bot trades off the decision loop.
+
+    Bots call ``submit`` which only enqueues; this thread drains the
+    bounded queue in batches, applies them to the portfolio and writes
+    them to MongoDB with ``save_trades`` (idempotent on order_id), retrying
+    failed batches with exponential backoff. Each trade is also recorded
+    once in the per-user ``analytics``.
+    """
+
+    def __init__(
+        self,
+        db=None,
+        portfolio=None,
+        analytics=None,
+        max_queue: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        max_retries: int = 5,
+        retry_backoff: float = 0.5,
+        put_timeout: float = 0.05,
+    ):
+        super().__init__(daemon=True, name="trade-writer")
+        self.db = db
+        self.portfolio = portfolio
+        self.analytics = analytics
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.put_timeout = put_timeout
+        self._queue: "queue.Queue[TradeEvent]" = queue.Queue(maxsize=max_queue)
+        self._stop_event = threading.Event()
+
+    def submit(self, trade, portfolio_trade=None) -> bool:
+        """Enqueue a trade without touching the database.
+
+        Trades without an exchange order id get a local one here, so every
+        retry of the same event dedupes on the same key. Returns False if
+        the queue stayed full for ``put_timeout`` seconds.
+        """
+        if trade.order_id is None:
+            trade.order_id = f"local-{uuid.uuid4().hex}"
+            if portfolio_trade is not None:
+                portfolio_trade.order_id = trade.order_id
+        try:
+            self._queue.put(TradeEvent(trade, portfolio_trade), timeout=self.put_timeout)
+        except queue.Full:
+            TRADE_WRITES.inc("dropped")
+            print(f"Warning: trade queue full, dropped trade {trade.order_id}")
+            return False
+        TRADE_QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def run(self) -> None:
+        while not (self._stop_event.is_set() and self._queue.empty()):
+            batch = self._drain()
+            if batch:
+                self._process(batch)
+
+    def _drain(self) -> List[TradeEvent]:
+        """Block for the first event, then collect up to batch_size within flush_interval."""
+        try:
+            first = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        TRADE_QUEUE_DEPTH.set(self._queue.qsize())
+        return batch
+
+    def _process(self, batch: List[TradeEvent]) -> None:
+        # Portfolio is in-memory and applied exactly once per event
+        if self.portfolio:
+            for event in batch:
+                if event.portfolio_trade is not None:
+                    self.portfolio.add_trade(event.portfolio_trade)
+        if self.analytics:
+            for event in batch:
+                self.analytics.record_trade(event.trade)
+
+        if not self.db:
+            TRADE_WRITES.inc("skipped", amount=len(batch))
+            return
+
+        trades = [event.trade for event in batch]
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.db.save_trades(trades)
+                TRADE_WRITES.inc("written", amount=len(batch))
+                return
+            except Exception as e:
+                last_error = e
+                if attempt < self.max_retries:
+                    TRADE_WRITES.inc("retried", amount=len(batch))
+                    # Returns immediately once stopping, so shutdown is not held up by backoff
+                    self._stop_event.wait(self.retry_backoff * (2 ** attempt))
+        TRADE_WRITES.inc("failed", amount=len(batch))
+        print(f"Error: failed to persist {len(batch)} trades after {self.max_retries} retries: {last_error}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush queued trades and stop the worker."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=timeout)
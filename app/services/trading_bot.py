@@ -1,6 +1,37 @@
 import threading
 import time
-from typing import Optional, Dict, Any
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+
+from ..monitoring.metrics import BOT_ITERATION, BOT_TICK_TO_ORDER, BOT_ERRORS, BOT_ORDERS, RISK_REJECTIONS
+from .bot_checkpoint import bot_state
+from .risk import RiskRejected
+
+
+def record_fill(trade_writer, portfolio, user_id, symbol: str, side: str, quantity: float, price: float,
+                order: Dict[str, Any], bot_config: Optional[Dict[str, Any]] = None,
+                trade_type: str = "BOT_THRESHOLD") -> None:
+    """Build DB and portfolio trade records for a bot fill and enqueue them."""
+    if not trade_writer or not user_id:
+        return
+    from ..models.trade import Trade as DbTrade
+    from ..services.portfolio import Trade as PTrade
+    trade = DbTrade(
+        user_id=user_id,
+        symbol=symbol,
+        side=side,
+        quantity=quantity,
+        price=float(order.get("price", price)),
+        timestamp=datetime.utcnow(),
+        order_id=order.get("orderId"),
+        trade_type=trade_type,
+        bot_config=bot_config,
+    )
+    p_trade = None
+    if portfolio:
+        ts_ms = int(time.time() * 1000)
+        p_trade = PTrade(symbol=symbol, side=side, quantity=quantity, price=trade.price, timestamp=ts_ms, order_id=trade.order_id)
+    trade_writer.submit(trade, p_trade)
 
 
 class TradingBot(threading.Thread):
@@ -15,6 +46,10 @@ class TradingBot(threading.Thread):
         db=None,
         portfolio=None,
         user_id: str | None = None,
+        trade_writer=None,
+        checkpointer=None,
+        state: Optional[Dict[str, Any]] = None,
+        risk=None,
     ):
         super().__init__(daemon=True)
         self.binance = binance
@@ -29,6 +64,9 @@ class TradingBot(threading.Thread):
         self.db = db
         self.portfolio = portfolio
         self.user_id = user_id
+        self.trade_writer = trade_writer
+        self.checkpointer = checkpointer
+        self.risk = risk
         self.state: Dict[str, Any] = {
             "running": True,
             "symbol": symbol,
@@ -39,119 +77,123 @@ class TradingBot(threading.Thread):
             "last_order": None,
             "holding": False,
             "entry_price": None,
+            "user_id": user_id,
         }
+        if state:
+            # Warm start from a checkpoint: a bot that bought keeps waiting to sell
+            self.holding = bool(state.get("holding"))
+            self.entry_price = state.get("entry_price")
+            self.state.update(holding=self.holding, entry_price=self.entry_price, last_order=state.get("last_order"))
 
     def run(self) -> None:
         while not self.stop_event.is_set():
+            iteration_start = time.perf_counter()
             try:
                 price = self.binance.get_price(self.symbol)
+                tick_time = time.perf_counter()
                 self.state["last_price"] = price
 
                 # Buy only if not holding and price is at/below buy threshold
                 if not self.holding and price <= self.buy_threshold:
-                    order = self.binance.place_market_order(self.symbol, "BUY", self.quantity)
+                    order, reservation = self._place("BUY", price)
+                    BOT_TICK_TO_ORDER.observe(time.perf_counter() - tick_time, self.symbol, "BUY")
+                    BOT_ORDERS.inc(self.symbol, "BUY")
                     self.holding = True
                     self.entry_price = price
                     self.state["holding"] = True
                     self.state["entry_price"] = price
                     self.state["last_order"] = {"type": "BUY", "price": price, "response": order}
-                    # Persist trade if DB and user are available
-                    if self.db and self.user_id:
-                        try:
-                            from ..models.trade import Trade as DbTrade
-                            from ..services.portfolio import Trade as PTrade
-                            trade = DbTrade(
-                                user_id=self.user_id,
-                                symbol=self.symbol,
-                                side="BUY",
-                                quantity=self.quantity,
-                                price=float(order.get("price", price)),
-                                timestamp=datetime.utcnow(),
-                                order_id=order.get("orderId"),
-                                trade_type="BOT_THRESHOLD",
-                                bot_config={
-                                    "buy_threshold": self.buy_threshold,
-                                    "sell_threshold": self.sell_threshold,
-                                    "quantity": self.quantity,
-                                },
-                            )
-                            self.db.save_trade(trade)
-                            if self.portfolio:
-                                ts_ms = int(time.time() * 1000)
-                                p_trade = PTrade(symbol=self.symbol, side="BUY", quantity=self.quantity, price=trade.price, timestamp=ts_ms, order_id=trade.order_id)
-                                self.portfolio.add_trade(p_trade)
-                        except Exception:
-                            pass
+                    self._record_trade("BUY", price, order, reservation)
 
                 # Sell only if holding and price is at/above sell threshold
                 elif self.holding and price >= self.sell_threshold:
-                    order = self.binance.place_market_order(self.symbol, "SELL", self.quantity)
+                    order, reservation = self._place("SELL", price)
+                    BOT_TICK_TO_ORDER.observe(time.perf_counter() - tick_time, self.symbol, "SELL")
+                    BOT_ORDERS.inc(self.symbol, "SELL")
                     self.holding = False
                     self.entry_price = None
                     self.state["holding"] = False
                     self.state["entry_price"] = None
                     self.state["last_order"] = {"type": "SELL", "price": price, "response": order}
-                    if self.db and self.user_id:
-                        try:
-                            from ..models.trade import Trade as DbTrade
-                            from ..services.portfolio import Trade as PTrade
-                            trade = DbTrade(
-                                user_id=self.user_id,
-                                symbol=self.symbol,
-                                side="SELL",
-                                quantity=self.quantity,
-                                price=float(order.get("price", price)),
-                                timestamp=datetime.utcnow(),
-                                order_id=order.get("orderId"),
-                                trade_type="BOT_THRESHOLD",
-                                bot_config={
-                                    "buy_threshold": self.buy_threshold,
-                                    "sell_threshold": self.sell_threshold,
-                                    "quantity": self.quantity,
-                                },
-                            )
-                            self.db.save_trade(trade)
-                            if self.portfolio:
-                                ts_ms = int(time.time() * 1000)
-                                p_trade = PTrade(symbol=self.symbol, side="SELL", quantity=self.quantity, price=trade.price, timestamp=ts_ms, order_id=trade.order_id)
-                                self.portfolio.add_trade(p_trade)
-                        except Exception:
-                            pass
+                    self._record_trade("SELL", price, order, reservation)
 
+            except RiskRejected as exc:
+                self.state["error"] = str(exc)
+                RISK_REJECTIONS.inc(exc.limit)
             except Exception as exc:  # noqa: BLE001
                 self.state["error"] = str(exc)
+                BOT_ERRORS.inc(self.symbol)
 
+            BOT_ITERATION.observe(time.perf_counter() - iteration_start, self.symbol)
             time.sleep(self.poll_interval)
 
         self.state["running"] = False
 
+    def _place(self, side: str, price: float) -> Tuple[Dict[str, Any], Optional[int]]:
+        """Risk-check and place a market order; returns the order and its risk reservation."""
+        reservation = None
+        if self.risk is not None:
+            reservation = self.risk.check(self.user_id, self.symbol, side, self.quantity, price)
+        try:
+            return self.binance.place_market_order(self.symbol, side, self.quantity), reservation
+        except Exception:
+            if self.risk is not None:
+                self.risk.release(reservation)
+            raise
+
+    def _record_trade(self, side: str, price: float, order: Dict[str, Any], reservation: Optional[int] = None) -> None:
+        """Hand a fill to the trade writer; persistence happens off this thread."""
+        if self.risk is not None:
+            self.risk.record_fill(self.user_id, self.symbol, side, self.quantity, float(order.get("price") or price),
+                                  reservation)
+        if self.checkpointer is not None:
+            self.checkpointer.mark(self.user_id, self.symbol,
+                                   bot_state(self.holding, self.entry_price, self.state["last_order"]))
+        record_fill(
+            self.trade_writer, self.portfolio, self.user_id, self.symbol, side, self.quantity, price, order,
+            bot_config={
+                "buy_threshold": self.buy_threshold,
+                "sell_threshold": self.sell_threshold,
+                "quantity": self.quantity,
+            },
+        )
+
     def stop(self) -> None:
         self.stop_event.set()
 
 
 class TradingBotManager:
-    def __init__(self, binance, db=None, portfolio=None, user_id_getter=None):
+    def __init__(self, binance, db=None, portfolio=None, user_id_getter=None, trade_writer=None, engine=None,
+                 checkpointer=None, risk=None):
         self.binance = binance
         self.db = db
         self.portfolio = portfolio
+        self.trade_writer = trade_writer
+        # ThresholdEngine hosting indexed multi-bot threshold strategies
+        self.engine = engine
+        self.checkpointer = checkpointer
+        self.risk = risk
         # user_id_getter: callable returning current user id (optional)
         self.user_id_getter = user_id_getter
         self._lock = threading.Lock()
         self._bot: Optional[TradingBot] = None
 
-    def start(self, symbol: str, buy_threshold: float, sell_threshold: float, quantity: float) -> Dict[str, Any]:
+    def start(self, symbol: str, buy_threshold: float, sell_threshold: float, quantity: float,
+              user_id: Optional[str] = None, binance=None, state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         with self._lock:
             if self._bot and self._bot.is_alive():
                 raise RuntimeError("Bot already running")
             # Pass db/portfolio/user context if available
-            uid = None
-            try:
-                from flask_login import current_user
-                if current_user and current_user.is_authenticated:
-                    uid = current_user.user_id
-            except Exception:
-                uid = None
-            self._bot = TradingBot(self.binance, symbol, buy_threshold, sell_threshold, quantity, db=self.db, portfolio=self.portfolio, user_id=uid)
+            uid = user_id
+            if uid is None:
+                try:
+                    from flask_login import current_user
+                    if current_user and current_user.is_authenticated:
+                        uid = current_user.user_id
+                except Exception:
+                    uid = None
+            self._bot = TradingBot(binance or self.binance, symbol, buy_threshold, sell_threshold, quantity, db=self.db, portfolio=self.portfolio, user_id=uid, trade_writer=self.trade_writer,
+                                   checkpointer=self.checkpointer, state=state, risk=self.risk)
             self._bot.start()
             return {"started": True, "symbol": symbol, "buy_threshold": buy_threshold, "sell_threshold": sell_threshold, "quantity": quantity}
 
@@ -170,6 +212,14 @@ class TradingBotManager:
                 return {"running": False}
             return {"running": True, **self._bot.state}
 
+    def threads(self) -> List[threading.Thread]:
+        """Live bot threads, e.g. for attaching the sampling profiler"""
+        with self._lock:
+            threads = [self._bot] if self._bot and self._bot.is_alive() else []
+        if self.engine:
+            threads.extend(self.engine.threads())
+        return threads
+
     def is_running(self) -> bool:
         with self._lock:
             return self._bot is not None and self._bot.is_alive()
@@ -0,0 +1,98 @@
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Tuple
+
+
+class TriggerIndex:
+    """Sorted price-level index of threshold bots for one symbol.
+
+    Flat bots sit on the buy side keyed by ``buy_threshold``; holding bots
+    sit on the sell side keyed by ``sell_threshold``. A tick at ``price``
+    is due for every flat bot with ``buy_threshold >= price`` and every
+    holding bot with ``sell_threshold <= price`` - the same rule
+    ``TradingBot`` applies - found with one bisect per side, so a tick
+    costs O(log n + k) for k triggered bots. Fired bots flip sides via
+    ``set_holding``, which is why each crossing fires a bot once; a bot
+    whose order fails stays due, and ``SymbolLoop`` backs it off.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        # Parallel sorted arrays: levels ascending, ids in matching order
+        self._buy_levels: List[float] = []
+        self._buy_ids: List[str] = []
+        self._sell_levels: List[float] = []
+        self._sell_ids: List[str] = []
+        # bot_id -> (buy_threshold, sell_threshold, holding)
+        self._bots: Dict[str, Tuple[float, float, bool]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._bots)
+
+    def __contains__(self, bot_id: str) -> bool:
+        return bot_id in self._bots
+
+    @staticmethod
+    def _insert(levels: List[float], ids: List[str], level: float, bot_id: str) -> None:
+        i = bisect_right(levels, level)
+        levels.insert(i, level)
+        ids.insert(i, bot_id)
+
+    @staticmethod
+    def _delete(levels: List[float], ids: List[str], level: float, bot_id: str) -> None:
+        i = bisect_left(levels, level)
+        while i < len(levels) and levels[i] == level:
+            if ids[i] == bot_id:
+                del levels[i]
+                del ids[i]
+                return
+            i += 1
+        raise KeyError(bot_id)
+
+    def _side(self, holding: bool) -> Tuple[List[float], List[str]]:
+        if holding:
+            return self._sell_levels, self._sell_ids
+        return self._buy_levels, self._buy_ids
+
+    def add(self, bot_id: str, buy_threshold: float, sell_threshold: float, holding: bool = False) -> None:
+        with self._lock:
+            if bot_id in self._bots:
+                self._remove_locked(bot_id)
+            self._bots[bot_id] = (buy_threshold, sell_threshold, holding)
+            level = sell_threshold if holding else buy_threshold
+            self._insert(*self._side(holding), level, bot_id)
+
+    def remove(self, bot_id: str) -> None:
+        with self._lock:
+            self._remove_locked(bot_id)
+
+    def _remove_locked(self, bot_id: str) -> None:
+        buy_threshold, sell_threshold, holding = self._bots.pop(bot_id)
+        level = sell_threshold if holding else buy_threshold
+        self._delete(*self._side(holding), level, bot_id)
+
+    def set_holding(self, bot_id: str, holding: bool) -> None:
+        """Move a bot to the sell side (holding) or back to the buy side."""
+        with self._lock:
+            buy_threshold, sell_threshold, current = self._bots[bot_id]
+            if current == holding:
+                return
+            self._remove_locked(bot_id)
+            self._bots[bot_id] = (buy_threshold, sell_threshold, holding)
+            level = sell_threshold if holding else buy_threshold
+            self._insert(*self._side(holding), level, bot_id)
+
+    def triggered(self, price: float) -> Tuple[List[str], List[str]]:
+        """Return (bot ids due to BUY, bot ids due to SELL) at this price."""
+        with self._lock:
+            buys = self._buy_ids[bisect_left(self._buy_levels, price):]
+            sells = self._sell_ids[:bisect_right(self._sell_levels, price)]
+            return buys, sells
+
+    def levels(self) -> Dict[str, List[Tuple[float, str]]]:
+        with self._lock:
+            return {
+                "buy": list(zip(self._buy_levels, self._buy_ids)),
+                "sell": list(zip(self._sell_levels, self._sell_ids)),
+            }
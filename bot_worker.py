@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Bot engine process: owns every trading bot, the portfolio and the trade writer.
+
+Run one of these next to any number of API workers started with
+BOT_ENGINE=remote, e.g.:
+
+    python bot_worker.py &
+    BOT_ENGINE=remote gunicorn -w 4 run:app
+"""
+import os
+import signal
+import sys
+
+from app.binance_client import BinanceClient
+from app.config import Config
+from app.database.mongodb import MongoDB
+from app.services.bot_engine import BotEngine
+from app.services.candles import persisted_candles
+from app.services.engine_ipc import EngineServer, check_authkey
+from app.services.price_storage import PriceStorage, ArchiveJob
+
+
+def main():
+    try:
+        authkey = check_authkey(Config.BOT_ENGINE_AUTHKEY.encode())
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    db = MongoDB(timeout_ms=Config.MONGODB_TIMEOUT_MS)
+    db.enable_spool(Config.MONGO_SPOOL_PATH, Config.MONGO_BREAKER_FAILURES, Config.MONGO_BREAKER_RESET)
+    try:
+        db.connect()
+        print("✅ MongoDB connected successfully")
+    except Exception as e:
+        print(f"❌ MongoDB connection failed: {e}")
+        db = None
+
+    binance = BinanceClient(
+        api_key=Config.BINANCE_API_KEY,
+        api_secret=Config.BINANCE_API_SECRET,
+        base_url=Config.BINANCE_BASE_URL,
+        dry_run=Config.DRY_RUN,
+    )
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    # The one persisted candle aggregator: API workers forward their ticks here and read bars back
+    candles = persisted_candles(config)
+    candles.start()
+    engine = BotEngine(binance, db=db, config=config, candles=candles)
+    engine.start()
+
+    # The single archiver of the data directory the API workers append ticks to
+    archive_job = None
+    if Config.PRICE_ARCHIVE_INTERVAL > 0:
+        archive_job = ArchiveJob(PriceStorage(hot_days=Config.PRICE_HOT_DAYS), interval=Config.PRICE_ARCHIVE_INTERVAL,
+                                 retention_days=Config.PRICE_RETENTION_DAYS)
+        archive_job.start()
+
+    os.makedirs(os.path.dirname(Config.BOT_ENGINE_SOCKET) or ".", exist_ok=True)
+    server = EngineServer(
+        engine, Config.BOT_ENGINE_SOCKET, authkey,
+        snapshot_path=Config.BOT_ENGINE_SNAPSHOT,
+        snapshot_interval=Config.BOT_ENGINE_SNAPSHOT_INTERVAL,
+    )
+
+    def shutdown(signum, frame):
+        print("⏹️  Stopping bot engine")
+        server.stop()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    try:
+        server.serve_forever()
+    finally:
+        if archive_job is not None:
+            archive_job.stop()
+        engine.shutdown()
+        candles.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Command line maintenance tools for price and kline storage, plus offline strategy simulation
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+from app.services.price_storage import PriceStorage
+
+
+def _parse_time(value):
+    """Accept epoch milliseconds or an ISO date/datetime."""
+    if value is None:
+        return None
+    if value.isdigit():
+        return int(value)
+    return int(datetime.fromisoformat(value).timestamp() * 1000)
+
+
+def _connect_db(enabled):
+    if not enabled:
+        return None
+    from app.database.mongodb import MongoDB
+    db = MongoDB()
+    db.connect()
+    return db
+
+
+def export_prices(args):
+    from app.services.price_bulk import export_history
+    storage = PriceStorage(data_dir=args.data_dir)
+    started = time.perf_counter()
+    written = 0
+    with open(args.output, "wb") as out:
+        for chunk in export_history(storage, args.symbol.upper(), args.format,
+                                    _parse_time(args.start) or 0, _parse_time(args.end),
+                                    batch_rows=args.batch_rows):
+            out.write(chunk)
+            written += len(chunk)
+    print(f"✅ Exported {args.symbol.upper()} to {args.output} ({written} bytes, {time.perf_counter() - started:.2f}s)")
+
+
+def import_prices(args):
+    from app.services.price_bulk import import_history
+    fmt = args.format or ("csv" if args.input.endswith(".csv") else "parquet")
+    storage = PriceStorage(data_dir=args.data_dir, db=_connect_db(args.db))
+    result = import_history(storage, args.symbol.upper(), args.input, fmt, to_db=args.db, batch_rows=args.batch_rows)
+    print(f"✅ Imported {result['rows']} rows ({result['rows_per_second']} rows/s, {result['db_rows']} to MongoDB)")
+
+
+def archive_prices(args):
+    from app.services.price_storage import ArchiveJob
+    storage = PriceStorage(data_dir=args.data_dir, hot_days=args.hot_days)
+    result = ArchiveJob(storage, retention_days=args.retention_days).run_once()
+    for symbol, rows in sorted(result["moved"].items()):
+        print(f"   {symbol}: {rows} ticks archived")
+    print(f"✅ Archived {sum(result['moved'].values())} ticks, dropped {result['partitions_dropped']} partitions "
+          f"in {result['seconds']}s")
+
+
+def _resolve_user(db, user):
+    """Username or user id -> user id."""
+    found = db.get_user_by_username(user)
+    return found.user_id if found else user
+
+
+def export_trades(args):
+    from app.services.trade_bulk import export_trades as stream_trades
+    db = _connect_db(True)
+    user_id = _resolve_user(db, args.user)
+    started = time.perf_counter()
+    written = 0
+    with open(args.output, "wb") as out:
+        for chunk in stream_trades(db, user_id, args.format, _parse_time(args.start), _parse_time(args.end),
+                                   batch_rows=args.batch_rows):
+            out.write(chunk)
+            written += len(chunk)
+    print(f"✅ Exported trades of {args.user} to {args.output} ({written} bytes, {time.perf_counter() - started:.2f}s)")
+
+
+def import_trades(args):
+    from dataclasses import asdict
+    from app.config import Config
+    from app.services.analytics import rebuild_user
+    from app.services.trade_bulk import import_trades as load_trades
+    fmt = args.format or ("parquet" if args.input.endswith(".parquet") else "csv")
+    db = _connect_db(True)
+    user_id = _resolve_user(db, args.user)
+    result = load_trades(db, user_id, args.input, fmt, batch_rows=args.batch_rows)
+    print(f"✅ Imported {result['inserted']} trades ({result['duplicates']} duplicates skipped, "
+          f"{result['rows_per_second']} rows/s)")
+    if result["conflicts"]:
+        print(f"❌ {result['conflicts']} rows skipped: their order_id belongs to another user's trade, "
+              f"e.g. {', '.join(result['conflicting_order_ids'][:5])}")
+    if result["inserted"]:
+        # Engines load these aggregates at startup; a running one keeps its own until restarted
+        db.save_user_analytics([asdict(rebuild_user(db, user_id, Config.ANALYTICS_MAX_DAYS))])
+        print(f"✅ Rebuilt analytics for {args.user}")
+
+
+def backfill(args):
+    from app.binance_client import BinanceClient
+    from app.config import Config
+    from app.services.backfill import BackfillService
+    from app.services.kline_store import KlineStore
+
+    binance = BinanceClient(Config.BINANCE_API_KEY, Config.BINANCE_API_SECRET, Config.BINANCE_BASE_URL, dry_run=True)
+    store = KlineStore(os.path.join(args.data_dir, "klines"))
+    service = BackfillService(binance, store, os.path.join(args.data_dir, "klines", "backfill_checkpoint.json"),
+                              weight_per_minute=args.weight_per_minute)
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    intervals = [i.strip() for i in args.intervals.split(",") if i.strip()]
+    try:
+        result = service.run(symbols, intervals, _parse_time(args.start) or 0, _parse_time(args.end), workers=args.workers)
+    except KeyboardInterrupt:
+        service.stop()
+        print("⏹️  Interrupted; rerun the same command to resume from the checkpoint")
+        return
+    for series in result["series"]:
+        print(f"   {series['symbol']} {series['interval']}: {series['candles']} candles")
+    for key, error in result["errors"].items():
+        print(f"   ❌ {key}: {error}")
+    print(f"✅ Backfilled {result['candles']} candles in {result['seconds']}s")
+
+
+def repair_gaps(args):
+    from app.binance_client import BinanceClient
+    from app.config import Config
+    from app.services.backfill import BackfillService
+    from app.services.gap_repair import GapRepairService
+    from app.services.kline_store import KlineStore
+
+    binance = BinanceClient(Config.BINANCE_API_KEY, Config.BINANCE_API_SECRET, Config.BINANCE_BASE_URL, dry_run=True)
+    store = KlineStore(os.path.join(args.data_dir, "klines"))
+    backfill_service = BackfillService(binance, store, os.path.join(args.data_dir, "klines", "backfill_checkpoint.json"),
+                                       weight_per_minute=args.weight_per_minute)
+    service = GapRepairService(PriceStorage(data_dir=args.data_dir), backfill_service,
+                               max_gap_ms=args.max_gap * 1000, interval=args.interval)
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()] if args.symbols else None
+    result = service.run(symbols, dry_run=args.dry_run)
+    for report in result["symbols"]:
+        before = report.get("before", report)
+        after = report.get("after", report)
+        line = f"   {report['symbol']}: {before['ticks']} ticks, {before['gaps']} gaps, coverage {before['coverage']:.2%}"
+        if not args.dry_run:
+            line += f" -> {after['coverage']:.2%} ({report['filled_ticks']} ticks filled, {after['gaps']} gaps left)"
+        print(line)
+    for symbol, error in result["errors"].items():
+        print(f"   ❌ {symbol}: {error}")
+    print(f"✅ {'Scanned' if args.dry_run else 'Repaired'} {len(result['symbols'])} symbols in {result['seconds']}s")
+
+
+def simulate(args):
+    import json
+    from app.services.kline_store import interval_ms
+    from app.services.simulation import load_history, resample_last, monte_carlo, walk_forward
+
+    symbol = args.symbol.upper()
+    timestamps, prices = load_history(PriceStorage(data_dir=args.data_dir), symbol,
+                                      _parse_time(args.start) or 0, _parse_time(args.end))
+    timestamps, prices = resample_last(timestamps, prices, interval_ms(args.bar))
+    if prices.size < 2:
+        raise ValueError(f"No stored price history for {symbol}")
+    params = json.loads(args.params) if args.params else {}
+    if args.buy is not None:
+        params["buy_threshold"] = args.buy
+    if args.sell is not None:
+        params["sell_threshold"] = args.sell
+    print(f"📈 {symbol}: {prices.size} {args.bar} bars")
+
+    if args.walk_forward:
+        grid = json.loads(args.grid) if args.grid else None
+        result = walk_forward(prices, args.bot_type, grid, args.train_bars, args.test_bars, args.paths, args.block,
+                              args.quantity, args.fee, args.seed, args.workers)
+        for window in result["windows"]:
+            print(f"   bar {window['test_start']}: {window['params']} -> test PnL {window['test_pnl']:.4f} "
+                  f"(train mean {window['train_mean_pnl']:.4f}, {window['test_trades']} trades)")
+        print(f"✅ Walk-forward over {len(result['windows'])} windows: total test PnL "
+              f"{result['total_test_pnl']:.4f} in {result['seconds']}s")
+        return
+
+    if args.bot_type == "THRESHOLD" and not {"buy_threshold", "sell_threshold"} <= params.keys():
+        raise ValueError("THRESHOLD needs --buy and --sell (or --params)")
+    result = monte_carlo(prices, args.bot_type, params, args.paths, args.length, args.block, args.quantity,
+                         args.fee, args.seed, args.workers)
+    pnl, drawdown = result["pnl"], result["max_drawdown"]
+    print(f"   params: {result['params']}")
+    print(f"   PnL p5/p50/p95: {pnl['p5']:.4f} / {pnl['p50']:.4f} / {pnl['p95']:.4f} "
+          f"(mean {pnl['mean']:.4f}, P(loss) {result['prob_loss']:.1%})")
+    print(f"   max drawdown p50/p95: {drawdown['p50']:.4f} / {drawdown['p95']:.4f}")
+    print(f"   historical path: PnL {result['historical']['pnl']:.4f}, "
+          f"drawdown {result['historical']['max_drawdown']:.4f}, {int(result['historical']['trades'])} trades")
+    print(f"✅ Simulated {result['paths']} paths of {result['length']} bars in {result['seconds']}s")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--data-dir", default="data")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export-prices", help="Export a symbol's price history as Parquet or Arrow IPC")
+    p.add_argument("symbol")
+    p.add_argument("output")
+    p.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    p.add_argument("--start", help="epoch ms or ISO datetime")
+    p.add_argument("--end", help="epoch ms or ISO datetime")
+    p.add_argument("--batch-rows", type=int, default=1_000_000)
+    p.set_defaults(func=export_prices)
+
+    p = sub.add_parser("import-prices", help="Bulk import a Parquet or CSV dump with timestamp,price columns")
+    p.add_argument("symbol")
+    p.add_argument("input")
+    p.add_argument("--format", choices=["parquet", "csv"])
+    p.add_argument("--db", action="store_true", help="also insert into MongoDB (MONGODB_URI)")
+    p.add_argument("--batch-rows", type=int, default=1_000_000)
+    p.set_defaults(func=import_prices)
+
+    p = sub.add_parser("archive-prices", help="Move ticks past the hot window into archive partitions")
+    p.add_argument("--hot-days", type=int, default=1, help="days of ticks left in the hot CSVs")
+    p.add_argument("--retention-days", type=int, default=0, help="drop archive partitions older than this (0 = keep)")
+    p.set_defaults(func=archive_prices)
+
+    p = sub.add_parser("export-trades", help="Export a user's trade history as CSV or Parquet (MONGODB_URI)")
+    p.add_argument("user", help="username or user id")
+    p.add_argument("output")
+    p.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    p.add_argument("--start", help="epoch ms or ISO datetime")
+    p.add_argument("--end", help="epoch ms or ISO datetime")
+    p.add_argument("--batch-rows", type=int, default=50_000)
+    p.set_defaults(func=export_trades)
+
+    p = sub.add_parser("import-trades", help="Bulk import a CSV or Parquet trade dump, skipping known order ids")
+    p.add_argument("user", help="username or user id")
+    p.add_argument("input")
+    p.add_argument("--format", choices=["csv", "parquet"])
+    p.add_argument("--batch-rows", type=int, default=50_000)
+    p.set_defaults(func=import_trades)
+
+    p = sub.add_parser("backfill", help="Download kline history into data/klines (resumable)")
+    p.add_argument("--symbols", required=True, help="comma-separated, e.g. BTCUSDT,ETHUSDT")
+    p.add_argument("--intervals", default="1m", help="comma-separated, e.g. 1m,1h")
+    p.add_argument("--start", help="epoch ms or ISO datetime (default: earliest available)")
+    p.add_argument("--end", help="epoch ms or ISO datetime (default: now)")
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--weight-per-minute", type=int, default=1200)
+    p.set_defaults(func=backfill)
+
+    p = sub.add_parser("repair-gaps", help="Find gaps in stored ticks and fill them from klines")
+    p.add_argument("--symbols", help="comma-separated (default: every stored symbol)")
+    p.add_argument("--max-gap", type=int, default=300, help="gap threshold in seconds")
+    p.add_argument("--interval", default="1m", help="kline interval used to fill gaps")
+    p.add_argument("--dry-run", action="store_true", help="only report coverage")
+    p.add_argument("--weight-per-minute", type=int, default=1200)
+    p.set_defaults(func=repair_gaps)
+
+    p = sub.add_parser("simulate", help="Monte Carlo or walk-forward evaluation of a bot strategy on stored prices")
+    p.add_argument("symbol")
+    p.add_argument("--start", help="epoch ms or ISO datetime")
+    p.add_argument("--end", help="epoch ms or ISO datetime")
+    p.add_argument("--bar", default="1m", help="resample ticks to this bar size")
+    p.add_argument("--bot-type", default="THRESHOLD", choices=["THRESHOLD", "EMA_CROSS", "RSI", "BOLLINGER"])
+    p.add_argument("--params", help='strategy params as JSON, e.g. \'{"fast": 12, "slow": 26}\'')
+    p.add_argument("--buy", type=float, help="THRESHOLD buy price")
+    p.add_argument("--sell", type=float, help="THRESHOLD sell price")
+    p.add_argument("--quantity", type=float, default=1.0)
+    p.add_argument("--fee", type=float, default=0.001, help="fee rate per fill")
+    p.add_argument("--paths", type=int, default=1000)
+    p.add_argument("--length", type=int, help="bars per path (default: history length)")
+    p.add_argument("--block", type=int, default=60, help="bootstrap block length in bars")
+    p.add_argument("--workers", type=int, help="processes (default: all cores)")
+    p.add_argument("--seed", type=int)
+    p.add_argument("--walk-forward", action="store_true", help="roll train/test windows instead")
+    p.add_argument("--train-bars", type=int, default=1440)
+    p.add_argument("--test-bars", type=int, default=360)
+    p.add_argument("--grid", help="walk-forward candidate params as a JSON list (default: price quantiles)")
+    p.set_defaults(func=simulate)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.func(args)
+    except Exception as e:
+        print(f"❌ {args.command} failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Measure time from process start to the first request served.
+
+Each run starts a fresh interpreter that imports the app, calls
+create_app() and serves GET /healthz through the test client. Exits
+non-zero when the median exceeds --target milliseconds, so it can guard
+against startup regressions in CI:
+
+    python measure_startup.py --runs 5 --target 300 --mongo-down
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+from app import create_app
+t1 = time.perf_counter()
+app = create_app()
+t2 = time.perf_counter()
+response = app.test_client().get("/healthz")
+t3 = time.perf_counter()
+print("STARTUP " + json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "first_request_ms": (t3 - t2) * 1000,
+    "status": response.status_code,
+}))
+"""
+
+
+def run_once(env):
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", CHILD], env=env, capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    total_ms = (time.perf_counter() - started) * 1000
+    for line in proc.stdout.splitlines():
+        if line.startswith("STARTUP "):
+            result = json.loads(line[len("STARTUP "):])
+            # Wall time includes interpreter start; the child exits right after the request
+            result["total_ms"] = total_ms
+            result["served_ms"] = result["import_ms"] + result["create_app_ms"] + result["first_request_ms"]
+            return result
+    raise RuntimeError(f"startup run failed:\n{proc.stderr[-2000:]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", type=float, default=300.0, help="max median ms to first request served")
+    parser.add_argument("--eager", action="store_true", help="measure DEFERRED_STARTUP=false instead")
+    parser.add_argument("--mongo-down", action="store_true", help="point MONGODB_URI at a closed port")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, DEFERRED_STARTUP="false" if args.eager else "true")
+    if args.mongo_down:
+        env["MONGODB_URI"] = "mongodb://127.0.0.1:9/"
+
+    results = [run_once(env) for _ in range(args.runs)]
+    for key in ("import_ms", "create_app_ms", "first_request_ms", "served_ms", "total_ms"):
+        values = [r[key] for r in results]
+        print(f"   {key:<18} median {statistics.median(values):8.1f}   max {max(values):8.1f}")
+    median = statistics.median(r["served_ms"] for r in results)
+    if median > args.target:
+        print(f"❌ Median time to first request {median:.1f} ms exceeds target {args.target:.0f} ms")
+        return 1
+    print(f"✅ Median time to first request {median:.1f} ms (target {args.target:.0f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
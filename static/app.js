@@ -15,6 +15,22 @@ let currentPeriod = "1d";
 let realTimeData = [];
 let historicalData = [];
 let isStreaming = false;
+let historyEtag = null;
+// Server-side LTTB keeps the chart at roughly one point per horizontal pixel
+const MAX_CHART_POINTS = 1500;
+
+// Fetch price history with If-None-Match; resolves to null on 304 Not Modified
+async function fetchHistory(url) {
+  const headers = historyEtag ? { "If-None-Match": historyEtag } : {};
+  const res = await fetch(url, { headers });
+  if (res.status === 304) return null;
+  if (!res.ok) {
+    const txt = await res.text();
+    throw new Error(txt || res.statusText);
+  }
+  historyEtag = res.headers.get("ETag");
+  return res.json();
+}
 
 function ensureChart() {
   if (chart) {
@@ -147,18 +163,36 @@ async function updatePrice() {
 
 async function updateChart() {
   try {
-    updateStreamingStatus("loading", "Loading Data...");
-    const data = await fetchJSON(`/api/price-history?symbol=${encodeURIComponent(currentSymbol)}&period=${currentPeriod}`);
+    // After the first load only ask for points newer than the last one we have
+    const delta = historicalData.length > 0;
+    if (!delta) {
+      updateStreamingStatus("loading", "Loading Data...");
+    }
+    let url = `/api/price-history?symbol=${encodeURIComponent(currentSymbol)}&period=${currentPeriod}&format=columnar&max_points=${MAX_CHART_POINTS}`;
+    if (delta) {
+      url += `&since=${historicalData[historicalData.length - 1].timestamp}`;
+    }
+    const data = await fetchHistory(url);
+    if (data === null) {
+      updateChartInfo();
+      return;
+    }
     
-    if (data.data && data.data.length > 0) {
+    const points = (data.timestamps || []).map((timestamp, i) => ({
+      timestamp: timestamp,
+      price: data.prices[i]
+    }));
+
+    if (data.delta) {
+      // Append new points and drop those that slid out of the period window
+      historicalData = historicalData.filter(item => item.timestamp >= data.first).concat(points);
+    } else {
+      historicalData = points;
+    }
+
+    if (historicalData.length > 0) {
       ensureChart();
       
-      // Store historical data
-      historicalData = data.data.map(item => ({
-        timestamp: item.timestamp,
-        price: Number(item.price)
-      }));
-      
       // Update chart with historical data
       updateChartData();
       
@@ -289,6 +323,7 @@ function onSymbolChange() {
   // Reset data for new symbol
   realTimeData = [];
   historicalData = [];
+  historyEtag = null;
   isStreaming = false;
   
   updateStreamingStatus("loading", "Switching Symbol...");
@@ -302,6 +337,7 @@ function onPeriodChange() {
   // Reset data for new period
   realTimeData = [];
   historicalData = [];
+  historyEtag = null;
   isStreaming = false;
   
   updateStreamingStatus("loading", "Loading Period...");
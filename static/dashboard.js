@@ -34,20 +34,16 @@ async function fetchJSON(url, options = {}) {
 // Dashboard data loading
 async function loadDashboardData() {
     try {
-        // Load portfolio summary
-        const portfolioResponse = await fetchJSON('/api/portfolio');
-        updatePortfolioSummary(portfolioResponse);
-        
-        // Load bot configurations
-        const botConfigsResponse = await fetchJSON('/api/bot-configs');
-        updateBotConfigurations(botConfigsResponse.configs);
-        
-        // Load recent trades
-        const tradesResponse = await fetchJSON('/api/trades?limit=10');
-        updateRecentTrades(tradesResponse.trades);
+        // Portfolio, bot configurations and recent trades in one cached request
+        const snapshot = await fetchJSON('/api/dashboard-snapshot?trades_limit=10');
+        if (snapshot.portfolio.summary) {
+            updatePortfolioSummary(snapshot.portfolio);
+        }
+        updateBotConfigurations(snapshot.bot_configs);
+        updateRecentTrades(snapshot.trades);
         
         // Update statistics
-        updateTradingStats(portfolioResponse.stats);
+        updateTradingStats(snapshot.portfolio.stats);
         
     } catch (error) {
         console.error('Failed to load dashboard data:', error);
@@ -57,7 +53,7 @@ async function loadDashboardData() {
 
 function updatePortfolioSummary(data) {
     const summary = data.summary;
-    const stats = data.stats;
+    const stats = data.stats || {};
     
     // Update overview cards
     const totalValue = summary.positions?.reduce((sum, pos) => sum + pos.total_value, 0) || 0;
@@ -206,8 +202,7 @@ async function toggleBot(symbol, activate) {
         }
         
         // Refresh bot configurations
-        const response = await fetchJSON('/api/bot-configs');
-        updateBotConfigurations(response.configs);
+        await loadDashboardData();
         
         showSuccess(`Bot ${activate ? 'started' : 'stopped'} successfully`);
     } catch (error) {
@@ -225,8 +220,7 @@ async function deleteBot(symbol) {
         await fetchJSON(`/api/bot-config/${symbol}`, { method: 'DELETE' });
         
         // Refresh bot configurations
-        const response = await fetchJSON('/api/bot-configs');
-        updateBotConfigurations(response.configs);
+        await loadDashboardData();
         
         showSuccess('Bot configuration deleted successfully');
     } catch (error) {
@@ -273,8 +267,7 @@ async function createBot(event) {
         closeModal();
         
         // Refresh bot configurations
-        const response = await fetchJSON('/api/bot-configs');
-        updateBotConfigurations(response.configs);
+        await loadDashboardData();
         
         showSuccess('Bot configuration created successfully');
     } catch (error) {
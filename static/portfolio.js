@@ -175,43 +175,49 @@ function updateTradesTable(trades) {
   $("tradesTable").innerHTML = table;
 }
 
-async function updatePortfolio() {
-  try {
-    const data = await fetchJSON("/api/portfolio");
-    updateSummaryCards(data);
-    updatePositionsTable(data.positions);
-  } catch (e) {
-    console.error("Portfolio update failed:", e);
-  }
-}
-
-async function updateBalances() {
-  try {
-    const data = await fetchJSON("/api/balances");
-    updateBalancesTable(data.balances);
-  } catch (e) {
-    console.error("Balances update failed:", e);
-  }
+function portfolioView(summary, analytics) {
+  const positions = (summary ? summary.positions : []).map(pos => ({
+    symbol: pos._id,
+    quantity: pos.total_quantity,
+    entry_price: pos.entry_price,
+    current_price: pos.current_price,
+    unrealized_pnl: pos.unrealized_pnl,
+    realized_pnl: pos.realized_pnl,
+    entry_time: pos.last_trade
+  }));
+  const unrealized = summary ? summary.total_unrealized_pnl : null;
+  const realized = analytics ? analytics.realized_pnl : null;
+  return {
+    positions,
+    position_count: positions.length,
+    total_unrealized_pnl: unrealized,
+    total_realized_pnl: realized,
+    total_pnl: unrealized === null && realized === null ? null : (unrealized || 0) + (realized || 0)
+  };
 }
 
-async function updateTrades() {
+async function updateAll() {
   try {
-    const data = await fetchJSON("/api/trades");
-    updateTradesTable(data.trades);
+    // Portfolio, balances and trades in one request, cached server-side per section
+    const snapshot = await fetchJSON("/api/dashboard-snapshot");
+    const view = portfolioView(snapshot.portfolio.summary, snapshot.analytics);
+    updateSummaryCards(view);
+    updatePositionsTable(view.positions);
+    updateBalancesTable(snapshot.balances ? snapshot.balances.balances : null);
+    updateTradesTable(snapshot.trades);
+    for (const [section, error] of Object.entries(snapshot.errors || {})) {
+      console.error(`Snapshot section ${section} failed:`, error);
+    }
   } catch (e) {
-    console.error("Trades update failed:", e);
+    console.error("Portfolio update failed:", e);
   }
 }
 
 function init() {
-  updatePortfolio();
-  updateBalances();
-  updateTrades();
+  updateAll();
   
   // Refresh data every 5 seconds
-  setInterval(updatePortfolio, 5000);
-  setInterval(updateBalances, 10000);
-  setInterval(updateTrades, 10000);
+  setInterval(updateAll, 5000);
 }
 
 document.addEventListener("DOMContentLoaded", init);
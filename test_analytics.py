@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Analytics tests: running (Welford) daily statistics against numpy, and restore/replay at startup
+"""
+import math
+import sys
+from dataclasses import asdict
+
+import numpy as np
+
+from app.services.analytics import UserAnalytics, AnalyticsEngine, DAY_MS, TRADING_DAYS
+
+
+def round_trip(user, day, pnl, symbol="BTCUSDT"):
+    """One buy and one sell on ``day`` realizing ``pnl``."""
+    ts = day * DAY_MS + 1000
+    user.apply(symbol, "BUY", 1.0, 100.0, ts, 365)
+    user.apply(symbol, "SELL", 1.0, 100.0 + pnl, ts + 1, 365)
+
+
+def test_daily_ratios_match_numpy():
+    rng = np.random.default_rng(4)
+    user = UserAnalytics("u1")
+    daily = np.zeros(120)
+    for day in range(120):
+        # Some days have no fills and must count as zero PnL
+        if day == 0 or rng.random() < 0.7:
+            daily[day] = round(float(rng.normal(1.0, 5.0)), 6)
+            round_trip(user, day, daily[day])
+    summary = user.summary(now_ms=119 * DAY_MS, curve=True)
+
+    assert summary["days"] == 120
+    assert math.isclose(summary["mean_daily_pnl"], daily.mean(), rel_tol=1e-9, abs_tol=1e-9)
+    std = daily.std(ddof=1)
+    downside = math.sqrt((np.minimum(daily, 0) ** 2).mean())
+    assert math.isclose(summary["sharpe"], daily.mean() / std * math.sqrt(TRADING_DAYS), rel_tol=1e-9)
+    assert math.isclose(summary["sortino"], daily.mean() / downside * math.sqrt(TRADING_DAYS), rel_tol=1e-9)
+
+    equity = np.cumsum(daily)
+    assert math.isclose(summary["realized_pnl"], equity[-1], rel_tol=1e-9)
+    assert math.isclose(summary["max_drawdown"], (np.maximum.accumulate(np.maximum(equity, 0)) - equity).max(),
+                        rel_tol=1e-9)
+    assert [day for day, _ in summary["equity_curve"]][-1] == 119 * DAY_MS
+
+
+def test_idle_days_until_now_count_as_zero():
+    user = UserAnalytics("u1")
+    round_trip(user, 10, 6.0)
+    round_trip(user, 11, -2.0)
+    summary = user.summary(now_ms=13 * DAY_MS + 5, curve=False)
+    daily = np.array([6.0, -2.0, 0.0, 0.0])
+    assert summary["days"] == 4
+    assert math.isclose(summary["sharpe"], daily.mean() / daily.std(ddof=1) * math.sqrt(TRADING_DAYS))
+    # Reading the summary does not close the open day
+    assert user.day == 11 and user.n_days == 1
+
+
+def test_trade_counts_and_average_cost():
+    user = UserAnalytics("u1")
+    user.apply("ETHUSDT", "BUY", 1.0, 100.0, 0, 365)
+    user.apply("ETHUSDT", "BUY", 1.0, 200.0, 1, 365)
+    user.apply("ETHUSDT", "SELL", 1.5, 160.0, 2, 365)
+    user.apply("ETHUSDT", "SELL", 5.0, 140.0, 3, 365)  # only the 0.5 still held is closed
+    user.apply("BTCUSDT", "SELL", 1.0, 100.0, 4, 365)  # nothing held: ignored
+    summary = user.summary(now_ms=0, curve=False)
+    assert summary["trades"] == 5 and summary["closed_trades"] == 2
+    assert summary["wins"] == 1 and summary["losses"] == 1 and summary["win_rate"] == 0.5
+    assert summary["realized_pnl"] == 15.0 - 5.0
+    assert summary["realized_by_symbol"] == {"ETHUSDT": 10.0}
+    assert user.positions == {} and user.day_loss == 5.0
+
+
+def test_daily_points_are_capped():
+    user = UserAnalytics("u1")
+    for day in range(10):
+        ts = day * DAY_MS
+        user.apply("BTCUSDT", "BUY", 1.0, 100.0, ts, 3)
+        user.apply("BTCUSDT", "SELL", 1.0, 101.0, ts, 3)
+    assert [point[0] for point in user.daily] == [6 * DAY_MS, 7 * DAY_MS, 8 * DAY_MS]
+    # The ratios still cover every day
+    assert user.summary(now_ms=9 * DAY_MS)["days"] == 10
+
+
+class FakeDB:
+    def __init__(self, docs, trades):
+        self.docs = docs
+        self.trades = trades
+        self.saved = []
+
+    def get_user_analytics_docs(self):
+        return list(self.docs)
+
+    def iter_trades_since(self, since_ms=None):
+        return [t for t in self.trades if since_ms is None or t["timestamp"] >= since_ms]
+
+    def save_user_analytics(self, docs):
+        self.saved.extend(docs)
+        return len(docs)
+
+
+def trade(user_id, side, price, ts, order_id):
+    return {"user_id": user_id, "symbol": "BTCUSDT", "side": side, "quantity": 1.0, "price": price,
+            "timestamp": ts, "order_id": order_id}
+
+
+def test_load_replays_newer_trades_and_held_fills_once():
+    stored = UserAnalytics("u1")
+    stored.apply("BTCUSDT", "BUY", 1.0, 100.0, 1000, 365)
+    trades = [trade("u1", "BUY", 100.0, 1000, "o1"), trade("u1", "SELL", 130.0, 2000, "o2"),
+              trade("u2", "BUY", 50.0, 3000, "o3")]
+    engine = AnalyticsEngine(FakeDB([asdict(stored)], trades))
+    # Fills recorded before load() are held back; o2 is also in the collection and must not count twice
+    engine.record_fill("u1", "BTCUSDT", "SELL", 1.0, 130.0, 2000, "o2")
+    engine.record_fill("u2", "BTCUSDT", "SELL", 1.0, 60.0, 4000, "o4")
+    assert engine.summary("u1")["loaded"] is False
+    assert engine.load() == 2
+
+    u1, u2 = engine.summary("u1", curve=False), engine.summary("u2", curve=False)
+    assert u1["trades"] == 2 and u1["realized_pnl"] == 30.0
+    assert u2["trades"] == 2 and u2["realized_pnl"] == 10.0
+    assert engine.flush() == 2 and engine.flush() == 0
+    # Stored documents restore to the same aggregates
+    restored = UserAnalytics.from_doc(next(doc for doc in engine.db.saved if doc["user_id"] == "u1"))
+    assert restored.summary(now_ms=0, curve=False) == engine._users["u1"].summary(now_ms=0, curve=False)
+
+
+if __name__ == "__main__":
+    tests = [test for name, test in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    sys.exit(0)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Downsampling tests: LTTB against a plain-Python reference, min/max buckets and point caps
+"""
+import sys
+
+import numpy as np
+
+from app.services.downsample import lttb_indices, minmax_indices, downsample, _bucket_edges
+
+
+def series(n=1000, seed=3):
+    rng = np.random.default_rng(seed)
+    timestamps = np.arange(n, dtype=np.int64) * 1000 + 1_700_000_000_000
+    return timestamps, 100 + np.cumsum(rng.normal(0, 1, n))
+
+
+def reference_lttb(x, y, threshold):
+    """Textbook LTTB loop over the same bucket edges, one point at a time."""
+    n = len(x)
+    edges = _bucket_edges(n, threshold).tolist()
+    keep, a = [0], 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nlo, nhi = edges[i + 1], edges[i + 2]
+            avg_x = sum(float(v) for v in x[nlo:nhi]) / (nhi - nlo)
+            avg_y = sum(float(v) for v in y[nlo:nhi]) / (nhi - nlo)
+        else:
+            avg_x, avg_y = float(x[-1]), float(y[-1])
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    return keep
+
+
+def test_lttb_matches_reference():
+    timestamps, prices = series()
+    for threshold in (3, 4, 10, 97, 500):
+        keep = lttb_indices(timestamps, prices, threshold)
+        assert keep.tolist() == reference_lttb(timestamps.astype(np.float64), prices, threshold), threshold
+
+
+def test_point_caps_for_small_thresholds():
+    timestamps, prices = series(50)
+    for threshold in range(0, 12):
+        for keep in (lttb_indices(timestamps, prices, threshold), minmax_indices(prices, threshold)):
+            assert len(keep) <= max(threshold, 0), (threshold, len(keep))
+            assert np.all(np.diff(keep) > 0)
+    # Below four points there is no room for a min/max bucket: only the endpoints are kept
+    assert minmax_indices(prices, 3).tolist() == [0, 49]
+    assert minmax_indices(prices, 1).tolist() == [49]
+    assert lttb_indices(timestamps, prices, 2).tolist() == [0, 49]
+
+
+def test_minmax_keeps_extremes_and_endpoints():
+    _, prices = series()
+    keep = minmax_indices(prices, 100)
+    assert len(keep) <= 100
+    assert keep[0] == 0 and keep[-1] == len(prices) - 1
+    assert int(np.argmin(prices)) in keep and int(np.argmax(prices)) in keep
+
+
+def test_downsample_passthrough_and_methods():
+    timestamps, prices = series(100)
+    same_t, same_p = downsample(timestamps, prices, 0)
+    assert same_t is timestamps and same_p is prices
+    assert downsample(timestamps, prices, 200)[0].size == 100
+    for method in ("lttb", "minmax"):
+        t, p = downsample(timestamps, prices, 20, method)
+        assert t.size == p.size <= 20
+        assert t[0] == timestamps[0] and t[-1] == timestamps[-1]
+    try:
+        downsample(timestamps, prices, 20, "average")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown methods should be rejected")
+
+
+if __name__ == "__main__":
+    tests = [test for name, test in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    sys.exit(0)
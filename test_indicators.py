@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Streaming indicator tests: each O(1) update checked against a full recomputation
+"""
+import math
+import sys
+
+import numpy as np
+
+from app.services.indicators import (
+    SMA, EMA, RSI, RollingVolatility, BollingerBands, VWAP, IndicatorHub, create_indicator, parse_spec,
+)
+
+
+def random_walk(n=500, seed=7):
+    rng = np.random.default_rng(seed)
+    return (30000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))).tolist()
+
+
+def feed(indicator, prices, volumes=None):
+    for i, price in enumerate(prices):
+        indicator.update(price, volumes[i] if volumes is not None else 1.0)
+    return indicator
+
+
+def test_sma_and_bollinger_match_window():
+    prices = random_walk()
+    # Many rotations of the ring buffer, so the periodic rebuild of the sums is exercised
+    sma = feed(SMA(20), prices)
+    bands = feed(BollingerBands(20, 2.0), prices)
+    window = np.array(prices[-20:])
+    assert sma.ready and math.isclose(sma.value, window.mean(), rel_tol=1e-12)
+    assert math.isclose(bands.value["middle"], window.mean(), rel_tol=1e-12)
+    assert math.isclose(bands.value["upper"] - bands.value["middle"], 2.0 * window.std(), rel_tol=1e-6)
+
+
+def test_ready_only_after_full_window():
+    sma = feed(SMA(5), [1.0, 2.0, 3.0])
+    assert not sma.ready and sma.value == 2.0
+    assert SMA(5).value is None
+    try:
+        SMA(0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a zero window should be rejected")
+
+
+def test_ema_matches_recursion():
+    prices = random_walk()
+    expected = prices[0]
+    for price in prices[1:]:
+        expected += 2.0 / 13 * (price - expected)
+    ema = feed(EMA(12), prices)
+    assert ema.ready and math.isclose(ema.value, expected, rel_tol=1e-12)
+
+
+def test_rsi_matches_wilder():
+    prices = random_walk()
+    changes = np.diff(prices)
+    gains, losses = np.clip(changes, 0, None), np.clip(-changes, 0, None)
+    avg_gain, avg_loss = gains[:14].mean(), losses[:14].mean()
+    for gain, loss in zip(gains[14:], losses[14:]):
+        avg_gain = (avg_gain * 13 + gain) / 14
+        avg_loss = (avg_loss * 13 + loss) / 14
+    rsi = feed(RSI(14), prices)
+    assert rsi.ready and math.isclose(rsi.value, 100 - 100 / (1 + avg_gain / avg_loss), rel_tol=1e-9)
+    assert feed(RSI(14), [1.0 + i for i in range(20)]).value == 100.0
+
+
+def test_volatility_is_sample_std_of_log_returns():
+    prices = random_walk()
+    returns = np.diff(np.log(prices))[-30:]
+    volatility = feed(RollingVolatility(30), prices)
+    assert math.isclose(volatility.value, returns.std(ddof=1), rel_tol=1e-6)
+
+
+def test_vwap_cumulative_and_windowed():
+    prices = random_walk(100)
+    volumes = np.random.default_rng(1).uniform(0.1, 5.0, 100).tolist()
+    p, v = np.array(prices), np.array(volumes)
+    assert math.isclose(feed(VWAP(), prices, volumes).value, (p * v).sum() / v.sum(), rel_tol=1e-12)
+    windowed = feed(VWAP(10), prices, volumes)
+    assert math.isclose(windowed.value, (p[-10:] * v[-10:]).sum() / v[-10:].sum(), rel_tol=1e-9)
+
+
+def test_specs_and_hub_sharing():
+    assert parse_spec("bollinger:20:2.5") == ("bollinger", [20, 2.5])
+    assert isinstance(create_indicator("EMA:9"), EMA)
+    try:
+        parse_spec("macd:12")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown indicators should be rejected")
+
+    hub = IndicatorHub()
+    key = hub.subscribe("BTCUSDT", "SMA:3")
+    hub.subscribe("BTCUSDT", "sma:3")
+    for price in (1.0, 2.0, 3.0):
+        hub.update("BTCUSDT", price)
+    assert hub.snapshot("BTCUSDT") == {key: {"value": 2.0, "ready": True}}
+    # Shared instance survives until the last subscriber leaves
+    hub.unsubscribe("BTCUSDT", "sma:3")
+    assert hub.get("BTCUSDT", "sma:3") is not None
+    hub.unsubscribe("BTCUSDT", "sma:3")
+    assert hub.get("BTCUSDT", "sma:3") is None and hub.snapshot("BTCUSDT") == {}
+
+
+if __name__ == "__main__":
+    tests = [test for name, test in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    sys.exit(0)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+RiskEngine tests: limits, order reservations and their expiry, and manual fills through BotEngine
+"""
+import sys
+import time
+
+from app.services.risk import RiskEngine, RiskLimits, RiskRejected
+
+
+def rejected(risk, *order):
+    try:
+        risk.check(*order)
+    except RiskRejected as e:
+        return e.limit
+    return None
+
+
+def test_reservations_count_against_limits():
+    risk = RiskEngine(RiskLimits(max_position_notional=1000.0))
+    first = risk.check("u1", "BTCUSDT", "BUY", 6.0, 100.0)
+    # The first order has not filled yet, but a second one may not squeeze under the limit beside it
+    assert rejected(risk, "u1", "BTCUSDT", "BUY", 6.0, 100.0) == "position_notional"
+    # Other users are not affected
+    risk.release(risk.check("u2", "BTCUSDT", "BUY", 6.0, 100.0))
+    risk.release(first)
+    risk.release(first)  # releasing twice is harmless
+    second = risk.check("u1", "BTCUSDT", "BUY", 6.0, 100.0)
+    risk.record_fill("u1", "BTCUSDT", "BUY", 6.0, 100.0, second)
+    assert risk.exposure("u1")["total_cost"] == 600.0
+    assert rejected(risk, "u1", "BTCUSDT", "BUY", 5.0, 100.0) == "position_notional"
+    assert risk._reserved == {} and risk._reservations == {}
+
+
+def test_sell_reservations_block_oversell():
+    risk = RiskEngine()
+    risk.record_fill("u1", "ETHUSDT", "BUY", 2.0, 1000.0)
+    assert rejected(risk, "u1", "ETHUSDT", "SELL", 3.0, 1000.0) == "oversell"
+    sell = risk.check("u1", "ETHUSDT", "SELL", 1.5, 1000.0)
+    assert rejected(risk, "u1", "ETHUSDT", "SELL", 1.0, 1000.0) == "oversell"
+    risk.record_fill("u1", "ETHUSDT", "SELL", 1.5, 900.0, sell)
+    assert risk.exposure("u1")["positions"]["ETHUSDT"] == {"quantity": 0.5, "cost": 500.0}
+    assert risk.exposure("u1")["daily_loss"] == 150.0
+    # A sell of something not held leaves no empty position behind for the mark-to-market job
+    risk.record_fill("u1", "BTCUSDT", "SELL", 1.0, 100.0)
+    assert [p["symbol"] for p in risk.open_positions()] == ["ETHUSDT"]
+
+
+def test_expired_reservations_lapse():
+    risk = RiskEngine(RiskLimits(max_user_notional=1000.0), reservation_ttl=0.05)
+    risk.check("u1", "BTCUSDT", "BUY", 8.0, 100.0)
+    assert rejected(risk, "u1", "ETHUSDT", "BUY", 8.0, 100.0) == "user_notional"
+    time.sleep(0.1)
+    # The unsettled reservation lapsed, so the same order now passes
+    reservation = risk.check("u1", "ETHUSDT", "BUY", 8.0, 100.0)
+    assert list(risk._reservations) == [reservation] and len(risk._expiry) == 1
+
+
+def test_limits_from_config_and_daily_loss():
+    limits = RiskLimits.from_config({"RISK_MAX_ORDER_NOTIONAL": "500", "RISK_MAX_DAILY_LOSS": "100",
+                                     "RISK_SYMBOL_MAX_QTY": "btcusdt=0.5, ETHUSDT=10"})
+    assert limits.symbol_max_quantity == {"BTCUSDT": 0.5, "ETHUSDT": 10.0}
+    risk = RiskEngine(limits)
+    assert rejected(risk, "u1", "ETHUSDT", "BUY", 1.0, 600.0) == "order_notional"
+    assert rejected(risk, "u1", "BTCUSDT", "BUY", 1.0, 100.0) == "position_quantity"
+    risk.load_daily_losses({"u1": 100.0})
+    assert rejected(risk, "u1", "ETHUSDT", "BUY", 0.1, 100.0) == "daily_loss"
+    # Sells reduce risk and are never blocked by the loss limit
+    risk.load_positions([{"user_id": "u1", "symbol": "ETHUSDT", "quantity": 1.0, "buy_quantity": 2.0,
+                          "buy_value": 400.0}])
+    risk.release(risk.check("u1", "ETHUSDT", "SELL", 1.0, 100.0))
+    assert risk.open_positions() == [{"user_id": "u1", "symbol": "ETHUSDT", "quantity": 1.0, "cost": 200.0}]
+
+
+def test_manual_fill_updates_exposure_and_analytics():
+    from app.services.bot_engine import BotEngine
+
+    engine = BotEngine(binance=None)
+    for side, price in (("BUY", 100.0), ("SELL", 110.0)):
+        order = engine.check_order("u1", "BTCUSDT", side, 1.0, price)
+        assert order["allowed"]
+        engine.record_trade({"symbol": "BTCUSDT", "side": side, "quantity": 1.0, "price": price,
+                             "timestamp": int(time.time() * 1000), "order_id": f"m-{side}"}, "u1",
+                            order["reservation"])
+    summary = engine.analytics_summary("u1", False)
+    assert summary["trades"] == 2 and summary["wins"] == 1 and summary["realized_pnl"] == 10.0
+    assert engine.exposure("u1")["positions"] == {}
+    assert engine.risk._reservations == {}
+
+    # Without a user the fill only reaches the engine portfolio, and its reservation is dropped
+    order = engine.check_order(None, "BTCUSDT", "BUY", 1.0, 100.0)
+    engine.record_trade({"symbol": "BTCUSDT", "side": "BUY", "quantity": 1.0, "price": 100.0,
+                         "timestamp": int(time.time() * 1000)}, None, order["reservation"])
+    assert engine.risk._reservations == {}
+    assert engine.analytics_summary("None", False)["trades"] == 0
+
+
+if __name__ == "__main__":
+    tests = [test for name, test in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    sys.exit(0)
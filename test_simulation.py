@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Simulation tests: block bootstrap paths, vectorized positions and strategy evaluation
+"""
+import sys
+
+import numpy as np
+
+from app.services.simulation import block_bootstrap, positions, evaluate, monte_carlo, _rsi
+from app.services.indicators import RSI
+
+STEP = 1e-4
+
+
+def test_block_bootstrap_resamples_contiguous_blocks():
+    # Return i is (i + 1) * STEP, so a path's increments tell which returns it was built from
+    returns = np.arange(1, 101) * STEP
+    paths = block_bootstrap(returns, n_paths=50, length=95, block=10, start_price=250.0,
+                            rng=np.random.default_rng(5))
+    assert paths.shape == (50, 96)
+    assert np.all(paths[:, 0] == 250.0)
+    index = np.rint(np.diff(np.log(paths), axis=1) / STEP).astype(int) - 1
+    assert index.min() >= 0 and index.max() < returns.size
+    for block in range(0, 95, 10):
+        run = index[:, block:block + 10]
+        assert np.all(np.diff(run, axis=1) == 1)
+
+
+def test_block_bootstrap_clamps_block_and_is_seeded():
+    returns = np.arange(1, 6) * STEP
+    paths = block_bootstrap(returns, n_paths=3, length=12, block=50, start_price=1.0,
+                            rng=np.random.default_rng(1))
+    # A block longer than the history is the whole history, repeated
+    index = np.rint(np.diff(np.log(paths), axis=1) / STEP).astype(int) - 1
+    assert np.all(index == np.tile(np.arange(5), 3)[:12])
+    first = block_bootstrap(np.random.default_rng(0).normal(0, 0.01, 200), 20, 100, 7, 10.0,
+                            np.random.default_rng(42))
+    second = block_bootstrap(np.random.default_rng(0).normal(0, 0.01, 200), 20, 100, 7, 10.0,
+                             np.random.default_rng(42))
+    assert np.array_equal(first, second)
+
+
+def test_positions_follow_buy_when_flat_sell_when_holding():
+    signals = np.array([[0, 1, 1, 0, -1, 0, -1, 1]], dtype=np.int8)
+    expected, holding = [], False
+    for signal in signals[0]:
+        if signal > 0:
+            holding = True
+        elif signal < 0:
+            holding = False
+        expected.append(float(holding))
+    assert positions(signals)[0].tolist() == expected
+
+
+def test_evaluate_threshold_round_trip():
+    prices = np.array([100.0, 90.0, 95.0, 110.0, 105.0])
+    result = evaluate(prices, "THRESHOLD", {"buy_threshold": 90, "sell_threshold": 110}, quantity=2.0)
+    assert result["pnl"][0] == 40.0 and result["trades"][0] == 2.0
+    assert result["max_drawdown"][0] == 0.0
+    with_fees = evaluate(prices, "THRESHOLD", {"buy_threshold": 90, "sell_threshold": 110}, quantity=2.0,
+                         fee_rate=0.01)
+    assert np.isclose(with_fees["pnl"][0], 40.0 - (90.0 + 110.0) * 2.0 * 0.01)
+
+
+def test_vectorized_rsi_matches_streaming_indicator():
+    prices = 100 * np.exp(np.cumsum(np.random.default_rng(9).normal(0, 0.01, 80)))
+    streaming = RSI(14)
+    for price in prices:
+        streaming.update(float(price))
+    assert np.isclose(_rsi(prices[None, :], 14)[0, -1], streaming.value)
+
+
+def test_monte_carlo_is_reproducible():
+    prices = 100 * np.exp(np.cumsum(np.random.default_rng(2).normal(0, 0.01, 300)))
+    params = {"buy_threshold": float(np.quantile(prices, 0.2)), "sell_threshold": float(np.quantile(prices, 0.8))}
+    runs = [monte_carlo(prices, "THRESHOLD", params, n_paths=64, block=20, seed=11, workers=1, chunk_paths=16)
+            for _ in range(2)]
+    assert runs[0]["paths"] == 64 and runs[0]["length"] == 299
+    assert runs[0]["pnl"] == runs[1]["pnl"] and 0.0 <= runs[0]["prob_loss"] <= 1.0
+    try:
+        monte_carlo(prices[:2], n_paths=4, workers=1)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("two prices are too few to resample")
+
+
+if __name__ == "__main__":
+    tests = [test for name, test in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    sys.exit(0)
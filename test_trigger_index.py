@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+TriggerIndex tests: which threshold bots a tick fires, and side flips
+"""
+import sys
+
+from app.services.trigger_index import TriggerIndex
+
+
+def test_triggered_uses_trading_bot_rule():
+    index = TriggerIndex("BTCUSDT")
+    index.add("a", buy_threshold=100.0, sell_threshold=120.0)
+    index.add("b", buy_threshold=90.0, sell_threshold=110.0)
+    index.add("c", buy_threshold=80.0, sell_threshold=130.0, holding=True)
+
+    # Flat bots buy at or below their buy threshold, holding bots sell at or above their sell threshold
+    assert index.triggered(100.0) == (["a"], [])
+    assert sorted(index.triggered(85.0)[0]) == ["a", "b"]
+    assert index.triggered(130.0) == ([], ["c"])
+    assert index.triggered(105.0) == ([], [])
+
+
+def test_set_holding_moves_bot_between_sides():
+    index = TriggerIndex("BTCUSDT")
+    index.add("a", buy_threshold=100.0, sell_threshold=120.0)
+    index.set_holding("a", True)
+    # A bot that just bought is not due again at the same price
+    assert index.triggered(100.0) == ([], [])
+    assert index.triggered(125.0) == ([], ["a"])
+    index.set_holding("a", False)
+    assert index.triggered(100.0) == (["a"], [])
+    assert index.levels() == {"buy": [(100.0, "a")], "sell": []}
+
+
+def test_remove_and_readd_with_equal_levels():
+    index = TriggerIndex("BTCUSDT")
+    for bot_id in ("a", "b", "c"):
+        index.add(bot_id, buy_threshold=100.0, sell_threshold=120.0)
+    index.remove("b")
+    assert "b" not in index and len(index) == 2
+    assert index.triggered(99.0) == (["a", "c"], [])
+    # Re-adding replaces the old entry instead of duplicating it
+    index.add("a", buy_threshold=95.0, sell_threshold=120.0)
+    assert len(index) == 2
+    assert index.levels()["buy"] == [(95.0, "a"), (100.0, "c")]
+
+    try:
+        index.remove("missing")
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("removing an unknown bot should raise KeyError")
+
+
+if __name__ == "__main__":
+    tests = [test for name, test in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    sys.exit(0)